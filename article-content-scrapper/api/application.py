@@ -9,6 +9,19 @@ from datetime import datetime, timezone
 from service.rabbit_mq import rabbit_mq as mq
 from model.system_error_mail import SysErrorModel
 from core.config import data_source as ds
+from service.fetcher.fetch_backends import fetcher_stats, http_cache_stats
+from service.utils.page_readiness import ready_time_stats
+from service.utils.resource_blocking import blocking_stats
+from service.utils.escalation_stats import escalation_stats
+from service.parser.structured_data import structured_data_coverage
+from service.db import config_cache, invalidate_config_cache, db_pool_stats
+from service.utils.article_writer import article_writer
+from service.utils.dedup import dedup_index
+from service.utils.near_duplicates import near_duplicates
+from service.utils.page_store import failed_page_store_stats
+from service.utils.politeness import politeness
+from service.automation_framework.browser_pool import browser_pool_stats
+from service.automation_framework.async_playwright_service import async_browser_stats
 
 app_router = APIRouter(
     prefix="/app-config/v1", tags=["app-config:v1.0.0"]
@@ -76,6 +89,7 @@ def reload_config():
     try:
         log.log_info("Reloading the configuration from Application Environment")
         reset_settings()
+        invalidate_config_cache()
         return JSONResponse(status_code=200, content={
             "message": "Configuration re-loaded successfully"
         })
@@ -84,6 +98,33 @@ def reload_config():
                             detail=f'Error occurred while resetting the configuration, {e}')
 
 
+@app_router.get('/metrics')
+def runtime_metrics():
+    try:
+        return JSONResponse(status_code=200, content={
+            "fetchers": fetcher_stats(),
+            "http_cache": http_cache_stats(),
+            "page_ready_times": ready_time_stats.snapshot(),
+            "resource_blocking": blocking_stats.snapshot(),
+            "auto_escalation": escalation_stats.snapshot(),
+            "structured_data_coverage": structured_data_coverage.snapshot(),
+            "config_cache": config_cache.stats(),
+            "db_pool": db_pool_stats(),
+            "article_writes": article_writer.stats(),
+            "dedup": dedup_index.stats(),
+            "publisher": mq.article_publisher.stats(),
+            "near_duplicates": near_duplicates.stats(),
+            "failed_pages": failed_page_store_stats(),
+            "consumer": mq.consumer_workers.stats(),
+            "politeness": politeness.stats(),
+            "browser_pools": browser_pool_stats(),
+            "async_browser": async_browser_stats()
+        })
+    except Exception as e:
+        raise HTTPException(status_code=500,
+                            detail=f'Error occurred while collecting the runtime metrics, {e}')
+
+
 @app_router.get('/check-sys-error-mail')
 def check_system_error_mail():
     try:
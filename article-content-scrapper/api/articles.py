@@ -1,12 +1,13 @@
 from typing import List
 
-from fastapi import APIRouter, HTTPException, Path
+from fastapi import APIRouter, HTTPException, Path, Query
 from fastapi.responses import JSONResponse
 from model.article_request import ArticleRequest
 from service.article_crawler import extract_article, extract_article_batch
 from logger import log
 from service import db
 from service.utils.bot_utils import reparse_failed_articles_by_newspaperid
+from service.utils.reparse_jobs import reparse_jobs
 
 router = APIRouter(
     prefix="/articles/v1", tags=["articles:v1.0.0"]
@@ -59,3 +60,60 @@ def reparse_failed_articles(newspaper_id: int = Path(...,
     except Exception as err:
         log.log_error('error occurred while extracting the article data.', err)
         raise HTTPException(status_code=500, detail=f'Error occurred while extracting the article data.\n {err}')
+
+
+@router.post('/reparse/newspaper/{newspaper_id}/jobs')
+def start_reparse_job(newspaper_id: int = Path(..., description="ID of the newspaper to reparse failed articles for"),
+                      publish: bool = Query(False, description="Publish reparsed articles to the analyzer")):
+    """
+        Reparse the unresolved failed articles of the given newspaper on a process pool in the background.
+        Returns the job; a job already running for the newspaper is returned instead of starting another.
+    """
+    try:
+        return JSONResponse(status_code=202, content=reparse_jobs.start(newspaper_id, publish))
+    except Exception as err:
+        log.log_error('error occurred while starting the reparse job.', err)
+        raise HTTPException(status_code=500, detail=f'Error occurred while starting the reparse job.\n {err}')
+
+
+@router.get('/reparse/jobs')
+def list_reparse_jobs():
+    return JSONResponse(status_code=200, content=reparse_jobs.list())
+
+
+@router.get('/reparse/jobs/{job_id}')
+def get_reparse_job(job_id: str):
+    job = reparse_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f'Reparse job {job_id} not found')
+    return JSONResponse(status_code=200, content=job)
+
+
+@router.delete('/reparse/jobs/{job_id}')
+def cancel_reparse_job(job_id: str):
+    if not reparse_jobs.cancel(job_id):
+        raise HTTPException(status_code=404, detail=f'No running reparse job {job_id}')
+    return JSONResponse(status_code=202, content=reparse_jobs.get(job_id))
+
+
+@router.get('/near-duplicates/{article_id}')
+def get_near_duplicates(article_id: int = Path(..., description="ID of the article to look up")):
+    """
+        Near-duplicate links of an article: `duplicate_of` names the original whose analysis it shares (None for
+        an analyzed article), `duplicates` the articles sharing its analysis.
+    """
+    try:
+        own, duplicates = db.find_near_duplicate_links(article_id)
+    except Exception as err:
+        log.log_error('error occurred while reading the near-duplicate links.', err)
+        raise HTTPException(status_code=500, detail=f'Error occurred while reading the near-duplicate links.\n {err}')
+
+    if own is None and not duplicates:
+        raise HTTPException(status_code=404, detail=f'No fingerprint recorded for article {article_id}')
+    duplicate_of, distance = own or (None, None)
+    return JSONResponse(status_code=200, content={
+        'article_id': article_id,
+        'duplicate_of': duplicate_of,
+        'distance': distance,
+        'duplicates': [{'article_id': duplicate_id, 'distance': d} for duplicate_id, d in duplicates]
+    })
@@ -0,0 +1,148 @@
+"""
+Fetch throughput benchmark of the no-selenium download path against a locally served corpus.
+
+Compares the legacy one-`requests.get`-per-article path with the pooled httpx engine and the
+CurlMulti backend. Pages are served by a keep-alive HTTP/1.1 server on localhost; `--latency`
+adds a per-response delay to approximate remote newspaper sites.
+
+    cd article-content-scrapper && python benchmark/fetch_benchmark.py --pages 500 --latency 50
+    python benchmark/fetch_benchmark.py --corpus ./failed_articles         # serve saved article pages
+    python benchmark/fetch_benchmark.py --corpus ./failed_articles/store   # or the failed page store
+"""
+import argparse
+import os
+import multiprocessing
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.settings_defaults import apply_settings_defaults  # noqa: E402
+
+apply_settings_defaults()
+
+import requests  # noqa: E402
+from model.fetch import FetchRequest  # noqa: E402
+from service.fetcher.async_fetch_engine import AsyncFetchEngine  # noqa: E402
+from service.fetcher.curl_multi_fetcher import CurlMultiFetcher  # noqa: E402
+
+
+def load_corpus(corpus_dir, pages, size):
+    if corpus_dir and os.path.exists(os.path.join(corpus_dir, 'index.sqlite')):
+        from service.utils.page_store import PageStore
+        pages_iter = PageStore(corpus_dir).iter_pages()
+        return [html.encode('utf-8') for _, (_, html) in zip(range(pages), pages_iter)]
+    if corpus_dir:
+        files = sorted(f for f in os.listdir(corpus_dir) if f.endswith('.html'))[:pages]
+        return [open(os.path.join(corpus_dir, f), 'rb').read() for f in files]
+
+    paragraph = '<p>' + 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 8 + '</p>\n'
+    body = paragraph * max(size // len(paragraph), 1)
+    return [f'<html><head><title>Article {i}</title></head><body><h1>Article {i}</h1>{body}</body></html>'.encode()
+            for i in range(pages)]
+
+
+def serve_corpus(corpus, latency, ready):
+    class CorpusHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            try:
+                page = corpus[int(self.path.strip('/').split('.')[0])]
+            except (ValueError, IndexError):
+                self.send_error(404)
+                return
+            if latency:
+                time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    class CorpusServer(ThreadingHTTPServer):
+        daemon_threads = True
+        request_queue_size = 256  # the default backlog of 5 drops concurrent connects
+
+    server = CorpusServer(('127.0.0.1', 0), CorpusHandler)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+def start_server(corpus, latency):
+    # The server runs in its own process so it does not compete with the fetchers for the GIL
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_corpus, args=(corpus, latency, ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=10)
+
+
+def run_requests(urls):
+    ok, size = 0, 0
+    for url in urls:
+        try:
+            response = requests.get(url)
+            ok += response.status_code == 200
+            size += len(response.content)
+        except requests.RequestException:
+            pass
+    return ok, size
+
+
+def run_fetcher(fetcher, urls, per_domain):
+    ok, size = 0, 0
+    for result in fetcher.fetch_all(FetchRequest(url=url, max_per_domain=per_domain) for url in urls):
+        ok += result.ok
+        size += len(result.content)
+    fetcher.close()
+    return ok, size
+
+
+def report(name, urls, started, ok, size):
+    elapsed = time.perf_counter() - started
+    print(f'{name:<12} {len(urls) / elapsed:9.1f} pages/s {size / elapsed / 1048576:8.2f} MB/s '
+          f'{elapsed:7.2f}s  ok={ok}/{len(urls)}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='No-selenium fetch throughput benchmark')
+    parser.add_argument('--pages', type=int, default=300, help='number of article pages')
+    parser.add_argument('--size', type=int, default=80000, help='synthetic page size in bytes')
+    parser.add_argument('--corpus', help='directory of saved .html pages or a failed page store to serve instead '
+                                         'of synthetic ones')
+    parser.add_argument('--latency', type=float, default=20, help='per-response server delay in milliseconds')
+    parser.add_argument('--concurrency', type=int, default=16, help='per-domain concurrency of the pooled fetchers')
+    parser.add_argument('--skip-requests', action='store_true', help='skip the sequential requests baseline')
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.pages, args.size)
+    if not corpus:
+        print('Empty corpus')
+        return
+    server, port = start_server(corpus, args.latency / 1000)
+    base = f'http://127.0.0.1:{port}'
+    urls = [f'{base}/{i}.html' for i in range(len(corpus))]
+    print(f'{len(urls)} pages, avg {sum(map(len, corpus)) // len(corpus)} bytes, '
+          f'{args.latency:.0f} ms server latency, per-domain concurrency {args.concurrency}')
+
+    if not args.skip_requests:
+        started = time.perf_counter()
+        report('requests', urls, started, *run_requests(urls))
+
+    started = time.perf_counter()
+    engine = AsyncFetchEngine(max_connections=args.concurrency, per_domain_concurrency=args.concurrency)
+    report('httpx', urls, started, *run_fetcher(engine, urls, args.concurrency))
+
+    started = time.perf_counter()
+    curl = CurlMultiFetcher(max_connections=args.concurrency, per_domain_concurrency=args.concurrency)
+    report('curl-multi', urls, started, *run_fetcher(curl, urls, args.concurrency))
+
+    server.terminate()
+
+
+if __name__ == '__main__':
+    main()
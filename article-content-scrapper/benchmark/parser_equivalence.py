@@ -0,0 +1,83 @@
+"""
+Equivalence and speed check of the lxml parser backend against BeautifulSoup ('html.parser').
+
+Every page is parsed with both backends through `parse_article_sections` and the resulting sections are
+compared field by field. Without arguments a built-in set of edge-case pages is used; saved article pages
+can be checked against a newspaper config (the `doc` column of conf.articlesearchconf) exported as JSON:
+
+    cd article-content-scrapper && python benchmark/parser_equivalence.py
+    python -m pytest tests/test_parser_equivalence.py      # the built-in pages as a test suite
+    python benchmark/parser_equivalence.py --corpus ./failed_articles --config newspaper_12.json
+    python benchmark/parser_equivalence.py --corpus ./failed_articles/store --config newspaper_12.json
+
+Exits with status 1 when any page differs.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.settings_defaults import apply_settings_defaults  # noqa: E402
+
+apply_settings_defaults()
+
+from service.parser.article_sections import parse_article_sections  # noqa: E402
+from service.parser.html_document import LXML, SOUP, load_document, precompile_selectors  # noqa: E402
+from tests.parser_samples import KNOWN_DIFFERENCES, SAMPLE_CONFIG, SAMPLE_PAGES  # noqa: E402
+
+
+def parse(doc, config, parser):
+    document = load_document(doc, parser)
+    sections, missing = parse_article_sections(config, document)
+    sections['missing'] = sorted(missing)
+    return sections
+
+
+def compare(name, doc, config, timings):
+    results = {}
+    for parser in (SOUP, LXML):
+        started = time.perf_counter()
+        results[parser] = parse(doc, config, parser)
+        timings[parser] += time.perf_counter() - started
+
+    differences = {key: (results[SOUP][key], results[LXML][key])
+                   for key in results[SOUP] if results[SOUP][key] != results[LXML][key]}
+    known = KNOWN_DIFFERENCES.get(name, set())
+    for key, (soup_value, lxml_value) in differences.items():
+        label = 'KNOWN' if key in known else 'DIFF'
+        print(f'  {label} {name} [{key}]\n    soup: {soup_value!r}\n    lxml: {lxml_value!r}')
+    return set(differences) <= known
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the lxml and BeautifulSoup article parsers')
+    parser.add_argument('--corpus', help='directory of saved .html article pages, or a failed page store')
+    parser.add_argument('--config', help='newspaper config JSON matching the corpus')
+    args = parser.parse_args()
+
+    if args.corpus:
+        config = json.load(open(args.config, encoding='utf-8')) if args.config else SAMPLE_CONFIG
+        if os.path.exists(os.path.join(args.corpus, 'index.sqlite')):
+            from service.utils.page_store import PageStore
+            pages = {str(article_id): html for article_id, html in PageStore(args.corpus).iter_pages()}
+        else:
+            pages = {f: open(os.path.join(args.corpus, f), encoding='utf-8').read()
+                     for f in sorted(os.listdir(args.corpus)) if f.endswith('.html')}
+    else:
+        config, pages = SAMPLE_CONFIG, SAMPLE_PAGES
+
+    precompile_selectors(config)
+    timings = {SOUP: 0.0, LXML: 0.0}
+    equal = sum(compare(name, doc, config, timings) for name, doc in pages.items())
+
+    print(f'{equal}/{len(pages)} pages equivalent')
+    print(f'soup {timings[SOUP] * 1000:.1f} ms, lxml {timings[LXML] * 1000:.1f} ms '
+          f'({timings[SOUP] / max(timings[LXML], 1e-9):.1f}x)')
+    sys.exit(0 if equal == len(pages) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -13,6 +13,14 @@ class Settings(BaseSettings):
     SPOKESPERSON_ROOT_DIRECTORY: str
     SPOKESPERSON_FAILED_ARTICLE_DIRECTORY: str = os.path.join(os.path.dirname(os.path.dirname(__file__)),
                                                               'failed_articles')
+    # Saved pages of failed articles: zstd compressed, content addressed, in pack files under `store/`
+    FAILED_PAGE_PACK_MAX_BYTES: int = 256 * 1024 * 1024
+    FAILED_PAGE_COMPRESSION_LEVEL: int = 9
+    # Background reparse jobs of failed articles
+    REPARSE_PROCESSES: int = 0  # parser processes per job, 0 for one per CPU
+    REPARSE_CHUNK_SIZE: int = 16  # pages sent to a parser process at a time
+    REPARSE_WRITE_BATCH_SIZE: int = 200  # failed-article rows per upsert statement
+    REPARSE_JOB_HISTORY: int = 50  # finished jobs kept for the status endpoints
     SELENIUM_FRAMEWORK: str = 'selenium'
     SUPPORTED_FRAMEWORKS: str
 
@@ -21,6 +29,24 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_USER: str
     DB_PASSWORD: str
+    DB_POOL_MAX_SIZE: int = 10  # connections per scraper process
+    DB_POOL_WAIT_SECONDS: float = 10  # wait for a free connection before giving up
+    DB_POOL_HEALTH_CHECK_SECONDS: float = 30  # idle time after which a connection is pinged before reuse
+    ARTICLE_WRITE_BATCH_SIZE: int = 100  # scraped articles stored per statement
+    ARTICLE_WRITE_FLUSH_SECONDS: float = 2  # longest a scraped article waits for its batch
+    ARTICLE_WRITE_QUEUE_SIZE: int = 5000  # pending articles before crawlers wait for the writer
+    CONFIG_CACHE_TTL: int = 300  # seconds newspaper configs are served from memory
+    # Skip articles already stored, by article_id or normalized URL, before fetching them
+    DEDUP_ENABLED: bool = True
+    DEDUP_BLOOM_CAPACITY: int = 2000000  # keys (two per article) before the false positive rate degrades
+    DEDUP_BLOOM_ERROR_RATE: float = 0.01
+    DEDUP_SYNC_SECONDS: float = 60  # pull articles stored by other scraper instances
+    # Hold back near-duplicates (SimHash) of articles already sent to the analyzer
+    NEAR_DUPLICATE_ENABLED: bool = True
+    NEAR_DUPLICATE_MAX_DISTANCE: int = 3  # differing fingerprint bits, at most 3
+    NEAR_DUPLICATE_SHINGLE_SIZE: int = 4  # words per shingle
+    NEAR_DUPLICATE_MIN_WORDS: int = 80  # shorter bodies are always analyzed
+    NEAR_DUPLICATE_WINDOW_DAYS: int = 14  # how far back originals are matched
 
     # Rabbit Properties
     MQ_HOST: str
@@ -38,6 +64,13 @@ class Settings(BaseSettings):
     SPOKESPERSON_ARTICLE_CONTENT_ROUTING_KEY: str
     SPOKESPERSON_ARTICLE_FAIL_EXCHANGE: str
     SPOKESPERSON_ARTICLE_METADATA_FAIL_ROUTING_KEY: str
+    MQ_PUBLISH_MAX_IN_FLIGHT: int = 500  # unconfirmed messages on the publisher channel
+    MQ_PUBLISH_MAX_ATTEMPTS: int = 5  # publish attempts per message before it goes to the fail exchange
+    MQ_PUBLISH_QUEUE_SIZE: int = 10000  # queued messages before crawlers wait for the publisher
+    MQ_CONSUMER_PREFETCH: int = 4  # article batches crawled concurrently per scraper instance
+    MQ_WORKERS_SELENIUM: int = 2  # crawl threads per execution mode
+    MQ_WORKERS_NO_SELENIUM: int = 4
+    MQ_WORKERS_AUTO: int = 2
 
     # SMTP Properties
     SMTP_HOST: str
@@ -58,12 +91,61 @@ class Settings(BaseSettings):
     SCRIPT_TIMEOUT: int
     IMPLICIT_WAIT: int
     EXPLICIT_WAIT: int
+    # Adaptive page readiness waits; `maxPageWait` in the newspaper config overrides the maximum
+    PAGE_READY_MAX_WAIT: float = 30.0
+    PAGE_READY_MIN_WAIT: float = 3.0
+    PAGE_READY_POLL_INTERVAL: float = 0.25
+    PAGE_READY_STABLE_POLLS: int = 2
+    # Evaluate all sections with one in-page script; `inPageExtraction` in the newspaper config overrides it
+    IN_PAGE_EXTRACTION: bool = True
+    # Network-level blocking of images, media, fonts and trackers; `blockProfile` in the newspaper config
+    # overrides it. A compare-rate share of page loads runs unblocked to measure the savings.
+    RESOURCE_BLOCKING_ENABLED: bool = True
+    RESOURCE_BLOCKING_COMPARE_RATE: float = 0.05
+    # Warm browser pool shared across consumer messages
+    BROWSER_POOL_SIZE_PER_NEWSPAPER: int = 1
+    BROWSER_POOL_MAX_BROWSERS: int = 4
+    BROWSER_POOL_MAX_PAGES: int = 200
+    BROWSER_POOL_MAX_JS_HEAP_MB: int = 512
+    BROWSER_POOL_IDLE_SECONDS: int = 900
+    BROWSER_POOL_CHECKOUT_TIMEOUT: int = 300
+    # Async Playwright engine; `browserTabs` in the newspaper config overrides the tabs per newspaper
+    ASYNC_PLAYWRIGHT_MAX_TABS: int = 16
+    ASYNC_PLAYWRIGHT_TABS_PER_NEWSPAPER: int = 4
     # Optionally enable or disable screenshots on failure.
     TAKE_SCREENSHOTS: bool
     FAILED_CRAWL_SOURCE_DIR: str
     PROXIES: str
     PROXY_ENABLED: bool
 
+    # HTTP Fetch Engine Properties (no-selenium execution mode)
+    FETCH_BACKEND: str = 'httpx'  # httpx or curl, overridable per newspaper with `fetchBackend`
+    FETCH_MAX_CONNECTIONS: int = 100
+    FETCH_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    FETCH_KEEPALIVE_EXPIRY: float = 30.0
+    FETCH_PER_DOMAIN_CONCURRENCY: int = 6
+    FETCH_TIMEOUT: float = 30.0
+    FETCH_HTTP2: bool = False
+    FETCH_DNS_CACHE_TTL: int = 300
+    # Per-domain politeness (token bucket + backoff), overridable per newspaper with `crawlRate`
+    POLITENESS_REQUESTS_PER_SECOND: float = 4.0  # 0 disables the rate limit
+    POLITENESS_BURST: int = 8
+    POLITENESS_MIN_REQUESTS_PER_SECOND: float = 0.05  # floor of the backoff on 429 / 503 / CAPTCHA pages
+    POLITENESS_MAX_BACKOFF_SECONDS: float = 600
+    POLITENESS_MAX_CONCURRENT_PAGES: int = 32  # browser page loads in flight across all domains
+    HTML_PARSER: str = 'lxml'  # lxml or soup, overridable per newspaper with `htmlParser`
+    # Take sections from JSON-LD / OpenGraph metadata when present; `structuredData` per newspaper overrides it
+    STRUCTURED_DATA_ENABLED: bool = True
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_DIRECTORY: str = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'http_cache')
+    HTTP_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024
+    HTTP_CACHE_COMPRESSION_LEVEL: int = 3
+    # `auto` execution mode: newspapers escalating most static pages go straight to the browser
+    AUTO_ESCALATION_WINDOW: int = 50
+    AUTO_ESCALATION_MIN_SAMPLES: int = 10
+    AUTO_ESCALATION_THRESHOLD: float = 0.8
+    AUTO_ESCALATION_RETRY_SECONDS: int = 3600
+
     class Config:
         env_file = ".env"
         extra = Extra.allow  # Allow extra fields
@@ -0,0 +1,29 @@
+"""
+Placeholder values for the settings without a default, so the service modules can be imported by the
+benchmarks and the tests without a configured environment. Real values always take precedence.
+"""
+import os
+
+TEXT_SETTINGS = ('SPOKESPERSON_ROOT_DIRECTORY', 'SUPPORTED_FRAMEWORKS', 'DB_HOST', 'DB_NAME', 'DB_USER', 'DB_PASSWORD',
+                 'MQ_HOST', 'MQ_USER', 'MQ_PASSWORD', 'MQ_VIRTUAL_HOST', 'SPOKESPERSON_ARTICLE_METADATA_QUEUE',
+                 'SPOKESPERSON_ARTICLE_METADATA_ROUTING_KEY', 'SPOKESPERSON_ARTICLE_EXCHANGE',
+                 'SPOKESPERSON_ARTICLE_CONTENT_QUEUE', 'SPOKESPERSON_ARTICLE_CONTENT_ROUTING_KEY',
+                 'SPOKESPERSON_ARTICLE_FAIL_EXCHANGE', 'SPOKESPERSON_ARTICLE_METADATA_FAIL_ROUTING_KEY', 'SMTP_HOST',
+                 'SENDER_EMAIL', 'DEV_RECIPIENT_EMAILS', 'UPDATE_RECIPIENT_EMAILS', 'USER_AGENT',
+                 'BROWSER', 'BROWSER_VERSION', 'WINDOW_SIZE', 'FAILED_CRAWL_SOURCE_DIR', 'PROXIES')
+NUMBER_SETTINGS = ('MQ_PORT', 'DELIVERY_MODE', 'RETRY_DELAY', 'MQ_CONNECTION_ATTEMPT', 'SMTP_PORT',
+                   'PAGE_LOAD_TIMEOUT', 'SCRIPT_TIMEOUT', 'IMPLICIT_WAIT', 'EXPLICIT_WAIT')
+FLAG_SETTINGS = ('HEADLESS', 'PROXY', 'TAKE_SCREENSHOTS', 'PROXY_ENABLED')
+
+
+def apply_settings_defaults() -> None:
+    """
+    Must run before `core.config` is first imported.
+    """
+    for key in TEXT_SETTINGS:
+        os.environ.setdefault(key, '')
+    for key in NUMBER_SETTINGS:
+        os.environ.setdefault(key, '0')
+    for key in FLAG_SETTINGS:
+        os.environ.setdefault(key, 'false')
+    os.environ.setdefault('EMAIL_ALERT_LEVEL', 'CRITICAL')
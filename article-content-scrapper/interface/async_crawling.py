@@ -0,0 +1,95 @@
+from abc import abstractmethod
+
+from interface.crawling import ArticleParsing
+
+
+class AsyncCrawling(ArticleParsing):
+    """
+    Abstract base class for crawlers driving the browser through an asyncio API (e.g. Playwright's async API).
+    Parsing and extraction are shared with `Crawling`; the page interactions are coroutines run on the
+    browser's event loop.
+    """
+
+    @abstractmethod
+    async def automation_tool_config(self, driver) -> None:
+        """
+        Configure the automation tool (e.g., a Playwright browser context) before crawling.
+
+        :param driver: The browser context to be configured.
+        """
+        pass
+
+    @abstractmethod
+    async def handle_site_auth(self, driver) -> dict:
+        """
+        Handle site authentication (e.g., login, session management).
+
+        :param driver: The page instance.
+        :return: Dictionary containing authentication-related information.
+        """
+        pass
+
+    @abstractmethod
+    async def enter_text(self, locator_type: str, locator: str, text: str, driver) -> None:
+        """
+        Enter text into an input field on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the input field.
+        :param text: The text to enter.
+        :param driver: The page instance.
+        """
+        pass
+
+    @abstractmethod
+    async def click_element(self, locator_type: str, locator: str, driver) -> None:
+        """
+        Click an element on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the element.
+        :param driver: The page instance.
+        """
+        pass
+
+    @abstractmethod
+    async def wait(self, locator_type: str, locator: str, driver) -> None:
+        """
+        Wait for an element to appear on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the element.
+        :param driver: The page instance.
+        """
+        pass
+
+    @abstractmethod
+    async def page_action(self, locator_type: str, locator: str, duration: int, driver) -> None:
+        """
+        Make some Action on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the element.
+        :param duration: Make movement of page given duration.
+        :param driver: The page instance.
+        """
+        pass
+
+    @abstractmethod
+    async def is_article_protected(self, driver) -> bool:
+        """
+        Check if an article is behind a paywall or protected.
+
+        :param driver: The page instance.
+        :return: Boolean indicating whether the article is protected.
+        """
+        pass
+
+    @abstractmethod
+    async def stealth_mode(self, driver) -> None:
+        """
+        Hide the usual automation fingerprints from the pages of a browser context.
+
+        :param driver: The browser context.
+        """
+        pass
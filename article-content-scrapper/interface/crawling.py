@@ -8,22 +8,12 @@ from core.config import data_source as ds
 from model.article_request import ArticleRequest
 
 
-class Crawling(ABC):
+class ArticleParsing(ABC):
     """
-    Abstract base class for web crawling operations.
-    This class defines the essential methods required for extracting information from web pages,
-    handling authentication, processing captcha's, and interacting with webpage elements.
+    Section parsing, batch extraction and credential lookup shared by the synchronous (`Crawling`) and the
+    asyncio (`interface.async_crawling.AsyncCrawling`) crawlers.
     """
 
-    @abstractmethod
-    def automation_tool_config(self, driver) -> None:
-        """
-        Configure the automation tool (e.g., Selenium WebDriver) before crawling.
-
-        :param driver: The web driver instance to be configured.
-        """
-        pass
-
     @abstractmethod
     def extract_info_from_webpage(self, driver) -> dict | None:
         """
@@ -148,16 +138,6 @@ class Crawling(ABC):
         """
         pass
 
-    @abstractmethod
-    def handle_site_auth(self, driver) -> dict:
-        """
-        Handle site authentication (e.g., login, session management).
-
-        :param driver: The web driver instance.
-        :return: Dictionary containing authentication-related information.
-        """
-        pass
-
     @abstractmethod
     def fetch_auth_credentials(self, newspaper_id: int) -> dict:
         """
@@ -168,66 +148,6 @@ class Crawling(ABC):
         """
         pass
 
-    @abstractmethod
-    def enter_text(self, locator_type: str, locator: str, text: str, driver) -> None:
-        """
-        Enter text into an input field on a webpage.
-
-        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
-        :param locator: The locator string to find the input field.
-        :param text: The text to enter.
-        :param driver: The web driver instance.
-        """
-        pass
-
-    @abstractmethod
-    def click_element(self, locator_type: str, locator: str, driver) -> None:
-        """
-        Click an element on a webpage.
-
-        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
-        :param locator: The locator string to find the element.
-        :param driver: The web driver instance.
-        """
-        pass
-
-    @abstractmethod
-    def wait(self, locator_type: str, locator: str, driver) -> None:
-        """
-        Click an element to wait some time on a webpage.
-
-        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
-        :param locator: The locator string to find the element.
-        :param driver: The web driver instance.
-        """
-        pass
-
-    @abstractmethod
-    def page_action(self, locator_type: str, locator: str, duration: int, driver) -> None:
-        """
-        Make some Action on a webpage.
-
-        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
-        :param locator: The locator string to find the element.
-        :param duration: Make movement of page given duration.
-        :param driver: The web driver instance.
-        """
-        pass
-
-    @abstractmethod
-    def is_article_protected(self, driver):
-        """
-        Check if an article is behind a paywall or protected.
-
-        :param driver: The web driver instance.
-        :return: Boolean indicating whether the article is protected.
-        """
-        pass
-
-    @abstractmethod
-    def stealth_mode(self, driver) -> None:
-        pass
-
     @staticmethod
     def generate_chrome_user_agent():
         chrome_versions = [
@@ -343,3 +263,90 @@ class Crawling(ABC):
             "class_name": CLASS_NAME
         }
         return std_loc.get(locator)
+
+
+class Crawling(ArticleParsing):
+    """
+    Abstract base class for web crawling operations.
+    This class defines the essential methods required for extracting information from web pages,
+    handling authentication, processing captcha's, and interacting with webpage elements.
+    """
+
+    @abstractmethod
+    def automation_tool_config(self, driver) -> None:
+        """
+        Configure the automation tool (e.g., Selenium WebDriver) before crawling.
+
+        :param driver: The web driver instance to be configured.
+        """
+        pass
+
+    @abstractmethod
+    def handle_site_auth(self, driver) -> dict:
+        """
+        Handle site authentication (e.g., login, session management).
+
+        :param driver: The web driver instance.
+        :return: Dictionary containing authentication-related information.
+        """
+        pass
+
+    @abstractmethod
+    def enter_text(self, locator_type: str, locator: str, text: str, driver) -> None:
+        """
+        Enter text into an input field on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the input field.
+        :param text: The text to enter.
+        :param driver: The web driver instance.
+        """
+        pass
+
+    @abstractmethod
+    def click_element(self, locator_type: str, locator: str, driver) -> None:
+        """
+        Click an element on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the element.
+        :param driver: The web driver instance.
+        """
+        pass
+
+    @abstractmethod
+    def wait(self, locator_type: str, locator: str, driver) -> None:
+        """
+        Click an element to wait some time on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the element.
+        :param driver: The web driver instance.
+        """
+        pass
+
+    @abstractmethod
+    def page_action(self, locator_type: str, locator: str, duration: int, driver) -> None:
+        """
+        Make some Action on a webpage.
+
+        :param locator_type: Type of locator (e.g., ID, XPath, CSS selector).
+        :param locator: The locator string to find the element.
+        :param duration: Make movement of page given duration.
+        :param driver: The web driver instance.
+        """
+        pass
+
+    @abstractmethod
+    def is_article_protected(self, driver):
+        """
+        Check if an article is behind a paywall or protected.
+
+        :param driver: The web driver instance.
+        :return: Boolean indicating whether the article is protected.
+        """
+        pass
+
+    @abstractmethod
+    def stealth_mode(self, driver) -> None:
+        pass
@@ -0,0 +1,45 @@
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator
+
+from model.fetch import FetchRequest, FetchResult
+
+
+class Fetching(ABC):
+    """
+    Abstract base class for HTTP fetch backends used by the no-selenium execution mode.
+    """
+
+    @abstractmethod
+    def fetch(self, request: FetchRequest) -> FetchResult:
+        """
+        Fetch a single URL and wait for the response.
+
+        :param request: The request to perform.
+        :return: The fetch result; transport failures are reported in `FetchResult.error`.
+        """
+        pass
+
+    @abstractmethod
+    def fetch_all(self, requests: Iterable[FetchRequest]) -> Iterator[FetchResult]:
+        """
+        Fetch many URLs concurrently and yield each result as soon as it completes,
+        so the caller can parse responses while the remaining downloads are in flight.
+
+        :param requests: The requests to perform.
+        :return: Iterator over the results in completion order.
+        """
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict:
+        """
+        Runtime counters of the backend.
+        """
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        """
+        Release pooled connections and background resources.
+        """
+        pass
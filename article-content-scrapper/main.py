@@ -5,6 +5,14 @@ from contextlib import asynccontextmanager
 from logger import log
 from service.rabbit_mq import rabbit_mq as mq
 from core import config
+from service.db import ensure_config_indexes, ensure_dedup_table, ensure_fingerprint_table, close_db_pool
+from service.utils.article_writer import close_article_writer
+from service.utils.dedup import dedup_index
+from service.utils.page_store import close_failed_page_store
+from service.utils.reparse_jobs import reparse_jobs
+from service.fetcher.fetch_backends import close_fetchers
+from service.automation_framework.browser_pool import close_browser_pools
+from service.automation_framework.async_playwright_service import close_async_browser
 
 
 @asynccontextmanager
@@ -13,10 +21,23 @@ async def lifespan(app: FastAPI):
     log.log_application_start()
     log.log_application_start_time()
     config.create_instance()
+    ensure_config_indexes()
+    ensure_dedup_table()
+    ensure_fingerprint_table()
+    dedup_index.sync()
 
     yield  # Application runs here
 
+    mq.close_consumer()
+    reparse_jobs.shutdown()
+    close_fetchers()
+    close_browser_pools()
+    close_async_browser()
+    mq.article_publisher.close()
     mq.rabbitmq_connection.close()
+    close_article_writer()
+    close_failed_page_store()
+    close_db_pool()
     log.log_application_end_time()
     log.log_application_shutdown()
 
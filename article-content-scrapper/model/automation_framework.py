@@ -5,3 +5,4 @@ class AutomationFramework(Enum):
     SELENIUM = 'selenium'
     SELENIUMBASE = 'seleniumbase'
     PLAYWRIGHT = 'playwright'
+    ASYNC_PLAYWRIGHT = 'async-playwright'
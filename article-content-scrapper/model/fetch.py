@@ -0,0 +1,40 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+from urllib.parse import urlsplit
+
+
+@dataclass
+class FetchRequest:
+    url: str
+    headers: dict = field(default_factory=dict)
+    timeout: Optional[float] = None
+    proxy: Optional[str] = None
+    max_per_domain: Optional[int] = None
+    context: Any = None
+    # Politeness gate: returns 0 once the request may be sent, else the seconds to wait before asking again
+    gate: Optional[Callable[[], float]] = None
+
+    @property
+    def domain(self) -> str:
+        return urlsplit(self.url).hostname or ''
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status_code: Optional[int] = None
+    content: bytes = b''
+    encoding: Optional[str] = None
+    headers: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    from_cache: bool = False
+    context: Any = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status_code == 200
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
@@ -9,7 +9,10 @@ from service.db import find_article_configuration
 from service.automation_framework import selenium_service
 from service.automation_framework.seleniumbase_service_imp import SeleniumBaseImp
 from service.automation_framework.sync_playwright_service_imp import PlaywrightServiceImp
+from service.automation_framework.async_playwright_service import AsyncPlaywrightServiceImp
 from model.automation_framework import AutomationFramework
+from service.utils.escalation_stats import escalation_stats
+from service.utils.dedup import dedup_index
 from logger import log
 
 
@@ -43,6 +46,13 @@ def extract_article(article: ArticleRequest):
             article_dict = pw.extract(article.url)
             return article_dict
 
+        elif framework == AutomationFramework.ASYNC_PLAYWRIGHT.value:
+
+            log.log_info('Use async playwright to parse the articles')
+            pw = AsyncPlaywrightServiceImp(article_config.get('doc'), can_publish=article.publish)
+            articles_response = pw.extract_all([article])
+            return articles_response[0] if articles_response else None
+
         else:
 
             log.log_error("Unsupported automation framework configuration")
@@ -52,60 +62,121 @@ def extract_article(article: ArticleRequest):
         soup_service = ArticleSoupParser(config=article_config.get('doc'), can_publish=article.publish)
         return soup_service.extract(article)
 
+    elif execution_mode == 'auto':
+        articles_response = extract_auto(article_config.get('doc'), [article], publish=article.publish)
+        return articles_response[0] if articles_response else None
+
     else:
 
         return None
 
 
-def extract_article_batch(articles: List[ArticleRequest], publish: bool):
+def extract_with_browser(article_config: dict, articles: List[ArticleRequest], publish: bool) -> list[dict]:
+    ds = config.data_source
+    framework = ds.SELENIUM_FRAMEWORK
+
+    if framework == AutomationFramework.SELENIUMBASE.value:
+
+        log.log_info('Use Seleniumbase to parse the articles')
+        sb = SeleniumBaseImp(article_config, can_publish=publish)
+        return sb.extract_all(articles) or []
+
+    elif framework == AutomationFramework.SELENIUM.value:
+
+        log.log_info('Use Selenium to parse the articles')
+        return selenium_service.extract_batch(articles, article_config, can_publish=publish) or []
+
+    elif framework == AutomationFramework.PLAYWRIGHT.value:
+
+        log.log_info('Use playwright to parse the articles')
+        pw = PlaywrightServiceImp(article_config, can_publish=publish)
+        return pw.extract_all(articles) or []
+
+    elif framework == AutomationFramework.ASYNC_PLAYWRIGHT.value:
+
+        log.log_info('Use async playwright to parse the articles')
+        pw = AsyncPlaywrightServiceImp(article_config, can_publish=publish)
+        return pw.extract_all(articles) or []
+
+    else:
+
+        log.log_error("Unsupported automation framework configuration")
+        return []
+
+
+def extract_auto(article_config: dict, articles: List[ArticleRequest], publish: bool) -> list[dict]:
+    """
+    `auto` execution mode: fetch the articles over plain HTTP first and render only the ones whose static
+    page is incomplete (or could not be fetched) in the browser. Newspapers that keep escalating are sent
+    straight to the browser, see `EscalationStats`.
+    """
+    newspaper_id = article_config.get('newspaperID')
 
+    if article_config.get('login') == 1 or escalation_stats.browser_first(newspaper_id):
+        log.log_info(f'Newspaper {newspaper_id} is routed straight to the browser')
+        escalation_stats.record_browser_first(newspaper_id, len(articles))
+        return extract_with_browser(article_config, articles, publish)
+
+    log.log_info('Use beautiful soup to parse the articles, escalating incomplete pages to the browser')
+    soup_service = ArticleSoupParser(config=article_config, can_publish=publish)
+    articles_response = soup_service.extract_batch(articles, escalate=True)
+    escalated = soup_service.escalated
+    escalation_stats.record(newspaper_id, static=len(articles_response), escalated=len(escalated))
+
+    if escalated:
+        log.log_info(f'Escalating {len(escalated)} of {len(articles)} articles to the browser')
+        articles_response.extend(extract_with_browser(article_config, escalated, publish))
+
+    return articles_response
+
+
+def group_by_newspaper(articles: List[ArticleRequest]) -> dict[int, list[ArticleRequest]]:
     grouped_articles_by_newspaper_id: dict[int, list[ArticleRequest]] = defaultdict(list)
 
     for article in articles:
         grouped_articles_by_newspaper_id[article.newspaper_id].append(article)
 
-    articles_response = []
+    return grouped_articles_by_newspaper_id
 
-    for newspaper_id in grouped_articles_by_newspaper_id:
 
-        article_config = find_article_configuration(newspaper_id)
-        execution_mode = article_config.get('doc').get('executionMode', 'selenium')
-        article_metadata_list = grouped_articles_by_newspaper_id.get(newspaper_id)
+def execution_mode_of(newspaper_id) -> str:
+    return find_article_configuration(newspaper_id).get('doc').get('executionMode', 'selenium')
 
-        if execution_mode == 'selenium':
-            ds = config.data_source
-            framework = ds.SELENIUM_FRAMEWORK
 
-            if framework == AutomationFramework.SELENIUMBASE.value:
+def extract_newspaper_batch(newspaper_id, article_metadata_list: List[ArticleRequest], publish: bool) -> list[dict]:
 
-                log.log_info('Use Seleniumbase to parse the articles')
-                sb = SeleniumBaseImp(article_config.get('doc'), can_publish=publish)
-                articles_response.extend(sb.extract_all(article_metadata_list))
+    article_metadata_list = dedup_index.drop_scraped(newspaper_id, article_metadata_list)
+    if not article_metadata_list:
+        return []
 
-            elif framework == AutomationFramework.SELENIUM.value:
+    article_config = find_article_configuration(newspaper_id)
+    execution_mode = article_config.get('doc').get('executionMode', 'selenium')
 
-                log.log_info('Use Selenium to parse the articles')
-                articles_response.extend(selenium_service.extract_batch(article_metadata_list, article_config.get('doc'),
-                                                               can_publish=publish))
+    if execution_mode == 'selenium':
 
-            elif framework == AutomationFramework.PLAYWRIGHT.value:
+        return extract_with_browser(article_config.get('doc'), article_metadata_list, publish)
 
-                log.log_info('Use playwright to parse the articles')
-                pw = PlaywrightServiceImp(article_config.get('doc'), can_publish=publish)
-                articles_response.extend(pw.extract_all(article_metadata_list))
+    elif execution_mode == 'no-selenium':
+
+        log.log_info('Use beautiful soup to parse the articles')
+        soup_service = ArticleSoupParser(config=article_config.get('doc'), can_publish=publish)
+        return soup_service.extract_batch(article_metadata_list)
 
-            else:
+    elif execution_mode == 'auto':
 
-                log.log_error("Unsupported automation framework configuration")
+        return extract_auto(article_config.get('doc'), article_metadata_list, publish)
 
-        elif execution_mode == 'no-selenium':
+    else:
 
-            log.log_info('Use beautiful soup to parse the articles')
-            soup_service = ArticleSoupParser(config=article_config.get('doc'), can_publish=publish)
-            articles_response.extend(soup_service.extract_batch(article_metadata_list))
+        log.log_error('Unsupported execution mode')
+        return []
 
-        else:
 
-            log.log_error('Unsupported execution mode')
+def extract_article_batch(articles: List[ArticleRequest], publish: bool):
+
+    articles_response = []
+
+    for newspaper_id, article_metadata_list in group_by_newspaper(articles).items():
+        articles_response.extend(extract_newspaper_batch(newspaper_id, article_metadata_list, publish))
 
     return articles_response
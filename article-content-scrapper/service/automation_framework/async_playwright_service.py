@@ -1,71 +1,631 @@
 import asyncio
-from playwright.async_api import async_playwright
-from playwright.sync_api import sync_playwright
+import json
+import os
+import queue
+import random
+import threading
+import time
+from typing import Iterator, List, Optional
+from urllib.parse import urlsplit, unquote
 
-# Define a semaphore to limit the number of concurrent tasks
-semaphore = asyncio.Semaphore(5)  # Limit to 5 concurrent tabs
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 
+from core.config import data_source as ds
+from exceptions.custom_exception import AuthenticationFailedException
+from interface.async_crawling import AsyncCrawling
+from logger import log
+from model.action import Action
+from model.article_request import ArticleRequest
+from service import db
+from service.utils.article_writer import article_writer
+from service.parser.article_sections import parse_element, parse_keyword_elements, parse_date
+from service.parser.html_document import load_document, precompile_selectors, LXML
+from service.parser.structured_data import document_structured_data
+from service.rabbit_mq import rabbit_mq as mq
+from service.utils import mail_utils, date_utils, bot_utils
+from service.utils.page_readiness import async_wait_until_ready, playwright_probe
+from service.utils.politeness import politeness, crawl_policy, domain_of, retry_after_seconds, CAPTCHA_JS
+from service.utils.resource_blocking import blocking_profile, block_this_load, blocking_stats, RouteBlocker, \
+    TransferCounter
 
-async def extract_info_from_webpage(page, url):
-    await page.goto(url)
 
-    elements = await page.query_selector_all('//h1[@data-cy="article-title"]')
-    texts = []
-    if elements:
-        for ele in elements:
-            text = await ele.inner_text()
-            texts.append(text)
-    return {
-        "header": ' '.join(texts)
+# Same patches as the SeleniumBase stealth mode, installed once per context instead of per page
+STEALTH_INIT_JS = """
+Object.defineProperty(navigator, 'webdriver', {get: () => undefined});
+Object.defineProperty(navigator, 'plugins', {
+    get: () => [
+        {name: 'Chrome PDF Plugin', filename: 'internal-pdf-viewer', description: 'Portable Document Format'},
+        {name: 'Chrome PDF Viewer', filename: 'mhjfbmdgcfjbbpaeojofohoefgiehjai', description: ''},
+        {name: 'Native Client', filename: 'internal-nacl-plugin', description: ''}
+    ]
+});
+Object.defineProperty(navigator, 'languages', {get: () => ['en-US', 'en']});
+const getParameter = WebGLRenderingContext.prototype.getParameter;
+WebGLRenderingContext.prototype.getParameter = function (parameter) {
+    if (parameter === 37445) { return 'NVIDIA Corporation'; }
+    if (parameter === 37446) { return 'NVIDIA GeForce RTX 3090/PCIe/SSE2'; }
+    return getParameter.call(this, parameter);
+};
+const originalQuery = window.navigator.permissions.query;
+window.navigator.permissions.query = function (parameters) {
+    if (parameters.name === 'notifications') {
+        return Promise.resolve({state: Notification.permission});
     }
+    return originalQuery(parameters);
+};
+"""
 
 
-def crawl_from_article(selectors, page):
-    texts = []
-    for s in selectors:
-        selector_query = s.get('name', '')
-        elements = await page.query_selector_all(selector_query)
-        if elements:
-            for ele in elements:
-                text = await ele.inner_text()
-                texts.append(text)
-            return ' '.join(texts)
-        else:
-            continue
-    return ' '
+class RenderedPage:
+    """
+    Outcome of rendering one article in a browser tab.
+    """
+
+    def __init__(self, article: ArticleRequest, html: Optional[str] = None, error: Optional[str] = None,
+                 elapsed: float = 0.0, captcha: bool = False):
+        self.article = article
+        self.html = html
+        self.error = error
+        self.elapsed = elapsed
+        self.captcha = captcha
+
+
+class AsyncBrowserEngine:
+    """
+    One Chromium instance driven by Playwright's async API on a dedicated event-loop thread.
+
+    Every newspaper gets its own browser context (cookies and login state stay apart) and renders its
+    articles as concurrent tabs, at most `tabs` per newspaper and `max_tabs` over the whole browser.
+    Contexts stay open across batches and are replaced after BROWSER_POOL_MAX_PAGES pages.
+    """
+
+    def __init__(self, max_tabs: int = 16, headless: bool = True):
+        self.max_tabs = max_tabs
+        self.headless = headless
+        self._playwright = None
+        self._browser: Optional[Browser] = None
+        self._contexts: dict[int, dict] = {}
+        self._context_locks: dict[int, asyncio.Lock] = {}
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._newspaper_semaphores: dict[int, tuple[int, asyncio.Semaphore]] = {}
+        self._tab_semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {'pages': 0, 'failed': 0, 'open_tabs': 0, 'elapsed': 0.0, 'browser_launches': 0}
+        self._stats_lock = threading.Lock()
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-browser-engine', daemon=True)
+        self._thread.start()
 
+    def render_all(self, crawler: 'AsyncPlaywrightServiceImp', articles: List[ArticleRequest],
+                   tabs: int) -> Iterator[RenderedPage]:
+        """
+        Render the articles of one newspaper concurrently; pages are yielded in completion order.
+        """
+        completed = queue.Queue()
+        futures = []
+        for article in articles:
+            future = asyncio.run_coroutine_threadsafe(self._render(crawler, article, tabs), self._loop)
+            future.add_done_callback(completed.put)
+            futures.append(future)
 
-def extract_articles_batch():
-    print('')
+        try:
+            for _ in futures:
+                yield completed.get().result()
+        finally:
+            # The caller stopped consuming; tabs that have not been opened yet are skipped
+            for future in futures:
+                future.cancel()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        finished = stats['pages'] + stats['failed']
+        stats['avg_elapsed'] = round(stats['elapsed'] / finished, 4) if finished else 0.0
+        stats['elapsed'] = round(stats['elapsed'], 4)
+        stats['contexts'] = len(self._contexts)
+        stats['max_tabs'] = self.max_tabs
+        return stats
 
+    def close(self) -> None:
+        if not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), self._loop).result(timeout=30)
+        except Exception as e:
+            log.log_error('Error occurred while closing the async browser engine.', e)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
 
-def fetch_articles_from_urls(article_metadata_list: list):
-    articles = []
-    print()
+    async def _render(self, crawler: 'AsyncPlaywrightServiceImp', article: ArticleRequest,
+                      tabs: int) -> RenderedPage:
+        if self._tab_semaphore is None:
+            self._tab_semaphore = asyncio.Semaphore(self.max_tabs)
 
+        domain = domain_of(article.url)
+        async with self._newspaper_semaphore(crawler.newspaper_id, tabs):
+            # Wait for the domain's politeness slot before taking a tab other newspapers could use
+            while (delay := politeness.delay(domain, crawler.crawl_policy)) > 0:
+                await asyncio.sleep(delay)
+            async with self._tab_semaphore:
+                result = await self._render_page(crawler, article, domain)
+
+        self._count(pages=int(result.error is None), failed=int(result.error is not None), elapsed=result.elapsed)
+        return result
+
+    async def _render_page(self, crawler: 'AsyncPlaywrightServiceImp', article: ArticleRequest,
+                           domain: str) -> RenderedPage:
+        started = time.perf_counter()
+        page, entry = None, None
+        self._count(open_tabs=1)
+        try:
+            entry = await self._context(crawler)
+            logins = entry['logins']
+            page = await entry['context'].new_page()
+            blocker = RouteBlocker(crawler.blocking_profile)
+            blocker.active = block_this_load(crawler.blocking_profile)
+            await page.route('**/*', blocker.handle)
+            transfer = TransferCounter()
+            page.on('requestfinished', transfer.on_request_finished)
 
-async def start_async():
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False)  # Launch a single browser instance
-        async with semaphore:
-            page = await browser.new_page()  # open a new tab
+            response = await page.goto(article.url, wait_until='domcontentloaded',
+                                       timeout=ds.PAGE_LOAD_TIMEOUT * 1000)
+            captcha = await self._report_politeness(crawler, domain, page, response)
+
+            if await crawler.is_article_protected(page):
+                await self._reauthenticate(crawler, entry, logins)
+                await page.goto(article.url, wait_until='domcontentloaded',
+                                timeout=ds.PAGE_LOAD_TIMEOUT * 1000)
+
+            await async_wait_until_ready(playwright_probe(page), crawler.config, article.url)
+            blocking_stats.record(crawler.newspaper_id, blocker.active,
+                                  await transfer.async_transferred_bytes(), time.perf_counter() - started)
+            result = RenderedPage(article, html=await page.content(), elapsed=time.perf_counter() - started,
+                                  captcha=captcha)
+        except Exception as e:
+            result = RenderedPage(article, error=f'{type(e).__name__}: {e}',
+                                  elapsed=time.perf_counter() - started)
+        finally:
+            self._count(open_tabs=-1)
+            if page is not None:
+                await self._close_quietly(page)
+            if entry is not None:
+                await self._release_context(entry)
+
+        return result
+
+    async def _reauthenticate(self, crawler: 'AsyncPlaywrightServiceImp', entry: dict, logins: int) -> None:
+        # Tabs finding the session expired queue on the context lock; only the first one logs in again, the
+        # others see the login it recorded and just reload their article
+        async with self._context_locks[crawler.newspaper_id]:
+            if entry['logins'] != logins:
+                return
+
+            page = await entry['context'].new_page()
             try:
-                value = await extract_info_from_webpage(page,
-                                                        'https://fortune.com/2025/02/27/openai-gpt-4-5-orion-launch-sam-altman-benchmarks/')
-                print(value)
-            except Exception as e:
-                print(e)
+                auth_status = (await crawler.handle_site_auth(page)).get('authenticate_status')
+            finally:
+                await self._close_quietly(page)
+            if not auth_status:
+                raise AuthenticationFailedException(f'session of {crawler.newspaper_name} expired and the login failed')
+            entry['logins'] += 1
+
+    @staticmethod
+    async def _report_politeness(crawler: 'AsyncPlaywrightServiceImp', domain: str, page: Page, response) -> bool:
+        status_code = retry_after = None
+        if response is not None:
+            status_code = response.status
+            retry_after = retry_after_seconds(await response.header_value('retry-after'))
+        captcha = await page.evaluate(CAPTCHA_JS, list(crawler.crawl_policy.captcha_markers))
+        politeness.report(domain, status_code, retry_after, captcha=captcha)
+        return captcha
+
+    async def _ensure_browser(self) -> Browser:
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return self._browser
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+            self._contexts.clear()
+            self._browser = await self._playwright.chromium.launch(headless=self.headless)
+            self._count(browser_launches=1)
+            log.log_info('[AsyncBrowserEngine] Launched chromium')
+            return self._browser
+
+    async def _context(self, crawler: 'AsyncPlaywrightServiceImp') -> dict:
+        # Only ever called on the loop thread; the lock keeps concurrent tabs from logging in twice
+        lock = self._context_locks.setdefault(crawler.newspaper_id, asyncio.Lock())
+        async with lock:
+            browser = await self._ensure_browser()
+            entry = self._contexts.get(crawler.newspaper_id)
+
+            if entry is not None and entry['pages'] >= ds.BROWSER_POOL_MAX_PAGES:
+                log.log_info(f'[AsyncBrowserEngine] Recycling context of {crawler.newspaper_id} '
+                             f'after {entry["pages"]} pages')
+                # Tabs still rendering on the old context close it when they finish
+                entry['retired'] = True
+                if entry['active'] == 0:
+                    await self._close_quietly(entry['context'])
+                entry = None
+
+            if entry is None:
+                entry = {'context': await crawler.new_context(browser), 'pages': 0, 'active': 0, 'retired': False,
+                         'logins': 0}
+                self._contexts[crawler.newspaper_id] = entry
+
+            entry['pages'] += 1
+            entry['active'] += 1
+            return entry
+
+    async def _release_context(self, entry: dict):
+        entry['active'] -= 1
+        if entry['retired'] and entry['active'] == 0:
+            await self._close_quietly(entry['context'])
+
+    def _newspaper_semaphore(self, newspaper_id: int, tabs: int) -> asyncio.Semaphore:
+        entry = self._newspaper_semaphores.get(newspaper_id)
+        if entry is None or entry[0] != tabs:
+            entry = (tabs, asyncio.Semaphore(tabs))
+            self._newspaper_semaphores[newspaper_id] = entry
+        return entry[1]
+
+    async def _aclose(self):
+        for entry in self._contexts.values():
+            await self._close_quietly(entry['context'])
+        self._contexts.clear()
+        if self._browser is not None:
+            await self._close_quietly(self._browser)
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    @staticmethod
+    async def _close_quietly(target) -> None:
+        try:
+            await target.close()
+        except Exception as e:
+            log.log_warning(f'[AsyncBrowserEngine] Error while closing {type(target).__name__}: {e}')
+
+    def _count(self, **values):
+        with self._stats_lock:
+            for key, value in values.items():
+                self._stats[key] += value
+
+
+_engine: Optional[AsyncBrowserEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_async_browser_engine() -> AsyncBrowserEngine:
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncBrowserEngine(max_tabs=ds.ASYNC_PLAYWRIGHT_MAX_TABS, headless=ds.HEADLESS)
+        return _engine
+
+
+def async_browser_stats() -> dict:
+    return _engine.stats() if _engine is not None else {}
+
+
+def close_async_browser() -> None:
+    global _engine
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
+
+
+class AsyncPlaywrightServiceImp(AsyncCrawling):
+    """
+    Crawls a newspaper's articles concurrently as tabs of the shared `AsyncBrowserEngine`.
+
+    Tabs only render: once a page is ready its HTML is handed back to the calling thread and parsed with
+    the compiled selectors of the no-selenium mode, so extraction never holds a tab open. The sections
+    (`header`, `body`, ...) therefore read from the parsed document, while the page actions used by the
+    login flow (`handle_site_auth`, `enter_text`, `click_element`, ...) are coroutines run on the engine loop.
+    The number of tabs per newspaper comes from the `browserTabs` config key.
+    """
+
+    cur_dir: str
+    session_storage_path: str
+    newspaper_id: int
+    article_id: int
+    article_url: str
+    newspaper_name: str
+    config: dict
+    can_publish: bool
+    lang: str
+    missing_configuration: set
+    alert: bool = False
+    affected_articles: []
+    article: ArticleRequest
+
+    def __init__(self, config: dict, can_publish: bool):
+        self.config = config
+        self.can_publish = can_publish
+        self.newspaper_name = config.get('name', '')
+        self.newspaper_id = config.get('newspaperID')
+        self.lang = config.get('language')
+        self.cur_dir = os.path.dirname(__file__)
+        self.session_storage_path = os.path.join(os.path.dirname(os.path.dirname(self.cur_dir)), 'session_storage')
+        self.tabs = int(config.get('browserTabs') or ds.ASYNC_PLAYWRIGHT_TABS_PER_NEWSPAPER)
+        self.missing_configuration = set()
+        self.affected_articles = []
+        self._missing = set()
+        self.blocking_profile = blocking_profile(config)
+        self.crawl_policy = crawl_policy(config)
+        precompile_selectors(config)
+
+    async def automation_tool_config(self, driver) -> None:
+        context: BrowserContext = driver
+        context.set_default_timeout(ds.EXPLICIT_WAIT * 1000)
+        context.set_default_navigation_timeout(ds.PAGE_LOAD_TIMEOUT * 1000)
+
+    def extract_info_from_webpage(self, driver) -> dict | None:
+        if driver is None:
+            return None
+
+        try:
+            self._missing = set()
+            structured = document_structured_data(self.config, driver)
+            header_value = structured.get('header') or self.header(self.config.get('header'), driver)
+            body_value = structured.get('body') or self.body(self.config.get('body'), driver)
+            author_value = structured.get('author') or self.author(self.config.get('author'), driver)
+            if structured.get('date'):
+                parsed_date = date = structured['date']
+            else:
+                parsed_date, date = self.parse_date(self.config.get('date'), driver)
+            keywords = structured.get('keywords') or \
+                self.crawl_keywords_from_article(self.config.get('keywords'), 'keywords', driver)
+
+            if self._missing:
+                self.missing_configuration.update(self._missing)
+                self.affected_articles.append({"article_id": self.article_id, "article_url": self.article_url})
+                self.alert = True
 
+            return {
+                'header': header_value,
+                'body': body_value,
+                'author': author_value,
+                'date': date,
+                'std_date': parsed_date,
+                'language': self.lang,
+                'newspaper_id': self.newspaper_id,
+                'keywords': keywords
+            }
+        except Exception as e:
+            log.log_error('Error occurred while crawling into ', e)
+            return None
+
+    def process_captcha(self):
+        log.log_info("Not yet implement captcha handler")
+
+    def authenticate_user(self):
+        log.log_info("Not yet implement user authentication")
+
+    def crawl_from_article(self, selectors: dict, section_name: str, driver) -> str:
+        return parse_element(section_name, self.config, driver, self.article_url, self._missing)
+
+    def crawl_keywords_from_article(self, selectors: dict, section_name: str, driver) -> List[str]:
+        return parse_keyword_elements(section_name, self.config, driver, self.article_url)
+
+    def crawl_date_from_article(self, selectors: dict, section_name: str, driver) -> dict:
+        std_date, date = parse_date(section_name, self.config, driver, self.article_url, self._missing)
+        return {'date': date, 'std_date': std_date}
+
+    def header(self, selectors: dict, driver) -> str:
+        return self.crawl_from_article(selectors, 'header', driver)
 
-# asyncio.run(start_async())
-def start_sync():
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False)  # Launch a single browser instance
-        page = browser.new_page()  # open a new tab
+    def body(self, selectors: dict, driver) -> str:
+        return self.crawl_from_article(selectors, 'body', driver)
+
+    def author(self, selectors: dict, driver) -> str:
+        return self.crawl_from_article(selectors, 'author', driver)
+
+    def parse_date(self, selectors: dict, driver) -> tuple[str, str]:
+        output = self.crawl_date_from_article(selectors, 'date', driver)
+        return output.get('std_date'), output.get('date')
+
+    def extract(self, url: str) -> dict | None:
+        # Like the other Playwright crawler, a bare URL is extracted and published but not stored
+        article = ArticleRequest(newspaper_id=self.newspaper_id, date=None, url=url, article_id=0)
+        results = self._extract(articles=[article], store=False)
+        return results[0] if results else None
+
+    def extract_all(self, articles: List[ArticleRequest]) -> List[dict]:
+        return self._extract(articles=articles, store=True)
+
+    def _extract(self, articles: List[ArticleRequest], store: bool) -> List[dict]:
+        log.log_separator()
+        results = []
         try:
-            value = await extract_info_from_webpage(page,
-                                                    'https://fortune.com/2025/02/27/openai-gpt-4-5-orion-launch-sam-altman-benchmarks/')
-            print(value)
+            self.alert = False
+
+            for rendered in get_async_browser_engine().render_all(self, articles, self.tabs):
+                article = rendered.article
+                if rendered.error:
+                    log.log_error(f"Failed to render '{article.url}' ({rendered.elapsed:.2f}s): {rendered.error}")
+                    continue
+                if rendered.captcha:
+                    log.log_warning(f"CAPTCHA / bot challenge page served for URL {article.url}")
+                    continue
+
+                log.log_info(f"Started crawling URL - '{article.url}' ({rendered.elapsed:.2f}s render)")
+                self.article_id = article.article_id
+                self.article_url = article.url
+                self.article = article
+
+                article_info = self.extract_info_from_webpage(load_document(rendered.html, LXML))
+                if article_info is None:
+                    continue
+
+                if self._missing:
+                    # Save the page source for debugging
+                    bot_utils.save_as_html(page_source=rendered.html, article=article)
+
+                article_info['article_id'] = article.article_id
+                article_info['preamble'] = article.preamble
+                article_info['sector'] = article.sector
+                article_info['link'] = article.url
+
+                # Queued for the batched database write.
+                if store:
+                    article_writer.add(article_info, complete=not self._missing)
+
+                if self.can_publish:
+                    mq.publish_message_into_article_analyzer(json.dumps(article_info))
+
+                results.append(article_info)
+                log.log_separator()
+
+            if self.alert:
+                context = {
+                    "newspaper_id": self.newspaper_id,
+                    "newspaper_name": self.newspaper_name,
+                    "missing_config": self.missing_configuration,
+                    "articles": self.affected_articles,
+                    "year": date_utils.current_year()
+                }
+                mail_utils.config_missing_alert(context)
+
+            return results
         except Exception as e:
-            print(e)
-            
\ No newline at end of file
+            log.log_error('Error occurred while extracting', exception=e)
+            return results
+        finally:
+            log.log_application_end()
+
+    async def new_context(self, browser: Browser) -> BrowserContext:
+        """
+        Open the newspaper's browser context, restoring the stored session or logging in when required.
+        """
+        session_storage_file = self._session_storage_file()
+        storage_state = session_storage_file if os.path.exists(session_storage_file) else None
+
+        context = await browser.new_context(storage_state=storage_state,
+                                            user_agent=self.generate_chrome_user_agent(),
+                                            proxy=self._context_proxy())
+        await self.automation_tool_config(context)
+        await self.stealth_mode(context)
+        if self.config.get('login') == 1 and storage_state is None:
+            page = await context.new_page()
+            try:
+                auth_status = (await self.handle_site_auth(page)).get('authenticate_status')
+            finally:
+                await page.close()
+            if not auth_status:
+                await context.close()
+                raise AuthenticationFailedException('Authentication failed')
+
+        return context
+
+    async def handle_site_auth(self, driver) -> dict:
+        page: Page = driver
+        auth_config = self.config.get('authConfig', {})
+
+        if auth_config:
+            log.log_info('Start site authentication process.')
+
+            try:
+                await page.goto(auth_config.get('loginUrl'))
+
+                # The credential lookup is a blocking database call; keep it off the engine loop
+                credential = await asyncio.to_thread(self.fetch_auth_credentials, self.newspaper_id) or {}
+                steps = auth_config.get('steps', {})
+                if isinstance(steps, dict):
+                    # Legacy configs key the steps by credential field
+                    steps = [dict(step, key=step.get('key', k)) for k, step in steps.items()]
+
+                for step in sorted(steps, key=lambda x: x.get('step', 0)):
+                    step_action = step.get('action')
+
+                    if step_action == Action.TYPE.value:
+                        await self.enter_text(step.get('type'), step.get('name'),
+                                              credential.get(step.get('key'), ''), page)
+                    elif step_action == Action.CLICK.value:
+                        await self.click_element(step.get('type'), step.get('name'), page)
+                    else:
+                        log.log_warning(f"configured '{step.get('key')}' action in authentication config is not "
+                                        f"supported")
+                        return {'authenticate_status': False}
+
+                # Save storage state into the file.
+                await page.context.storage_state(path=self._session_storage_file())
+                return {'authenticate_status': True}
+
+            except Exception as auth_err:
+                log.log_error(f'Error occurred while trying to sign in to the {self.newspaper_name} site', auth_err)
+        else:
+            log.log_warning('Missing Authenticate configuration.')
+
+        return {'authenticate_status': False}
+
+    def fetch_auth_credentials(self, newspaper_id: int) -> dict:
+        return db.fetch_newspaper_credential(newspaper_id)
+
+    async def enter_text(self, locator_type: str, locator: str, text: str, driver) -> None:
+        await driver.fill(self._playwright_selector(locator_type, locator), text)
+
+    async def click_element(self, locator_type: str, locator: str, driver) -> None:
+        await driver.locator(self._playwright_selector(locator_type, locator)).click(timeout=2000)
+
+    async def wait(self, locator_type: str, locator: str, driver) -> None:
+        await driver.wait_for_selector(self._playwright_selector(locator_type, locator))
+
+    async def page_action(self, locator_type: str, locator: str, duration: int, driver) -> None:
+        page: Page = driver
+        x, y = 100, 100
+        await page.mouse.move(x, y)
+
+        # Random movements within the viewport, spread over the given duration
+        num_movements = 3
+        for _ in range(num_movements):
+            x = max(0, x + random.randint(-100, 100))
+            y = max(0, y + random.randint(-100, 100))
+            try:
+                await page.mouse.move(x, y, steps=10)
+                await asyncio.sleep(duration / num_movements)
+            except Exception as e:
+                log.log_warning(f'Mouse movement failed: {e}')
+
+    async def is_article_protected(self, driver) -> bool:
+        if self.config.get('login') != 1:
+            return False
+
+        site_identifier_locator = self.config.get('authConfig', {}).get('siteIdentifier', {}).get('name', None)
+        if not site_identifier_locator:
+            log.log_warning('Site Identifier configuration is missing.')
+            return False
+
+        return await driver.locator(site_identifier_locator).count() > 0
+
+    async def stealth_mode(self, driver) -> None:
+        # Runs before the scripts of every page of the context
+        await driver.add_init_script(STEALTH_INIT_JS)
+
+    def _context_proxy(self) -> Optional[dict]:
+        if self.config.get('useIpProxy') != 1 or not getattr(ds, 'PROXY_ENABLED', False):
+            return None
+
+        proxy = bot_utils.get_random_proxy()
+        if not proxy:
+            log.log_warning('[AsyncPlaywright] Proxy enabled but no proxy available.')
+            return None
+
+        log.log_info(f'[AsyncPlaywright] Using proxy: {proxy}')
+        parts = urlsplit(proxy if '://' in proxy else f'http://{proxy}')
+        server = f'{parts.scheme}://{parts.hostname}' + (f':{parts.port}' if parts.port else '')
+        if parts.username is None:
+            return {'server': server}
+        # Playwright takes the proxy credentials separately from the server address
+        return {'server': server, 'username': unquote(parts.username), 'password': unquote(parts.password or '')}
+
+    def _session_storage_file(self) -> str:
+        return os.path.join(self.session_storage_path, f"{self.newspaper_id}_{self.newspaper_name}.json")
+
+    @staticmethod
+    def _playwright_selector(locator_type: str, locator: str) -> str:
+        return f'xpath={locator}' if locator_type == 'xpath' else locator
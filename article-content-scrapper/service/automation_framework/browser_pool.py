@@ -0,0 +1,230 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from core.config import data_source as ds
+from logger import log
+
+JS_HEAP_SIZE_SCRIPT = 'return (performance.memory && performance.memory.usedJSHeapSize) || 0;'
+
+
+@dataclass
+class PooledBrowser:
+    key: Any
+    driver: Any
+    close: Callable[[], None]
+    created_at: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    pages: int = 0
+    # Per-browser state kept by the crawlers across checkouts (e.g. installed route handlers)
+    state: dict = field(default_factory=dict)
+
+
+class BrowserPool:
+    """
+    Warm browsers kept per newspaper across consumer messages, so browser launch, stealth setup and site
+    login are paid once per browser instead of once per batch.
+
+    `checkout` hands out an idle browser of the newspaper (health checked) or launches one through the given
+    `launch` callable, which returns the driver and a function closing it. On return a browser is recycled
+    once it served `max_pages` pages or its JS heap exceeds `max_js_heap_mb`; a browser whose use raised is
+    always discarded, since its state is unknown. Idle browsers are closed after `idle_seconds`, and when
+    more than `max_browsers` are open the least recently used idle one is closed first.
+
+    Thread-affine pools (Playwright's sync API) only hand a browser back to the thread that launched it.
+    """
+
+    def __init__(self, name: str,
+                 health_check: Callable[[Any], bool],
+                 js_heap_size: Callable[[Any], int],
+                 thread_affine: bool = False):
+        self.name = name
+        self.health_check = health_check
+        self.js_heap_size = js_heap_size
+        self.thread_affine = thread_affine
+        self._idle: dict[Any, list[PooledBrowser]] = {}
+        self._in_use: dict[Any, int] = {}
+        self._condition = threading.Condition()
+        self._stats = {'launched': 0, 'reused': 0, 'recycled': 0, 'discarded': 0, 'reaped': 0}
+
+    @contextmanager
+    def checkout(self, key, launch: Callable[[], tuple[Any, Callable[[], None]]]):
+        browser = self._acquire(self._pool_key(key), launch)
+        try:
+            yield browser
+        except Exception:
+            self._discard(browser, 'error during use')
+            raise
+        else:
+            self._release(browser)
+
+    def stats(self) -> dict:
+        with self._condition:
+            stats = dict(self._stats)
+            stats['idle'] = sum(len(browsers) for browsers in self._idle.values())
+            stats['in_use'] = sum(self._in_use.values())
+        return stats
+
+    def close_all(self) -> None:
+        with self._condition:
+            browsers = [browser for idle in self._idle.values() for browser in idle]
+            self._idle.clear()
+        for browser in browsers:
+            # Browsers of other threads go down with their driver when the process exits
+            if not self.thread_affine or browser.key[0] == threading.get_ident():
+                self._close(browser)
+
+    def _pool_key(self, key):
+        return (threading.get_ident(), key) if self.thread_affine else key
+
+    def _acquire(self, pool_key, launch) -> PooledBrowser:
+        self._reap_idle()
+        deadline = time.monotonic() + ds.BROWSER_POOL_CHECKOUT_TIMEOUT
+
+        with self._condition:
+            while True:
+                idle = self._idle.get(pool_key)
+                if idle:
+                    browser = idle.pop()
+                    self._in_use[pool_key] = self._in_use.get(pool_key, 0) + 1
+                    break
+                if self._in_use.get(pool_key, 0) < ds.BROWSER_POOL_SIZE_PER_NEWSPAPER:
+                    browser = None
+                    self._in_use[pool_key] = self._in_use.get(pool_key, 0) + 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f'No {self.name} browser available for {pool_key} '
+                                       f'within {ds.BROWSER_POOL_CHECKOUT_TIMEOUT}s')
+                self._condition.wait(remaining)
+
+        if browser is not None:
+            if self._is_healthy(browser):
+                browser.last_used = time.monotonic()
+                self._count('reused')
+                return browser
+            self._close(browser)
+            self._count('discarded')
+
+        self._make_room()
+        try:
+            driver, close = launch()
+        except Exception:
+            self._release_slot(pool_key)
+            raise
+        self._count('launched')
+        log.log_info(f'[BrowserPool] Launched {self.name} browser for {pool_key}')
+        return PooledBrowser(key=pool_key, driver=driver, close=close)
+
+    def _release(self, browser: PooledBrowser) -> None:
+        reason = self._recycle_reason(browser)
+        if reason:
+            log.log_info(f'[BrowserPool] Recycling {self.name} browser for {browser.key}: {reason}')
+            self._close(browser)
+            self._count('recycled')
+            self._release_slot(browser.key)
+            return
+
+        browser.last_used = time.monotonic()
+        with self._condition:
+            self._idle.setdefault(browser.key, []).append(browser)
+            self._in_use[browser.key] -= 1
+            self._condition.notify_all()
+
+    def _discard(self, browser: PooledBrowser, reason: str) -> None:
+        log.log_warning(f'[BrowserPool] Discarding {self.name} browser for {browser.key}: {reason}')
+        self._close(browser)
+        self._count('discarded')
+        self._release_slot(browser.key)
+
+    def _release_slot(self, pool_key) -> None:
+        with self._condition:
+            self._in_use[pool_key] -= 1
+            self._condition.notify_all()
+
+    def _recycle_reason(self, browser: PooledBrowser) -> Optional[str]:
+        if browser.pages >= ds.BROWSER_POOL_MAX_PAGES:
+            return f'served {browser.pages} pages'
+        try:
+            heap_mb = self.js_heap_size(browser.driver) / (1024 * 1024)
+        except Exception:
+            return 'unresponsive'
+        if heap_mb > ds.BROWSER_POOL_MAX_JS_HEAP_MB:
+            return f'JS heap at {heap_mb:.0f} MB'
+        return None
+
+    def _is_healthy(self, browser: PooledBrowser) -> bool:
+        try:
+            return bool(self.health_check(browser.driver))
+        except Exception:
+            return False
+
+    def _reap_idle(self) -> None:
+        now = time.monotonic()
+        expired = []
+        with self._condition:
+            for pool_key, idle in self._idle.items():
+                # Thread-affine browsers can only be closed by their own thread
+                if self.thread_affine and pool_key[0] != threading.get_ident():
+                    continue
+                keep = [b for b in idle if now - b.last_used < ds.BROWSER_POOL_IDLE_SECONDS]
+                expired.extend(b for b in idle if now - b.last_used >= ds.BROWSER_POOL_IDLE_SECONDS)
+                idle[:] = keep
+        for browser in expired:
+            self._close(browser)
+            self._count('reaped')
+
+    def _make_room(self) -> None:
+        with self._condition:
+            open_browsers = sum(len(b) for b in self._idle.values()) + sum(self._in_use.values())
+            if open_browsers <= ds.BROWSER_POOL_MAX_BROWSERS:
+                return
+            candidates = [b for idle in self._idle.values() for b in idle
+                          if not self.thread_affine or b.key[0] == threading.get_ident()]
+            if not candidates:
+                return
+            oldest = min(candidates, key=lambda b: b.last_used)
+            self._idle[oldest.key].remove(oldest)
+        self._close(oldest)
+        self._count('reaped')
+
+    def _close(self, browser: PooledBrowser) -> None:
+        try:
+            browser.close()
+        except Exception as e:
+            log.log_warning(f'[BrowserPool] Error while closing {self.name} browser for {browser.key}: {e}')
+
+    def _count(self, key: str) -> None:
+        with self._condition:
+            self._stats[key] += 1
+
+
+def _selenium_health(sb) -> bool:
+    return sb.driver.execute_script('return 1;') == 1
+
+
+def _selenium_js_heap(sb) -> int:
+    return sb.driver.execute_script(JS_HEAP_SIZE_SCRIPT) or 0
+
+
+def _playwright_health(page) -> bool:
+    return not page.is_closed() and page.evaluate('1') == 1
+
+
+def _playwright_js_heap(page) -> int:
+    return page.evaluate(f'() => {{ {JS_HEAP_SIZE_SCRIPT} }}') or 0
+
+
+seleniumbase_pool = BrowserPool('seleniumbase', _selenium_health, _selenium_js_heap)
+playwright_pool = BrowserPool('playwright', _playwright_health, _playwright_js_heap, thread_affine=True)
+
+
+def browser_pool_stats() -> dict:
+    return {pool.name: pool.stats() for pool in (seleniumbase_pool, playwright_pool)}
+
+
+def close_browser_pools() -> None:
+    for pool in (seleniumbase_pool, playwright_pool):
+        pool.close_all()
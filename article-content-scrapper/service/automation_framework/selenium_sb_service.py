@@ -1,5 +1,4 @@
 import json
-import time
 import os
 from typing import List
 
@@ -10,6 +9,7 @@ from model.article_request import ArticleRequest
 from service.utils import extract_date, get_matched_datetime_value, save_as_html
 from model.action import Action
 from logger import log
+from service.utils.page_readiness import wait_until_ready, selenium_probe
 from service.rabbit_mq import rabbit_mq as mq
 
 cur_dir = os.path.dirname(__file__)
@@ -180,7 +180,7 @@ def extract(url, config, can_publish: bool):
         log.log_info('Initializing seleniumbase for web crawling.')
         with SB(uc=True) as sb:
             sb.uc_open_with_reconnect(url, 2)
-            time.sleep(10)
+            wait_until_ready(selenium_probe(sb), config, url)
             if config.get('login') == 1:
                 auth_status = handle_site_auth(config, sb).get('authenticate_status')
                 if auth_status:
@@ -215,7 +215,7 @@ def extract_batch(articles: List[ArticleRequest], config, can_publish: bool):
                     for article in articles:
                         log.log_info(f"Started crawling URL - '{article.url}'")
                         sb.uc_open_with_reconnect(article.url, 2)
-                        time.sleep(10)
+                        wait_until_ready(selenium_probe(sb), config, article.url)
                         article_info = extract_info_from_webpage(config, sb)
                         article_info['article_id'] = article.article_id
                         article_info['preamble'] = article.preamble
@@ -231,7 +231,7 @@ def extract_batch(articles: List[ArticleRequest], config, can_publish: bool):
                 for article in articles:
                     log.log_info(f"Started crawling URL - '{article.url}'")
                     sb.uc_open_with_reconnect(article.url, 2)
-                    time.sleep(10)
+                    wait_until_ready(selenium_probe(sb), config, article.url)
                     article_info = extract_info_from_webpage(config, sb)
                     article_info['article_id'] = article.article_id
                     article_info['preamble'] = article.preamble
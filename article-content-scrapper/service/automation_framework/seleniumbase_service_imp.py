@@ -2,7 +2,7 @@ import os
 import json
 import time
 import random
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 
 from seleniumbase import SB
@@ -12,10 +12,17 @@ from exceptions.custom_exception import AuthenticationFailedException
 from logger import log
 from model.action import Action
 from interface.crawling import Crawling
-from service.db import insert_article_data_into_db
+from service.utils.article_writer import article_writer
 from service.rabbit_mq import rabbit_mq as mq
 from model.article_request import ArticleRequest
 from service.utils import mail_utils, date_utils, bot_utils
+from service.utils.page_readiness import wait_until_ready, selenium_probe
+from service.utils.page_extraction import extraction_payload, selenium_extract, log_misses
+from service.parser.structured_data import structured_data_enabled, page_structured_data, STRUCTURED_DATA_JS
+from service.utils.resource_blocking import blocking_profile, block_this_load, apply_cdp_blocking, \
+    blocking_stats, cdp_transferred_bytes
+from service.automation_framework.browser_pool import seleniumbase_pool
+from service.utils.politeness import politeness, crawl_policy, domain_of, CAPTCHA_JS
 from selenium.webdriver.common.action_chains import ActionChains
 from service import db
 from core.config import data_source as ds
@@ -39,6 +46,7 @@ class SeleniumBaseImp(Crawling):
     excludes: []
     excludes_element: set
     can_save_article: bool
+    article_complete: bool
     affected_articles: []
     article: ArticleRequest
 
@@ -55,8 +63,14 @@ class SeleniumBaseImp(Crawling):
         self.excludes = config.get('excludes', [])
         self.exclude_elements_set = set()
         self.can_save_article = False
+        self.article_complete = False
         self.missing_configuration = set()
         self.affected_articles = []
+        in_page_extraction = config.get('inPageExtraction')
+        self.in_page_extraction = ds.IN_PAGE_EXTRACTION if in_page_extraction is None else bool(in_page_extraction)
+        self.extraction_payload = extraction_payload(config, structured=structured_data_enabled(config))
+        self.blocking_profile = blocking_profile(config)
+        self.crawl_policy = crawl_policy(config)
 
     def automation_tool_config(self, driver) -> None:
         raise NotImplementedError('yet to config')
@@ -65,13 +79,22 @@ class SeleniumBaseImp(Crawling):
         if driver:
             try:
                 self.can_save_article = False
-                self.exclude_elements(driver)
-                header_value = self.header(self.config.get('header'), driver)
-                body_value = self.body(self.config.get('body'), driver)
-                author_value = self.author(self.config.get('author'), driver)
-                parsed_date, date = self.parse_date(self.config.get('date'), driver)
-                keywords = self.keywords(self.config.get('keywords'), driver)
-
+                if self.in_page_extraction:
+                    header_value, body_value, author_value, parsed_date, date, keywords = \
+                        self.extract_sections_in_page(driver)
+                else:
+                    structured = self.structured_data(driver)
+                    self.exclude_elements(driver)
+                    header_value = structured.get('header') or self.header(self.config.get('header'), driver)
+                    body_value = structured.get('body') or self.body(self.config.get('body'), driver)
+                    author_value = structured.get('author') or self.author(self.config.get('author'), driver)
+                    if structured.get('date'):
+                        parsed_date = date = structured['date']
+                    else:
+                        parsed_date, date = self.parse_date(self.config.get('date'), driver)
+                    keywords = structured.get('keywords') or self.keywords(self.config.get('keywords'), driver)
+
+                self.article_complete = not self.can_save_article
                 if self.can_save_article:
                     # Save the page source for debugging
                     bot_utils.save_as_html(page_source=driver.get_page_source(), article=self.article)
@@ -95,6 +118,50 @@ class SeleniumBaseImp(Crawling):
         else:
             return None
 
+    def extract_sections_in_page(self, driver) -> tuple:
+        """
+        Evaluate every section (excludes included) with one script call instead of a WebDriver
+        round-trip per selector and element.
+        """
+        result = selenium_extract(driver, self.extraction_payload)
+        sections = result['sections']
+        structured = page_structured_data(self.config, result.get('structured'))
+        log_misses(sections, self.article_url)
+
+        for key, section_name in (('header', 'Article Header'), ('body', 'Article Body'),
+                                  ('author', 'Author'), ('date', 'Article Date')):
+            if not sections[key]['matched'] and not structured.get(key):
+                # Missing or Mismatching Configuration
+                self.missing_configuration.add(section_name)
+                self.can_save_article = True
+
+        if structured.get('date'):
+            # Already ISO 8601; no date regex or fuzzy parsing needed
+            parsed_date = date = structured['date']
+        else:
+            date = sections['date']['value'] or ' '
+            try:
+                value = date_utils.get_matched_datetime_value(self.config.get('dateRegex', []), date)
+                parsed_date = date_utils.extract_date(value if value else date)
+            except Exception as e:
+                log.log_error(f"Date-time parsing exception. Please check the format of the input: '{date}'.", e)
+                parsed_date = ''
+
+        return (structured.get('header') or sections['header']['value'],
+                structured.get('body') or sections['body']['value'],
+                structured.get('author') or sections['author']['value'],
+                parsed_date, date,
+                structured.get('keywords') or sections['keywords']['value'])
+
+    def structured_data(self, driver) -> dict:
+        if not structured_data_enabled(self.config):
+            return {}
+        try:
+            return page_structured_data(self.config, driver.execute_script(f'return ({STRUCTURED_DATA_JS})();'))
+        except Exception as e:
+            log.log_warning(f'Unable to read the structured metadata of {self.article_url}: {e}')
+            return {}
+
     def process_captcha(self):
         raise NotImplementedError('Captcha is not yet Implemented')
 
@@ -255,43 +322,112 @@ class SeleniumBaseImp(Crawling):
                           e)
             return '', output.get('date')
 
-    def extract(self, article: ArticleRequest) -> dict | None:
-        log.log_separator()
-        try:
-            log.log_info('Initializing seleniumbase for web crawling.')
+    def configure_proxy(self) -> Optional[str]:
+        """
+        Proxy of this newspaper's browser, passed to `SB(proxy=...)` so concurrent launches for other newspapers
+        keep their own.
+        """
+        # === Proxy Injection (Only if enabled) ===
+        if self.config.get('useIpProxy', 0) != 1:
+            return None
 
-            # === Proxy Injection (Only if enabled) ===
-            if self.config.get('useIpProxy', 0) == 1:
+        log.log_info("[Proxy Config] useIpProxy enabled via configuration.")
+        if not ds.PROXY_ENABLED:
+            log.log_warning("[APP Config] PROXY_ENABLED flag is disabled — skipping proxy injection.")
+            return None
 
-                log.log_info("[Proxy Config] useIpProxy enabled via configuration.")
+        proxy = bot_utils.get_random_proxy()
+        log.log_info(f"[Proxy Config] Proxy activated: {proxy}")
+        return proxy
 
-                if ds.PROXY_ENABLED:
-                    proxy = bot_utils.get_random_proxy()
-                    os.environ["SB_PROXY"] = proxy
-                    log.log_info(f"[Proxy Config] ✅ Proxy activated: {proxy}")
-                else:
-                    log.log_warning("[APP Config] 🔒 PROXY_ENABLED flag is disabled — skipping proxy injection.")
-            else:
-                os.environ.pop("SB_PROXY", None)  # Clear if disabled
+    def launch_browser(self):
+        """
+        Launch a SeleniumBase browser prepared for this newspaper (proxy, user agent, stealth and login)
+        for the browser pool. Returns the driver and the function closing it.
+        """
+        log.log_info('Initializing seleniumbase for web crawling.')
+        proxy = self.configure_proxy()
 
-            with SB(uc=True, browser='chrome', headless=False, ad_block_on=True, maximize=True) as sb:
+        # Ads are blocked over CDP with the resource blocking profile (`apply_cdp_blocking`); the CDP events feed
+        # the transferred bytes of the blocking comparison (`cdp_transferred_bytes`)
+        sb_context = SB(uc=True, browser='chrome', headless=False, maximize=True, proxy=proxy, log_cdp_events=True)
+        sb = sb_context.__enter__()
 
-                self.stealth_mode(sb)
-                # cookies = []
+        def close():
+            sb_context.__exit__(None, None, None)
 
-                if self.config.get('login') == 1:
-                    auth_status = self.handle_site_auth(sb).get('authenticate_status')
-                    # cookies = sb.get_cookies()
-                    if not auth_status:
-                        return None
+        try:
+            sb.driver.execute_cdp_cmd("Network.enable", {})
+            # Ads only until the first article load applies the profile; covers the login pages
+            apply_cdp_blocking(sb.driver, self.blocking_profile, False)
+            sb.driver.execute_cdp_cmd("Network.setUserAgentOverride", {
+                "userAgent": self.generate_chrome_user_agent(),
+                "platform": "Windows"
+            })
+
+            self.stealth_mode(sb)
+
+            if self.config.get('login') == 1:
+                auth_status = self.handle_site_auth(sb).get('authenticate_status')
+                if not auth_status:
+                    raise AuthenticationFailedException('Authentication failed')
+        except Exception:
+            close()
+            raise
+
+        return sb, close
+
+    def open_article(self, sb, url: str) -> bool:
+        """
+        Load the article under the newspaper's blocking profile and wait until it is ready; transferred
+        bytes and ready time are recorded for the blocking on / off comparison. The load waits for a
+        politeness slot of the domain and reports CAPTCHA pages back to it. Returns False for a CAPTCHA page.
+        """
+        blocked = block_this_load(self.blocking_profile)
+        apply_cdp_blocking(sb.driver, self.blocking_profile, blocked)
 
-                sb.uc_open_with_reconnect(article.url, 2)
+        try:
+            # Drop the events of the login and previous pages
+            cdp_transferred_bytes(sb.driver)
+        except Exception as e:
+            log.log_warning(f'Unable to reset the network events of the browser: {e}')
 
-                time.sleep(25)
+        domain = domain_of(url)
+        with politeness.slot(domain, self.crawl_policy):
+            started = time.monotonic()
+            # Responses received while the UC reconnect keeps the driver detached are not in the log
+            sb.uc_open_with_reconnect(url, 2)
+            wait_until_ready(selenium_probe(sb), self.config, url)
+            ready_seconds = time.monotonic() - started
 
-                # Set cookies before visiting the page again
-                # for cookie in cookies:
-                #     sb.driver.add_cookie(cookie)
+        try:
+            captcha = sb.execute_script(f'return ({CAPTCHA_JS})(arguments[0]);', list(self.crawl_policy.captcha_markers))
+        except Exception as e:
+            log.log_warning(f'Unable to check {url} for a CAPTCHA page: {e}')
+            captcha = False
+        politeness.report(domain, captcha=bool(captcha))
+
+        try:
+            transferred = cdp_transferred_bytes(sb.driver)
+        except Exception as e:
+            log.log_warning(f'Unable to read the transferred bytes of {url}: {e}')
+            transferred = 0
+        blocking_stats.record(self.newspaper_id, blocked, transferred, ready_seconds)
+
+        if captcha:
+            log.log_warning(f"CAPTCHA / bot challenge page served for URL {url}")
+        return not captcha
+
+    def extract(self, article: ArticleRequest) -> dict | None:
+        log.log_separator()
+        try:
+            with seleniumbase_pool.checkout(self.newspaper_id, self.launch_browser) as browser:
+                sb = browser.driver
+
+                opened = self.open_article(sb, article.url)
+                browser.pages += 1
+                if not opened:
+                    return None
 
                 self.alert = False
                 self.article_id = article.article_id
@@ -305,8 +441,8 @@ class SeleniumBaseImp(Crawling):
                 article_info['sector'] = article.sector
                 article_info['link'] = article.url
 
-                # Inserting into database.
-                insert_article_data_into_db(article_info)
+                # Queued for the batched database write.
+                article_writer.add(article_info, complete=self.article_complete)
 
                 if self.can_publish:
                     mq.publish_message_into_article_analyzer(json.dumps(article_info))
@@ -330,53 +466,18 @@ class SeleniumBaseImp(Crawling):
     def extract_all(self, articles: List[ArticleRequest]) -> List[dict]:
         log.log_separator()
         try:
-            log.log_info('Initializing seleniumbase for web crawling.')
             article_extracted_output = []
 
-            USER_AGENT = self.generate_chrome_user_agent()
-
-            # === Proxy Injection (Only if enabled) ===
-            if self.config.get('useIpProxy', 0) == 1:
-
-                log.log_info("[Proxy Config] useIpProxy enabled via configuration.")
-
-                if ds.PROXY_ENABLED:
-                    proxy = bot_utils.get_random_proxy()
-                    os.environ["SB_PROXY"] = proxy
-                    log.log_info(f"[Proxy Config] Proxy activated: {proxy}")
-                else:
-                    log.log_warning("[APP Config] PROXY_ENABLED flag is disabled — skipping proxy injection.")
-            else:
-                os.environ.pop("SB_PROXY", None)  # Clear if disabled
-
-            with SB(uc=True, browser='chrome', headless=False,
-                    ad_block_on=True, maximize=True, ) as sb:
-
-                sb.driver.execute_cdp_cmd("Network.enable", {})
-                sb.driver.execute_cdp_cmd("Network.setUserAgentOverride", {
-                    "userAgent": USER_AGENT,
-                    "platform": "Windows"
-                })
-
-                self.stealth_mode(sb)
-
-                if self.config.get('login') == 1:
-                    auth_status = self.handle_site_auth(sb).get('authenticate_status')
-                    if not auth_status:
-                        raise AuthenticationFailedException('Authentication failed')
-
+            with seleniumbase_pool.checkout(self.newspaper_id, self.launch_browser) as browser:
+                sb = browser.driver
                 self.alert = False
 
-                first = True
-
                 for article in articles:
                     log.log_info(f"Started crawling URL - '{article.url}'")
-                    sb.uc_open_with_reconnect(article.url, 2)
-
-                    if first:
-                        time.sleep(20)
-                        first = False
-                    time.sleep(10)
+                    opened = self.open_article(sb, article.url)
+                    browser.pages += 1
+                    if not opened:
+                        continue
 
                     self.article_id = article.article_id
                     self.article_url = article.url
@@ -389,8 +490,8 @@ class SeleniumBaseImp(Crawling):
                     article_info['sector'] = article.sector
                     article_info['link'] = article.url
 
-                    # Inserting into database.
-                    insert_article_data_into_db(article_info)
+                    # Queued for the batched database write.
+                    article_writer.add(article_info, complete=self.article_complete)
 
                     if self.can_publish:
                         mq.publish_message_into_article_analyzer(json.dumps(article_info))
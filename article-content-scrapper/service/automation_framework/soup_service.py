@@ -1,22 +1,29 @@
 import json
 import traceback
 from datetime import datetime, timezone
+from functools import partial
 from typing import List
 
-import certifi
-import requests
-import pycurl
-from bs4 import BeautifulSoup
 
 from exceptions.custom_exception import InvalidArgumentsException
 from logger import log
 from model.article_request import ArticleRequest
+from model.fetch import FetchRequest, FetchResult
 from model.system_error_mail import SysErrorModel
 from service.utils import mail_utils, date_utils, bot_utils
 from service.rabbit_mq import rabbit_mq as mq
 from core.config import data_source as ds
-from service.db import upsert_into_failed_articles, insert_article_data_into_db
-from service.utils.bot_utils import fetch_failed_article_html
+from service.db import upsert_into_failed_articles
+from service.utils.article_writer import article_writer
+from service.utils.bot_utils import iter_failed_article_html
+from service.utils.page_store import failed_page_store
+from service.fetcher.fetch_backends import get_fetcher
+from service.utils.politeness import politeness, crawl_policy, domain_of, is_captcha, retry_after_seconds
+from service.parser.article_sections import parse_article_sections
+from service.parser.html_document import load_document, precompile_selectors, LXML
+
+# Sections without which a static page is escalated to the browser in `auto` execution mode
+REQUIRED_SECTIONS = {'header', 'body'}
 
 
 class ArticleSoupParser:
@@ -31,6 +38,7 @@ class ArticleSoupParser:
     excludes: []
     excludes_element: set
     can_save_article: bool
+    article_complete: bool
     affected_articles: []
     article: ArticleRequest
     is_article_resolved: bool
@@ -41,106 +49,124 @@ class ArticleSoupParser:
         self.newspaper_name = config.get('name', '')
         self.newspaper_id = config.get('newspaperID')
         self.can_save_article = False
+        self.article_complete = False
         self.missing_configuration = set()
         self.affected_articles = []
+        self.escalated = []
         self.alert: bool = False
-
-    @staticmethod
-    def create_curl_instance():
-        try:
-            c = pycurl.Curl()
-            return c
-        except Exception as err:
-            log.log_error('Error occurred while instantiating CURL.', err)
-            return None
-
-    @staticmethod
-    def close_curl(pycurl_obj):
-        if pycurl_obj:
-            pycurl_obj.close()
+        self.fetcher = get_fetcher(config.get('fetchBackend'))
+        self.crawl_policy = crawl_policy(config)
+        self.html_parser = config.get('htmlParser') or ds.HTML_PARSER
+        if self.html_parser == LXML:
+            precompile_selectors(config)
 
     def make_request(self) -> str | None:
-        try:
-            log.log_info(f"[Request] Fetching URL: {self.article_url}")
-
-            # === Optional Proxy Setup ===
-            proxy = None
-            if getattr(self, "config", {}).get("useIpProxy") == 1 and getattr(ds, "PROXY_ENABLED", False):
-                proxy = bot_utils.get_random_proxy()
-                if proxy:
-                    log.log_info(f"[Request] Using proxy: {proxy}")
-                    proxies = {
-                        "http": proxy,
-                        "https": proxy
-                    }
-                else:
-                    log.log_warning("[Request] Proxy enabled but no proxy available.")
-                    proxies = None
+        log.log_info(f"[Request] Fetching URL: {self.article_url}")
+        result = self.fetcher.fetch(self._build_fetch_request(self.article_url))
+        return self._read_response(result, self.article_url)
+
+    def _build_fetch_request(self, url: str, context=None) -> FetchRequest:
+        # === Optional Proxy Setup ===
+        proxy = None
+        if getattr(self, "config", {}).get("useIpProxy") == 1 and getattr(ds, "PROXY_ENABLED", False):
+            proxy = bot_utils.get_random_proxy()
+            if proxy:
+                log.log_info(f"[Request] Using proxy: {proxy}")
             else:
-                proxies = None
-
-            response = requests.get(self.article_url, verify=certifi.where(), proxies=proxies)
-            if response.status_code == 200:
-                encoding = response.encoding or 'utf-8'
-                return response.content.decode(encoding)
-            else:
-                log.log_warning(
-                    f"Non-success HTTP response for URL {self.article_url}: "
-                    f"{response.status_code} {response.reason}"
-                )
-                return None
-        except requests.RequestException as e:
-            log.log_error(f"HTTP request error for URL {self.article_url}", e)
+                log.log_warning("[Request] Proxy enabled but no proxy available.")
+
+        return FetchRequest(url=url,
+                            proxy=proxy,
+                            timeout=self.config.get('fetchTimeout'),
+                            max_per_domain=self.config.get('fetchConcurrency'),
+                            context=context,
+                            gate=partial(politeness.delay, domain_of(url), self.crawl_policy))
+
+    def _read_response(self, result: FetchResult, url: str) -> str | None:
+        domain = domain_of(url)
+        if result.error and result.status_code is None:
+            log.log_error(f"HTTP request error for URL {result.url}: {result.error}")
+            return None
+        if not result.ok:
+            politeness.report(domain, result.status_code, retry_after_seconds(result.headers.get('retry-after')))
+            log.log_warning(
+                f"Non-success HTTP response for URL {result.url}: "
+                f"{result.status_code} {result.error}"
+            )
             return None
+        try:
+            html = result.text
         except Exception as e:
-            log.log_error(f"Unexpected error during request to {self.article_url}", e)
+            log.log_error(f"Unexpected error while decoding response of {result.url}", e)
+            return None
+        if not result.from_cache and is_captcha(html, self.crawl_policy):
+            politeness.report(domain, result.status_code, captcha=True)
+            log.log_warning(f"CAPTCHA / bot challenge page served for URL {result.url}")
             return None
+        politeness.report(domain, result.status_code)
+        return html
 
     def initiate_html_parser(self, doc: str) -> dict | None:
         try:
-            soup = BeautifulSoup(doc, 'html.parser')
-
-            self.can_save_article = False
+            document = load_document(doc, self.html_parser)
+            sections, missing = parse_article_sections(self.config, document, self.article_url)
+            return self.article_info(doc, sections, missing)
+        except Exception as e:
+            log.log_error('Error occurred while crawling into ', e)
+            return None
 
-            header = self._parse_element('header', soup)
-            body = self._parse_element('body', soup)
-            author = self._parse_element('author', soup)
-            std_date, raw_date = self._parse_date('date', soup)
-            keywords = self._parse_keyword_elements('keywords', soup)
+    def article_info(self, doc: str, sections: dict, missing: set) -> dict:
+        self.article_complete = not missing
+        self.missing_configuration.update(missing)
+        self.can_save_article = bool(missing)
 
-            if self.can_save_article:
-                # Save the page source for debugging
-                bot_utils.save_as_html(page_source=doc, article=self.article)
-                self.can_save_article = False
-                self.affected_articles.append({"article_id": self.article_id, "article_url": self.article_url})
-                self.alert = True
-                self.is_article_resolved = False
-
-            return {
-                'header': header,
-                'body': body,
-                'author': author,
-                'date': raw_date,
-                'std_date': std_date,
-                'language': self.config.get('language', ''),
-                'newspaper_id': self.config.get('newspaperID', 0),
-                'keywords': keywords
-            }
+        if self.can_save_article:
+            # Save the page source for debugging
+            bot_utils.save_as_html(page_source=doc, article=self.article)
+            self.can_save_article = False
+            self.affected_articles.append({"article_id": self.article_id, "article_url": self.article_url})
+            self.alert = True
+            self.is_article_resolved = False
+
+        return {
+            'header': sections['header'],
+            'body': sections['body'],
+            'author': sections['author'],
+            'date': sections['date'],
+            'std_date': sections['std_date'],
+            'language': self.config.get('language', ''),
+            'newspaper_id': self.config.get('newspaperID', 0),
+            'keywords': sections['keywords']
+        }
+
+    def needs_browser(self, document, missing: set) -> bool:
+        """
+        Whether the static page is unusable, so that `auto` execution mode renders it in a browser instead:
+        a required section came back empty or one of the `paywallSelectors` matched.
+        """
+        if missing & REQUIRED_SECTIONS:
+            return True
+        return any(document.select(s.get('name', ''), s.get('type') or 'css')
+                   for s in self.config.get('paywallSelectors', []) if s.get('name'))
+
+    def _parse_or_escalate(self, doc: str) -> dict | None:
+        try:
+            document = load_document(doc, self.html_parser)
+            sections, missing = parse_article_sections(self.config, document, self.article_url)
+            if self.needs_browser(document, missing):
+                return None
+            return self.article_info(doc, sections, missing)
         except Exception as e:
             log.log_error('Error occurred while crawling into ', e)
             return None
 
     def reparse_html(self, doc: str) -> dict | None:
         try:
-            soup = BeautifulSoup(doc, 'html.parser')
-
-            self.can_save_article = False
+            document = load_document(doc, self.html_parser)
+            sections, missing = parse_article_sections(self.config, document, self.article_url)
 
-            header = self._parse_element('header', soup)
-            body = self._parse_element('body', soup)
-            author = self._parse_element('author', soup)
-            std_date, raw_date = self._parse_date('date', soup)
-            keywords = self._parse_keyword_elements('keywords', soup)
+            self.missing_configuration.update(missing)
+            self.can_save_article = bool(missing)
 
             if self.can_save_article:
                 self.can_save_article = False
@@ -148,99 +174,19 @@ class ArticleSoupParser:
                 self.alert = True
 
             return {
-                'header': header,
-                'body': body,
-                'author': author,
-                'date': raw_date,
-                'std_date': std_date,
+                'header': sections['header'],
+                'body': sections['body'],
+                'author': sections['author'],
+                'date': sections['date'],
+                'std_date': sections['std_date'],
                 'language': self.config.get('language', ''),
                 'newspaper_id': self.config.get('newspaperID', 0),
-                'keywords': keywords
+                'keywords': sections['keywords']
             }
         except Exception as e:
             log.log_error('Error occurred while crawling into ', e)
             return None
 
-    def _parse_element(self, section_name: str, soup: BeautifulSoup) -> str:
-        selectors = self.config.get(section_name, [])
-
-        for sc in selectors:
-            elements = soup.select(sc.get('name', ''))
-
-            if not elements:
-                log.log_warning(
-                    f"[{section_name}] No elements found for selector '{sc.get('name', 'invalid')}' "
-                    f"on page: {self.article_url}"
-                )
-                continue
-
-            values = [ele.get_text(strip=True) for ele in elements]
-            return ' '.join(values).replace('\n', ' ').replace('\t', ' ').strip()
-
-        if section_name == 'author':
-            return ''
-
-        # Missing or Mismatching Configuration
-        self.missing_configuration.add(section_name)
-        self.can_save_article = True
-
-        return ''
-
-    def _parse_keyword_elements(self, section_name: str, soup: BeautifulSoup) -> List[str]:
-        selectors = self.config.get(section_name, [])
-
-        for sc in selectors:
-            elements = soup.select(sc.get('name', ''))
-
-            if not elements:
-                log.log_warning(
-                    f"[{section_name}] No elements found for selector '{sc.get('name', 'invalid')}' "
-                    f"on page: {self.article_url}"
-                )
-                continue
-
-            values = [ele.get_text(strip=True) for ele in elements]
-            return values
-
-        return []
-
-    def _parse_date(self, section_name: str, soup: BeautifulSoup) -> tuple[str, str]:
-
-        selectors = self.config.get(section_name, [])
-        date_regex = self.config.get('dateRegex', [])
-
-        for sc in selectors:
-            elements = soup.select(sc.get('name', ''))
-            attr = sc.get("attribute", "")
-
-            if not elements:
-                log.log_warning(
-                    f"[{section_name}] No elements found for selector '{sc.get('name', 'invalid')}' "
-                    f"on page: {self.article_url}"
-                )
-                continue
-
-            values = (
-                [ele.get(attr, '').strip() for ele in elements]
-                if attr else
-                [ele.get_text(strip=True).replace('\n', '') for ele in elements]
-            )
-            raw_date = ''.join(values)
-
-            try:
-                matched = date_utils.get_matched_datetime_value(date_regex, raw_date)
-                parsed_date = date_utils.extract_date(matched or raw_date)
-                return parsed_date, raw_date
-            except Exception as e:
-                log.log_error(f'date_time parsing error for {self.article_url}:', e)
-                return '', raw_date
-
-        # Missing or Mismatching Configuration
-        self.missing_configuration.add(section_name)
-        self.can_save_article = True
-
-        return '', ''
-
     def extract(self, article: ArticleRequest) -> dict | None:
         try:
             log.log_info(f"Started crawling URL - '{article.url}'")
@@ -279,8 +225,8 @@ class ArticleSoupParser:
             article_info['sector'] = article.sector
             article_info['link'] = article.url
 
-            # Inserting into database.
-            insert_article_data_into_db(article_info)
+            # Queued for the batched database write.
+            article_writer.add(article_info, complete=self.article_complete)
 
             if self.can_publish:
                 mq.publish_message_into_article_analyzer(json.dumps(article_info))
@@ -301,8 +247,13 @@ class ArticleSoupParser:
         finally:
             log.log_application_end()
 
-    def extract_batch(self, articles: list[ArticleRequest]) -> list[dict]:
+    def extract_batch(self, articles: list[ArticleRequest], escalate: bool = False) -> list[dict]:
+        """
+        :param escalate: `auto` execution mode; articles that could not be fetched or fail `needs_browser`
+            are collected in `self.escalated` for the browser instead of being stored as failed articles
+        """
         results = []
+        self.escalated = []
         try:
 
             self.alert = False
@@ -326,17 +277,30 @@ class ArticleSoupParser:
 
                     raise err
 
-            for article in articles:
+            # All articles are downloaded concurrently; each one is parsed as soon as its response arrives
+            requests = [self._build_fetch_request(article.url, context=article) for article in articles]
+            for response in self.fetcher.fetch_all(requests):
+                article = response.context
                 self.article_id = article.article_id
                 self.article_url = article.url
                 self.article = article
-                log.log_info(f"Started crawling URL - '{article.url}'")
-                html = self.make_request()
+                log.log_info(f"Started crawling URL - '{article.url}' ({response.elapsed:.2f}s fetch)")
+                html = self._read_response(response, article.url)
 
                 if not html:
+                    if escalate:
+                        self.escalated.append(article)
                     continue
 
-                data = self.initiate_html_parser(html)
+                if escalate:
+                    data = self._parse_or_escalate(html)
+                    if data is None:
+                        log.log_info(f"Static page of '{article.url}' is incomplete, escalating to the browser")
+                        self.escalated.append(article)
+                        continue
+                else:
+                    data = self.initiate_html_parser(html)
+
                 data.update({
                     'article_id': article.article_id,
                     'preamble': article.preamble,
@@ -344,8 +308,8 @@ class ArticleSoupParser:
                     'link': article.url
                 })
 
-                # Inserting into database.
-                insert_article_data_into_db(data)
+                # Queued for the batched database write.
+                article_writer.add(data, complete=self.article_complete)
 
                 if self.can_publish:
                     mq.publish_message_into_article_analyzer(json.dumps(data))
@@ -377,13 +341,16 @@ class ArticleSoupParser:
 
             self.alert = False
 
-            for article in articles:
+            by_id = {article.article_id: article for article in articles}
+
+            # Saved pages are streamed in storage order, each pack read front to back
+            for article_id, html in iter_failed_article_html(list(by_id)):
+                article = by_id[article_id]
                 self.is_article_resolved = True
                 self.article_id = article.article_id
                 self.article_url = article.url
                 self.article = article
                 log.log_info(f"Started crawling URL - '{article.url}'")
-                html = fetch_failed_article_html(article.article_id)
 
                 if not html:
                     continue
@@ -407,6 +374,7 @@ class ArticleSoupParser:
                                                  'newspaper_id': self.newspaper_id,
                                                  'is_resolved': True
                                                  })
+                    failed_page_store().delete(article.article_id)
                 else:
                     upsert_into_failed_articles({'article_id': article.article_id,
                                                  'newspaper_id': self.newspaper_id,
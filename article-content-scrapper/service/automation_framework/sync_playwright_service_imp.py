@@ -1,5 +1,7 @@
 import os
 import json
+import threading
+import time
 from typing import List
 
 from interface.crawling import Crawling
@@ -11,7 +13,28 @@ from core import config as conf
 from core.config import Settings
 from service.rabbit_mq import rabbit_mq as mq
 
-from playwright.sync_api import sync_playwright, Page
+from exceptions.custom_exception import AuthenticationFailedException
+from service.automation_framework.browser_pool import playwright_pool
+from service.utils.politeness import politeness, crawl_policy, domain_of, retry_after_seconds, CAPTCHA_JS
+from service.utils.resource_blocking import blocking_profile, block_this_load, blocking_stats, RouteBlocker, \
+    TransferCounter
+
+from playwright.sync_api import sync_playwright, Page, Browser
+
+# Playwright's sync API is bound to the thread that started it, so every consumer thread keeps its own
+# driver and browser; pooled pages are only handed back to the thread that opened them.
+_thread_state = threading.local()
+
+
+def _thread_browser(headless: bool) -> Browser:
+    browser = getattr(_thread_state, 'browser', None)
+    if browser is not None and browser.is_connected():
+        return browser
+
+    if getattr(_thread_state, 'playwright', None) is None:
+        _thread_state.playwright = sync_playwright().start()
+    _thread_state.browser = _thread_state.playwright.chromium.launch(headless=headless)
+    return _thread_state.browser
 
 
 class PlaywrightServiceImp(Crawling):
@@ -36,6 +59,8 @@ class PlaywrightServiceImp(Crawling):
         self.cur_dir = os.path.dirname(__file__)
         self.session_storage_path = os.path.join(os.path.dirname(os.path.dirname(self.cur_dir)), 'session_storage')
         self.ds = conf.data_source
+        self.blocking_profile = blocking_profile(config)
+        self.crawl_policy = crawl_policy(config)
 
     def automation_tool_config(self, driver) -> None:
         log.log_info("Not yet implement tool configuration")
@@ -153,23 +178,80 @@ class PlaywrightServiceImp(Crawling):
                           e)
             return '', output.get('date')
 
-    def extract(self, url: str) -> dict | None:
+    def launch_page(self):
+        """
+        Open a page prepared for this newspaper (stored session or login) on the thread's browser, for the
+        browser pool. Returns the page and the function closing its context.
+        """
+        browser = _thread_browser(self.ds.HEADLESS)
 
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=self.ds.HEADLESS)  # Launch a single browser instance
-            context = browser.new_context()
+        session_storage_file = os.path.join(self.session_storage_path,
+                                            f"{self.newspaper_id}_{self.newspaper_name}.json")
+        storage_state = session_storage_file if os.path.exists(session_storage_file) else None
+
+        context = browser.new_context(storage_state=storage_state)
+        try:
             page = context.new_page()  # open a new tab
 
-            try:
-                if self.config.get('login') == 1:
-                    auth_status = self.handle_site_auth(page).get('authenticate_status')
-                    if not auth_status:
-                        return None
+            if self.config.get('login') == 1 and storage_state is None:
+                auth_status = self.handle_site_auth(page).get('authenticate_status')
+                if not auth_status:
+                    raise AuthenticationFailedException('Authentication failed')
+        except Exception:
+            context.close()
+            raise
+
+        return page, context.close
+
+    def open_article(self, pooled, url: str) -> None:
+        """
+        Load the article under the newspaper's blocking profile, recording transferred bytes and load time
+        for the blocking on / off comparison. The load waits for a politeness slot of the domain and
+        reports throttling answers and CAPTCHA pages back to it.
+        """
+        page: Page = pooled.driver
+        blocker = pooled.state.get('route_blocker')
+        if blocker is None:
+            blocker = RouteBlocker(self.blocking_profile)
+            page.route('**/*', blocker.handle)
+            pooled.state['route_blocker'] = blocker
+        transfer = pooled.state.get('transfer_counter')
+        if transfer is None:
+            transfer = TransferCounter()
+            page.on('requestfinished', transfer.on_request_finished)
+            pooled.state['transfer_counter'] = transfer
+        # Requests of the previous article that finished after it was read
+        transfer.reset()
+
+        blocker.profile = self.blocking_profile
+        blocker.active = block_this_load(self.blocking_profile)
+
+        domain = domain_of(url)
+        with politeness.slot(domain, self.crawl_policy):
+            started = time.monotonic()
+            response = page.goto(url)
+            load_seconds = time.monotonic() - started
+
+        status_code = retry_after = None
+        if response is not None:
+            status_code = response.status
+            retry_after = retry_after_seconds(response.headers.get('retry-after'))
+        politeness.report(domain, status_code, retry_after,
+                          captcha=page.evaluate(CAPTCHA_JS, list(self.crawl_policy.captcha_markers)))
+
+        blocking_stats.record(self.newspaper_id, blocker.active, transfer.transferred_bytes(), load_seconds)
+
+    def extract(self, url: str) -> dict | None:
+        try:
+            with playwright_pool.checkout(self.newspaper_id, self.launch_page) as pooled:
+                page = pooled.driver
 
-                page.goto(url)
+                self.open_article(pooled, url)
+                pooled.pages += 1
 
                 if self.is_article_protected(page):
                     self.handle_site_auth(page)
+                    page.goto(url)
 
                 article_info = self.extract_info_from_webpage(page)
 
@@ -177,54 +259,44 @@ class PlaywrightServiceImp(Crawling):
                     mq.publish_message_into_article_analyzer(json.dumps(article_info))
 
                 return article_info
-            except Exception as e:
-                log.log_error('Error occurred while extracting', exception=e)
-            finally:
-                log.log_application_end()
-                browser.close()
+        except Exception as e:
+            log.log_error('Error occurred while extracting', exception=e)
+        finally:
+            log.log_application_end()
 
     def extract_all(self, articles: List[ArticleRequest]) -> List[dict]:
+        articles_response = []
 
-        with sync_playwright() as p:
-
-            browser = p.chromium.launch(headless=self.ds.HEADLESS)  # Launch a single browser instance
-            context = browser.new_context()
-            page = context.new_page()  # open a new tab
-
-            articles_response = []
-
-            try:
-                if self.config.get('login') == 1:
-                    auth_status = self.handle_site_auth(page).get('authenticate_status')
+        try:
+            with playwright_pool.checkout(self.newspaper_id, self.launch_page) as pooled:
+                page = pooled.driver
 
-                    if not auth_status:
-                        return []
+                for article in articles:
+                    log.log_info(f"Started crawling URL - '{article.url}'")
 
-                    for article in articles:
-                        log.log_info(f"Started crawling URL - '{article.url}'")
+                    self.open_article(pooled, article.url)
+                    pooled.pages += 1
 
+                    if self.is_article_protected(page):
+                        self.handle_site_auth(page)
                         page.goto(article.url)
 
-                        if self.is_article_protected(page):
-                            self.handle_site_auth(page)
-
-                        article_info = self.extract_info_from_webpage(page)
-                        article_info['article_id'] = article.article_id
-                        article_info['preamble'] = article.preamble
-                        article_info['sector'] = article.sector
+                    article_info = self.extract_info_from_webpage(page)
+                    article_info['article_id'] = article.article_id
+                    article_info['preamble'] = article.preamble
+                    article_info['sector'] = article.sector
 
-                        if self.can_publish:
-                            mq.publish_message_into_article_analyzer(json.dumps(article_info))
+                    if self.can_publish:
+                        mq.publish_message_into_article_analyzer(json.dumps(article_info))
 
-                        articles_response.append(article_info)
-                        log.log_separator()
+                    articles_response.append(article_info)
+                    log.log_separator()
 
-                return articles_response
-            except Exception as e:
-                log.log_error('Error occurred while extracting', exception=e)
-            finally:
-                log.log_application_end()
-                browser.close()
+            return articles_response
+        except Exception as e:
+            log.log_error('Error occurred while extracting', exception=e)
+        finally:
+            log.log_application_end()
 
     def handle_site_auth(self, driver) -> dict:
 
@@ -1,10 +1,12 @@
 import json
 
-import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from core.config import data_source
+from exceptions.custom_exception import DatabaseConnectionException
 from logger import log
 from datetime import datetime
+from service.utils.db_pool import ConnectionPool
+from service.utils.ttl_cache import TtlCache
 
 
 # setting database properties
@@ -15,56 +17,351 @@ db_params = {
     'password': data_source.DB_PASSWORD
 }
 
+# Shared by every helper below; connections are borrowed per call through get_db_conn / db_conn_close
+db_pool = ConnectionPool(db_params,
+                         max_size=data_source.DB_POOL_MAX_SIZE,
+                         wait_seconds=data_source.DB_POOL_WAIT_SECONDS,
+                         health_check_seconds=data_source.DB_POOL_HEALTH_CHECK_SECONDS)
+
+# Newspaper crawl, auth and credential configs; cleared by the /app-config/v1/refresh endpoint
+config_cache = TtlCache(ttl=data_source.CONFIG_CACHE_TTL)
+
+# Indexes backing the config lookups, so a cache miss stays an index scan
+CONFIG_INDEX_DDL = '''
+    create index if not exists articlebrowserconf_newspaper_id_idx
+        on conf.articlebrowserconf ((doc->>'newspaperID'));
+    create index if not exists newspaper_auth_conf_newspaper_id_idx on conf.newspaper_auth_conf (newspaper_id);
+    create index if not exists newspaper_credential_newspaper_id_idx on conf.newspaper_credential (newspaper_id);
+'''
+
+# Successfully stored articles, looked up by article_id or URL hash before a batch is crawled
+SCRAPED_ARTICLES_DDL = '''
+    create table if not exists articles.scraped_articles (
+        article_id bigint primary key,
+        url_hash bytea not null,
+        newspaper_id integer,
+        scraped_at timestamp not null default now()
+    );
+    create index if not exists scraped_articles_url_hash_idx on articles.scraped_articles (url_hash);
+    create index if not exists scraped_articles_scraped_at_idx on articles.scraped_articles (scraped_at);
+'''
+RECORD_SCRAPED_SQL = '''
+    insert into articles.scraped_articles (article_id, url_hash, newspaper_id) values %s
+    on conflict (article_id) do update set url_hash = excluded.url_hash, scraped_at = now();
+'''
+# SimHash of every article sent to the analyzer, split in 16-bit bands for the LSH lookup. `duplicate_of` links
+# a near-duplicate that was not sent to the original whose analysis it shares.
+ARTICLE_FINGERPRINTS_DDL = '''
+    create table if not exists articles.article_fingerprints (
+        article_id bigint primary key,
+        newspaper_id integer,
+        simhash bigint not null,
+        band_0 integer not null,
+        band_1 integer not null,
+        band_2 integer not null,
+        band_3 integer not null,
+        duplicate_of bigint,
+        distance smallint,
+        created_at timestamp not null default now()
+    );
+    create index if not exists article_fingerprints_band_0_idx on articles.article_fingerprints (band_0);
+    create index if not exists article_fingerprints_band_1_idx on articles.article_fingerprints (band_1);
+    create index if not exists article_fingerprints_band_2_idx on articles.article_fingerprints (band_2);
+    create index if not exists article_fingerprints_band_3_idx on articles.article_fingerprints (band_3);
+    create index if not exists article_fingerprints_duplicate_of_idx on articles.article_fingerprints (duplicate_of);
+'''
+FIND_FINGERPRINT_CANDIDATES_SQL = '''
+    select article_id, simhash from articles.article_fingerprints
+    where (band_0 = %s or band_1 = %s or band_2 = %s or band_3 = %s)
+      and duplicate_of is null and article_id <> %s and created_at > now() - make_interval(days => %s);
+'''
+RECORD_FINGERPRINT_SQL = '''
+    insert into articles.article_fingerprints
+        (article_id, newspaper_id, simhash, band_0, band_1, band_2, band_3, duplicate_of, distance)
+    values (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    on conflict (article_id) do update set
+        simhash = excluded.simhash, band_0 = excluded.band_0, band_1 = excluded.band_1,
+        band_2 = excluded.band_2, band_3 = excluded.band_3, duplicate_of = excluded.duplicate_of,
+        distance = excluded.distance, created_at = now();
+'''
+
 
 def get_db_conn():
-    conn = None
     try:
-        conn = psycopg2.connect(**db_params)
-        return conn
+        return db_pool.getconn()
     except Exception as conn_err:
         log.log_error('error occur while trying to establishing connection with database.', exception=conn_err)
-        db_conn_close(conn)
         return None
 
 
 def db_conn_close(conn):
     if conn is not None:
-        conn.close()
+        db_pool.putconn(conn)
 
 
-def insert_article_data_into_db(data):
-    conn = get_db_conn()
+def close_db_pool():
+    db_pool.close()
 
-    if conn is not None:
-        try:
-            query = 'select articles.insert_fragmented_body( cast(%s as bigint), cast(%s as text), ' \
-                    'cast(%s as text), cast(%s as text), cast(%s as text), cast(%s as integer),%s ,%s);'
-            cur = conn.cursor(cursor_factory=RealDictCursor)
-            article_date = None
-            try:
-                article_date = datetime.fromisoformat(data.get('std_date'))
-            except ValueError:
-                log.log_warning(f"❌ Failed to parse std_date: {data.get('std_date')}")
 
-            cur.execute(query, (data.get('article_id'), data.get('header'), data.get('body'), data.get('author'),
-                                data.get('date'), data.get('newspaper_id'),
-                                article_date, datetime.now()))
+def db_pool_stats():
+    return db_pool.stats()
+
+
+# Set-based variant of insert_fragmented_body: one statement for a whole batch of article rows
+BULK_INSERT_ARTICLES_SQL = '''
+    select articles.insert_fragmented_body(v.article_id, v.header, v.body, v.author, v.date, v.newspaper_id,
+                                           v.std_date, v.created_at)
+    from (values %s) as v(article_id, header, body, author, date, newspaper_id, std_date, created_at);
+'''
+ARTICLE_ROW_TEMPLATE = '(cast(%s as bigint), cast(%s as text), cast(%s as text), cast(%s as text), ' \
+                       'cast(%s as text), cast(%s as integer), cast(%s as timestamp), cast(%s as timestamp))'
+INSERT_ARTICLE_SQL = 'select articles.insert_fragmented_body( cast(%s as bigint), cast(%s as text), ' \
+                     'cast(%s as text), cast(%s as text), cast(%s as text), cast(%s as integer),%s ,%s);'
+
 
+def article_row(data):
+    article_date = None
+    try:
+        article_date = datetime.fromisoformat(data.get('std_date'))
+    except ValueError:
+        log.log_warning(f"❌ Failed to parse std_date: {data.get('std_date')}")
+
+    return (data.get('article_id'), data.get('header'), data.get('body'), data.get('author'), data.get('date'),
+            data.get('newspaper_id'), article_date, datetime.now())
+
+
+def insert_articles_into_db(rows, scraped):
+    """
+    Store a batch of `article_row` tuples with a single statement and commit, recording each stored article
+    in `articles.scraped_articles` (`scraped` holds its `(article_id, url_hash, newspaper_id)` tuple, None for
+    an incomplete article that must be crawled again) in the same transaction. When the batch fails, every row is retried under its own savepoint so one bad article
+    does not drop the others. Returns the number of rows stored; a row replaced by a later row of the same
+    article in the batch counts as stored.
+    """
+    # A redelivered message can queue an article twice in one batch, and a single statement cannot insert or
+    # update the same row twice ("ON CONFLICT DO UPDATE command cannot affect row a second time"): keep the
+    # latest row of every article
+    latest, copies = {}, {}
+    for row, scraped_row in zip(rows, scraped):
+        latest[row[0]] = (row, scraped_row)
+        copies[row[0]] = copies.get(row[0], 0) + 1
+    total = len(rows)
+    rows = [row for row, _ in latest.values()]
+    scraped = [scraped_row for _, scraped_row in latest.values()]
+    scraped_rows = [scraped_row for scraped_row in scraped if scraped_row is not None]
+
+    conn = get_db_conn()
+    if conn is None:
+        return 0
+    try:
+        cur = conn.cursor()
+        try:
+            execute_values(cur, BULK_INSERT_ARTICLES_SQL, rows, template=ARTICLE_ROW_TEMPLATE, page_size=len(rows))
+            if scraped_rows:
+                execute_values(cur, RECORD_SCRAPED_SQL, scraped_rows, page_size=len(scraped_rows))
             conn.commit()
+            cur.close()
+            return total
         except Exception as err:
-            log.log_error(f'error occur while inserting data into db. \n {err}')
-        finally:
-            db_conn_close(conn)
+            conn.rollback()
+            log.log_warning(f'Bulk insert of {len(rows)} articles failed, inserting them one by one: {err}')
+
+        stored = 0
+        for row, scraped_row in zip(rows, scraped):
+            cur.execute('savepoint article_row')
+            try:
+                cur.execute(INSERT_ARTICLE_SQL, row)
+                if scraped_row is not None:
+                    execute_values(cur, RECORD_SCRAPED_SQL, [scraped_row])
+                cur.execute('release savepoint article_row')
+                stored += copies[row[0]]
+            except Exception as err:
+                cur.execute('rollback to savepoint article_row')
+                log.log_error(f'error occur while inserting data into db. article_id: {row[0]} \n {err}')
+        conn.commit()
+        cur.close()
+        return stored
+    except Exception as err:
+        log.log_error('error occur while inserting article batch into db. for more detail', exception=err)
+        return 0
+    finally:
+        db_conn_close(conn)
+
+
+def _execute_ddl(ddl, description):
+    conn = get_db_conn()
+    if conn is None:
+        return
+    try:
+        cur = conn.cursor()
+        cur.execute(ddl)
+        conn.commit()
+        cur.close()
+    except Exception as err:
+        # Usually missing DDL privileges; the scraper keeps working without the index / table
+        log.log_warning(f'Unable to create the {description}: {err}')
+    finally:
+        db_conn_close(conn)
+
+
+def ensure_config_indexes():
+    _execute_ddl(CONFIG_INDEX_DDL, 'configuration lookup indexes')
+
+
+def ensure_dedup_table():
+    _execute_ddl(SCRAPED_ARTICLES_DDL, 'scraped articles table')
+
+
+def ensure_fingerprint_table():
+    _execute_ddl(ARTICLE_FINGERPRINTS_DDL, 'article fingerprints table')
+
+
+def find_scraped_articles(article_ids, url_hashes):
+    """
+    Article ids and URL hashes among the given ones that were already stored, or None when the lookup failed.
+    """
+    conn = get_db_conn()
+    if conn is None:
+        return None
+    try:
+        cur = conn.cursor()
+        cur.execute('select article_id, url_hash from articles.scraped_articles '
+                    'where article_id = any(%s) or url_hash = any(%s);',
+                    (list(article_ids), list(url_hashes)))
+        rs = cur.fetchall()
+        cur.close()
+        return {row[0] for row in rs}, {bytes(row[1]) for row in rs}
+    except Exception as err:
+        log.log_error('error occur while looking up scraped articles in db. for more detail', exception=err)
+        return None
+    finally:
+        db_conn_close(conn)
+
+
+def iter_scraped_articles(since=None):
+    """
+    Yield `(article_id, url_hash, scraped_at)` of the articles stored after `since` (all when None), streamed
+    with a server-side cursor. Raises DatabaseConnectionException when no connection is available.
+    """
+    conn = get_db_conn()
+    if conn is None:
+        # Raised rather than yielding nothing, which would pass for an empty table
+        raise DatabaseConnectionException('No database connection to read the scraped articles.')
+    try:
+        cur = conn.cursor(name='scraped_articles_sync')
+        cur.itersize = 10000
+        if since is None:
+            cur.execute('select article_id, url_hash, scraped_at from articles.scraped_articles;')
+        else:
+            cur.execute('select article_id, url_hash, scraped_at from articles.scraped_articles '
+                        'where scraped_at > %s;', (since,))
+        for article_id, url_hash, scraped_at in cur:
+            yield article_id, bytes(url_hash), scraped_at
+        cur.close()
+        conn.commit()
+    finally:
+        db_conn_close(conn)
+
+
+def match_fingerprint(article_id, newspaper_id, simhash, bands, window_days, closest):
+    """
+    Match an article fingerprint against the analyzed articles of the last `window_days` sharing a band with it.
+    `closest(candidates)` picks the `(original_id, distance)` among the `(article_id, simhash)` candidates, or
+    None. A near-duplicate is recorded with its link to the original. Returns that pick, `(None, None)` for an
+    original (recorded by `record_fingerprint` once it was sent to the analyzer), or None when the lookup failed.
+    """
+    conn = get_db_conn()
+    if conn is None:
+        return None
+    try:
+        cur = conn.cursor()
+        cur.execute(FIND_FINGERPRINT_CANDIDATES_SQL, (*bands, article_id, window_days))
+        original_id, distance = closest(cur.fetchall()) or (None, None)
+        if original_id is not None:
+            cur.execute(RECORD_FINGERPRINT_SQL, (article_id, newspaper_id, simhash, *bands, original_id, distance))
+        conn.commit()
+        cur.close()
+        return original_id, distance
+    except Exception as err:
+        conn.rollback()
+        log.log_error('error occur while matching article fingerprint in db. for more detail', exception=err)
+        return None
+    finally:
+        db_conn_close(conn)
+
+
+def record_fingerprint(article_id, newspaper_id, simhash, bands):
+    """
+    Record the fingerprint of an article sent to the analyzer, making it an original later articles are matched
+    against. Returns False when it could not be recorded.
+    """
+    conn = get_db_conn()
+    if conn is None:
+        return False
+    try:
+        cur = conn.cursor()
+        cur.execute(RECORD_FINGERPRINT_SQL, (article_id, newspaper_id, simhash, *bands, None, None))
+        conn.commit()
+        cur.close()
+        return True
+    except Exception as err:
+        conn.rollback()
+        log.log_error('error occur while recording article fingerprint in db. for more detail', exception=err)
+        return False
+    finally:
+        db_conn_close(conn)
+
+
+def find_near_duplicate_links(article_id):
+    """
+    Near-duplicate links of an article: the `(duplicate_of, distance)` of its own fingerprint row (None when it
+    has none) and the `(article_id, distance)` of the articles linked to it as their original. Raises
+    DatabaseConnectionException when no connection is available.
+    """
+    conn = get_db_conn()
+    if conn is None:
+        raise DatabaseConnectionException('No database connection to read the near-duplicate links.')
+    try:
+        cur = conn.cursor()
+        cur.execute('select article_id, duplicate_of, distance from articles.article_fingerprints '
+                    'where article_id = %s or duplicate_of = %s order by article_id;', (article_id, article_id))
+        rs = cur.fetchall()
+        cur.close()
+        own = next(((row[1], row[2]) for row in rs if row[0] == article_id), None)
+        duplicates = [(row[0], row[2]) for row in rs if row[1] == article_id]
+        return own, duplicates
+    finally:
+        db_conn_close(conn)
+
+
+def invalidate_config_cache():
+    config_cache.invalidate()
 
 
 def find_article_configuration(newspaper_id):
+    return config_cache.get_or_load(('article_config', newspaper_id),
+                                    lambda: _load_article_configuration(newspaper_id))
+
+
+def fetch_auth_configuration(newspaper_id):
+    return config_cache.get_or_load(('auth_config', newspaper_id),
+                                    lambda: _load_auth_configuration(newspaper_id))
+
+
+def fetch_newspaper_credential(newspaper_id):
+    return config_cache.get_or_load(('credential', newspaper_id),
+                                    lambda: _load_newspaper_credential(newspaper_id))
+
+
+def _load_article_configuration(newspaper_id):
+    # Compared as text so the expression index on doc->>'newspaperID' is used
     sql = '''
-            select * from conf.articlebrowserconf a where cast(a.doc->>'newspaperID' as integer) = %s;
+            select * from conf.articlebrowserconf a where a.doc->>'newspaperID' = %s;
         '''
     conn = get_db_conn()
     try:
         cur = conn.cursor(cursor_factory=RealDictCursor)
-        cur.execute(sql, (newspaper_id,))
+        cur.execute(sql, (str(int(newspaper_id)),))
         rs = cur.fetchone()
 
         article_config = {
@@ -82,7 +379,7 @@ def find_article_configuration(newspaper_id):
         db_conn_close(conn)
 
 
-def fetch_auth_configuration(newspaper_id):
+def _load_auth_configuration(newspaper_id):
     sql = '''
         select * from conf.newspaper_auth_conf nac where nac.newspaper_id = %s;
     '''
@@ -112,7 +409,7 @@ def fetch_auth_configuration(newspaper_id):
         db_conn_close(conn)
 
 
-def fetch_newspaper_credential(newspaper_id):
+def _load_newspaper_credential(newspaper_id):
     sql = '''
         select * from conf.newspaper_credential nc where nc.newspaper_id = %s and nc.valid_user;
     '''
@@ -172,6 +469,41 @@ def upsert_into_failed_articles(article_info):
         db_conn_close(conn)
 
 
+def upsert_failed_articles_batch(articles_info):
+    """
+    `upsert_into_failed_articles` for many articles with a single statement.
+    """
+    if not articles_info:
+        return
+    query = """
+            INSERT INTO monitoring.failed_articles (
+                article_id, newspaper_id, updated_on, is_resolved, info
+            )
+            VALUES %s
+            ON CONFLICT (article_id)
+            DO UPDATE SET
+                updated_on = EXCLUDED.updated_on,
+                is_resolved = EXCLUDED.is_resolved,
+                retry_count = monitoring.failed_articles.retry_count + 1;
+    """
+    rows = [(article_info.get('article_id'),
+             article_info.get('newspaper_id'),
+             article_info.get('updated_on', datetime.now()),
+             article_info.get('is_resolved', False),
+             article_info.get('info', json.dumps({}))) for article_info in articles_info]
+    conn = get_db_conn()
+    try:
+        cur = conn.cursor()
+        execute_values(cur, query, rows, page_size=len(rows))
+        conn.commit()
+        cur.close()
+    except Exception as err:
+        log.log_error('error occur while upsert data into failed article table in db. for more detail',
+                      exception=err)
+    finally:
+        db_conn_close(conn)
+
+
 def upsert_into_articleimages(article_info):
     # UPSERT query
     query = """
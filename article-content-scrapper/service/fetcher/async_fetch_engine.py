@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import queue
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+import httpx
+
+from interface.fetching import Fetching
+from logger import log
+from model.fetch import FetchRequest, FetchResult
+from service.fetcher.dns_cache import DnsCache, cached_dns_transport
+
+# httpx logs every request at INFO, which would drown the crawler log
+logging.getLogger('httpx').setLevel(logging.WARNING)
+
+
+class AsyncFetchEngine(Fetching):
+    """
+    Concurrent HTTP fetcher backed by httpx.AsyncClient running on a dedicated event-loop thread.
+
+    One client (and with it one keep-alive connection pool) is kept per proxy, so consecutive articles of a
+    newspaper reuse open TCP/TLS connections. Concurrency is bounded globally by `max_connections` and per
+    host by `per_domain_concurrency`, which a newspaper may lower or raise through `FetchRequest.max_per_domain`.
+    A request's politeness `gate` is waited for once it holds its per-host slot.
+    """
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 per_domain_concurrency: int = 6,
+                 timeout: float = 30.0,
+                 http2: bool = False,
+                 dns_cache_ttl: float = 300):
+        self.max_connections = max_connections
+        self.per_domain_concurrency = per_domain_concurrency
+        self.timeout = timeout
+        self.http2 = http2
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self._clients: dict[Optional[str], httpx.AsyncClient] = {}
+        self._domain_semaphores: dict[str, tuple[int, asyncio.Semaphore]] = {}
+        self._global_semaphore: Optional[asyncio.Semaphore] = None
+        self._stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'in_flight': 0, 'bytes': 0, 'elapsed': 0.0}
+        self._stats_lock = threading.Lock()
+
+        self.dns_cache = DnsCache(dns_cache_ttl)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='async-fetch-engine', daemon=True)
+        self._thread.start()
+
+    def fetch(self, request: FetchRequest) -> FetchResult:
+        return asyncio.run_coroutine_threadsafe(self._fetch(request), self._loop).result()
+
+    def fetch_all(self, requests: Iterable[FetchRequest]) -> Iterator[FetchResult]:
+        completed = queue.Queue()
+        futures = []
+        for request in requests:
+            future = asyncio.run_coroutine_threadsafe(self._fetch(request), self._loop)
+            future.add_done_callback(completed.put)
+            futures.append(future)
+
+        try:
+            for _ in futures:
+                yield completed.get().result()
+        finally:
+            # The caller stopped consuming; drop the downloads that are still queued
+            for future in futures:
+                future.cancel()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        finished = stats['succeeded'] + stats['failed']
+        stats['avg_elapsed'] = round(stats['elapsed'] / finished, 4) if finished else 0.0
+        stats['elapsed'] = round(stats['elapsed'], 4)
+        stats['pools'] = len(self._clients)
+        stats['http2'] = self.http2
+        return stats
+
+    def close(self) -> None:
+        if not self._loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._aclose(), self._loop).result(timeout=10)
+        except Exception as e:
+            log.log_error('Error occurred while closing the fetch engine connection pools.', e)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+    async def _fetch(self, request: FetchRequest) -> FetchResult:
+        if self._global_semaphore is None:
+            self._global_semaphore = asyncio.Semaphore(self.max_connections)
+
+        self._count(requests=1)
+        async with self._domain_semaphore(request):
+            while request.gate is not None and (delay := request.gate()) > 0:
+                await asyncio.sleep(delay)
+            async with self._global_semaphore:
+                return await self._send(request)
+
+    async def _send(self, request: FetchRequest) -> FetchResult:
+        self._count(in_flight=1)
+        started = time.perf_counter()
+        try:
+            response = await self._client(request.proxy).get(
+                request.url,
+                headers=request.headers or None,
+                timeout=request.timeout or self.timeout
+            )
+            result = FetchResult(url=str(response.url),
+                                 status_code=response.status_code,
+                                 content=response.content,
+                                 encoding=response.charset_encoding,
+                                 headers=dict(response.headers),
+                                 elapsed=time.perf_counter() - started,
+                                 error=None if response.status_code == 200 else response.reason_phrase,
+                                 context=request.context)
+        except Exception as e:
+            result = FetchResult(url=request.url,
+                                 elapsed=time.perf_counter() - started,
+                                 error=f'{type(e).__name__}: {e}',
+                                 context=request.context)
+        finally:
+            self._count(in_flight=-1)
+
+        self._count(succeeded=int(result.ok), failed=int(not result.ok),
+                    bytes=len(result.content), elapsed=result.elapsed)
+        return result
+
+    def _client(self, proxy: Optional[str]) -> httpx.AsyncClient:
+        # Only ever called on the loop thread, so no locking is needed
+        client = self._clients.get(proxy)
+        if client is None:
+            transport = cached_dns_transport(self.dns_cache, http2=self.http2, limits=self.limits, proxy=proxy)
+            client = httpx.AsyncClient(transport=transport, follow_redirects=True, timeout=self.timeout)
+            self._clients[proxy] = client
+        return client
+
+    def _domain_semaphore(self, request: FetchRequest) -> asyncio.Semaphore:
+        limit = request.max_per_domain or self.per_domain_concurrency
+        entry = self._domain_semaphores.get(request.domain)
+        if entry is None or entry[0] != limit:
+            # A changed newspaper limit applies to the requests queued from now on
+            entry = (limit, asyncio.Semaphore(limit))
+            self._domain_semaphores[request.domain] = entry
+        return entry[1]
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for key, value in deltas.items():
+                self._stats[key] += value
+
+    async def _aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
@@ -0,0 +1,258 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from io import BytesIO
+from typing import Iterable, Iterator, Optional
+
+import certifi
+import pycurl
+
+from interface.fetching import Fetching
+from logger import log
+from model.fetch import FetchRequest, FetchResult
+
+
+class _Transfer:
+    def __init__(self, request: FetchRequest, future: Future):
+        self.request = request
+        self.future = future
+        self.buffer = BytesIO()
+        self.headers = {}
+        self.reason = ''
+        self.started = 0.0
+
+    def on_header(self, line: bytes):
+        line = line.decode('iso-8859-1').strip()
+        if line.startswith('HTTP/'):
+            # A new status line starts the headers of the next response in a redirect chain
+            self.headers = {}
+            parts = line.split(' ', 2)
+            self.reason = parts[2] if len(parts) > 2 else ''
+        elif ':' in line:
+            name, value = line.split(':', 1)
+            self.headers[name.strip().lower()] = value.strip()
+
+    @property
+    def charset(self) -> Optional[str]:
+        content_type = self.headers.get('content-type', '')
+        for part in content_type.split(';')[1:]:
+            key, _, value = part.strip().partition('=')
+            if key.lower() == 'charset' and value:
+                return value.strip('"\'')
+        return None
+
+
+class CurlMultiFetcher(Fetching):
+    """
+    HTTP fetch backend multiplexing all transfers over a single `pycurl.CurlMulti` on one worker thread.
+
+    Easy handles are pooled and the multi handle keeps the connection cache, so keep-alive connections and
+    TLS sessions are reused across articles. Transfers are admitted per host up to `per_domain_concurrency`
+    (or the request's `max_per_domain`) and once their politeness `gate` opens; the rest wait in a FIFO
+    queue on the worker.
+    """
+
+    def __init__(self,
+                 max_connections: int = 100,
+                 per_domain_concurrency: int = 6,
+                 timeout: float = 30.0,
+                 http2: bool = False,
+                 dns_cache_ttl: int = 300):
+        self.max_connections = max_connections
+        self.per_domain_concurrency = per_domain_concurrency
+        self.timeout = timeout
+        self.http2 = http2
+        self.dns_cache_ttl = dns_cache_ttl
+
+        self._submitted = queue.Queue()
+        self._pending = deque()
+        self._active: dict[pycurl.Curl, _Transfer] = {}
+        self._active_per_host: dict[str, int] = {}
+        self._free_handles: list[pycurl.Curl] = []
+        self._stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'bytes': 0, 'elapsed': 0.0}
+        self._stats_lock = threading.Lock()
+        self._running = True
+
+        self._multi = pycurl.CurlMulti()
+        self._multi.setopt(pycurl.M_MAX_TOTAL_CONNECTIONS, max_connections)
+        self._multi.setopt(pycurl.M_MAXCONNECTS, max_connections)
+        if http2:
+            self._multi.setopt(pycurl.M_PIPELINING, pycurl.PIPE_MULTIPLEX)
+
+        self._thread = threading.Thread(target=self._run, name='curl-multi-fetcher', daemon=True)
+        self._thread.start()
+
+    def fetch(self, request: FetchRequest) -> FetchResult:
+        return self._submit(request).result()
+
+    def fetch_all(self, requests: Iterable[FetchRequest]) -> Iterator[FetchResult]:
+        completed = queue.Queue()
+        futures = []
+        for request in requests:
+            future = self._submit(request)
+            future.add_done_callback(completed.put)
+            futures.append(future)
+
+        try:
+            for _ in futures:
+                yield completed.get().result()
+        finally:
+            # Transfers that have not started yet are skipped by the worker once cancelled
+            for future in futures:
+                future.cancel()
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            stats = dict(self._stats)
+        finished = stats['succeeded'] + stats['failed']
+        stats['avg_elapsed'] = round(stats['elapsed'] / finished, 4) if finished else 0.0
+        stats['elapsed'] = round(stats['elapsed'], 4)
+        stats['in_flight'] = len(self._active)
+        stats['queued'] = len(self._pending) + self._submitted.qsize()
+        stats['http2'] = self.http2
+        return stats
+
+    def close(self) -> None:
+        self._running = False
+        self._submitted.put(None)
+        self._thread.join(timeout=10)
+
+    def _submit(self, request: FetchRequest) -> Future:
+        future = Future()
+        with self._stats_lock:
+            self._stats['requests'] += 1
+        self._submitted.put(_Transfer(request, future))
+        return future
+
+    def _run(self):
+        try:
+            while self._running:
+                self._drain_submitted(block=not self._active and not self._pending)
+                self._admit()
+                self._perform()
+        except Exception as e:
+            log.log_error('Curl multi fetcher worker stopped unexpectedly.', e)
+        finally:
+            self._shutdown()
+
+    def _drain_submitted(self, block: bool):
+        try:
+            transfer = self._submitted.get(timeout=1.0) if block else self._submitted.get_nowait()
+            while True:
+                if transfer is not None:
+                    self._pending.append(transfer)
+                transfer = self._submitted.get_nowait()
+        except queue.Empty:
+            pass
+
+    def _admit(self):
+        deferred = deque()
+        while self._pending and len(self._active) < self.max_connections:
+            transfer = self._pending.popleft()
+            if transfer.future.cancelled():
+                continue
+
+            host = transfer.request.domain
+            limit = transfer.request.max_per_domain or self.per_domain_concurrency
+            if self._active_per_host.get(host, 0) >= limit:
+                deferred.append(transfer)
+                continue
+            if transfer.request.gate is not None and transfer.request.gate() > 0:
+                deferred.append(transfer)
+                continue
+
+            if transfer.future.set_running_or_notify_cancel():
+                self._start(transfer)
+        self._pending.extendleft(reversed(deferred))
+
+    def _start(self, transfer: _Transfer):
+        request = transfer.request
+        handle = self._free_handles.pop() if self._free_handles else pycurl.Curl()
+        handle.setopt(pycurl.URL, request.url)
+        handle.setopt(pycurl.FOLLOWLOCATION, 1)
+        handle.setopt(pycurl.MAXREDIRS, 10)
+        handle.setopt(pycurl.NOSIGNAL, 1)
+        handle.setopt(pycurl.CAINFO, certifi.where())
+        handle.setopt(pycurl.ENCODING, '')  # accept every compression libcurl supports
+        handle.setopt(pycurl.TIMEOUT_MS, int((request.timeout or self.timeout) * 1000))
+        handle.setopt(pycurl.DNS_CACHE_TIMEOUT, self.dns_cache_ttl)
+        handle.setopt(pycurl.WRITEDATA, transfer.buffer)
+        handle.setopt(pycurl.HEADERFUNCTION, transfer.on_header)
+        if request.headers:
+            handle.setopt(pycurl.HTTPHEADER, [f'{k}: {v}' for k, v in request.headers.items()])
+        if request.proxy:
+            handle.setopt(pycurl.PROXY, request.proxy)
+        if self.http2:
+            handle.setopt(pycurl.HTTP_VERSION, pycurl.CURL_HTTP_VERSION_2TLS)
+
+        transfer.started = time.perf_counter()
+        self._active[handle] = transfer
+        self._active_per_host[request.domain] = self._active_per_host.get(request.domain, 0) + 1
+        self._multi.add_handle(handle)
+
+    def _perform(self):
+        if not self._active:
+            if self._pending:
+                time.sleep(0.05)  # Everything queued is waiting for its politeness gate
+            return
+
+        while True:
+            ret, _ = self._multi.perform()
+            if ret != pycurl.E_CALL_MULTI_PERFORM:
+                break
+
+        while True:
+            remaining, succeeded, failed = self._multi.info_read()
+            for handle in succeeded:
+                self._finish(handle, None)
+            for handle, _, message in failed:
+                self._finish(handle, message)
+            if remaining == 0:
+                break
+
+        # Wait for socket activity, but wake up regularly to pick up newly submitted requests
+        self._multi.select(0.05)
+
+    def _finish(self, handle: pycurl.Curl, error: Optional[str]):
+        self._multi.remove_handle(handle)
+        transfer = self._active.pop(handle)
+        request = transfer.request
+        self._active_per_host[request.domain] -= 1
+
+        status_code = handle.getinfo(pycurl.RESPONSE_CODE) if error is None else None
+        result = FetchResult(url=handle.getinfo(pycurl.EFFECTIVE_URL) or request.url,
+                             status_code=status_code,
+                             content=transfer.buffer.getvalue() if error is None else b'',
+                             encoding=transfer.charset,
+                             headers=transfer.headers,
+                             elapsed=time.perf_counter() - transfer.started,
+                             error=error if error is not None else (None if status_code == 200 else transfer.reason),
+                             context=request.context)
+
+        handle.reset()
+        self._free_handles.append(handle)
+
+        with self._stats_lock:
+            self._stats['succeeded' if result.ok else 'failed'] += 1
+            self._stats['bytes'] += len(result.content)
+            self._stats['elapsed'] += result.elapsed
+        transfer.future.set_result(result)
+
+    def _shutdown(self):
+        for handle, transfer in list(self._active.items()):
+            self._multi.remove_handle(handle)
+            handle.close()
+            transfer.future.set_result(FetchResult(url=transfer.request.url, error='Fetcher closed',
+                                                   context=transfer.request.context))
+        self._active.clear()
+        for transfer in self._pending:
+            if transfer.future.set_running_or_notify_cancel():
+                transfer.future.set_result(FetchResult(url=transfer.request.url, error='Fetcher closed',
+                                                       context=transfer.request.context))
+        self._pending.clear()
+        for handle in self._free_handles:
+            handle.close()
+        self._free_handles.clear()
+        self._multi.close()
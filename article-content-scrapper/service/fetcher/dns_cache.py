@@ -0,0 +1,94 @@
+import asyncio
+import ipaddress
+import socket
+import typing
+
+import httpcore
+import httpx
+
+
+class DnsCache:
+    """
+    TTL cache of the addresses a host name resolves to, for the connections of the async fetch engine only:
+    every article of a newspaper resolves its host once per TTL instead of once per connection, while the
+    rest of the process (queue, database, SMTP, browsers) keeps using the system resolver.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 4096):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._cache: dict[tuple, tuple[float, list[str]]] = {}
+
+    async def resolve(self, host: str, port: int) -> list[str]:
+        # Only used on the engine's event loop thread, so no locking is needed
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        entry = self._cache.get((host, port))
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        infos = await loop.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if len(self._cache) >= self.max_entries:
+            self._cache.clear()
+        self._cache[(host, port)] = (now + self.ttl, addresses)
+        return addresses
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class CachedDnsBackend(httpcore.AsyncNetworkBackend):
+    """
+    httpcore network backend connecting to the cached addresses of a host, trying them in turn. TLS still
+    verifies and sends SNI for the requested host name, which httpcore passes on separately.
+    """
+
+    def __init__(self, cache: DnsCache):
+        self._cache = cache
+        self._backend = httpcore.AnyIOBackend()
+
+    async def connect_tcp(self, host: str, port: int, timeout: typing.Optional[float] = None,
+                          local_address: typing.Optional[str] = None,
+                          socket_options: typing.Optional[typing.Iterable] = None) -> httpcore.AsyncNetworkStream:
+        if self._cache.ttl <= 0 or _is_address(host):
+            return await self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+
+        try:
+            addresses = await asyncio.wait_for(self._cache.resolve(host, port), timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise httpcore.ConnectError(f'Unable to resolve {host}: {e}') from e
+
+        error = None
+        for address in addresses:
+            try:
+                return await self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as e:
+                error = e
+        raise error or httpcore.ConnectError(f'No address found for {host}')
+
+    async def connect_unix_socket(self, path: str, timeout: typing.Optional[float] = None,
+                                  socket_options: typing.Optional[typing.Iterable] = None
+                                  ) -> httpcore.AsyncNetworkStream:
+        return await self._backend.connect_unix_socket(path, timeout, socket_options)
+
+    async def sleep(self, seconds: float) -> None:
+        await self._backend.sleep(seconds)
+
+
+def cached_dns_transport(cache: DnsCache, **kwargs) -> httpx.AsyncHTTPTransport:
+    """
+    httpx transport (same keyword arguments) whose connections, direct or to the proxy, resolve through `cache`.
+    """
+    transport = httpx.AsyncHTTPTransport(**kwargs)
+    # httpx does not expose httpcore's network_backend; the pool and the proxy pools read it per new connection
+    transport._pool._network_backend = CachedDnsBackend(cache)
+    return transport
+
+
+def _is_address(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host)
+        return True
+    except ValueError:
+        return False
@@ -0,0 +1,89 @@
+import threading
+from typing import Optional
+
+from core.config import data_source as ds
+from interface.fetching import Fetching
+from logger import log
+from service.fetcher.http_cache import HttpCache, CachingFetcher
+
+HTTPX = 'httpx'
+CURL = 'curl'
+SUPPORTED_BACKENDS = (HTTPX, CURL)
+
+_fetchers: dict[str, Fetching] = {}
+_http_cache = None
+_lock = threading.Lock()
+
+
+def _create_fetcher(backend: str) -> Fetching:
+    if backend == CURL:
+        from service.fetcher.curl_multi_fetcher import CurlMultiFetcher
+        return CurlMultiFetcher(max_connections=ds.FETCH_MAX_CONNECTIONS,
+                                per_domain_concurrency=ds.FETCH_PER_DOMAIN_CONCURRENCY,
+                                timeout=ds.FETCH_TIMEOUT,
+                                http2=ds.FETCH_HTTP2,
+                                dns_cache_ttl=ds.FETCH_DNS_CACHE_TTL)
+
+    from service.fetcher.async_fetch_engine import AsyncFetchEngine
+    return AsyncFetchEngine(max_connections=ds.FETCH_MAX_CONNECTIONS,
+                            max_keepalive_connections=ds.FETCH_MAX_KEEPALIVE_CONNECTIONS,
+                            keepalive_expiry=ds.FETCH_KEEPALIVE_EXPIRY,
+                            per_domain_concurrency=ds.FETCH_PER_DOMAIN_CONCURRENCY,
+                            timeout=ds.FETCH_TIMEOUT,
+                            http2=ds.FETCH_HTTP2,
+                            dns_cache_ttl=ds.FETCH_DNS_CACHE_TTL)
+
+
+def _get_http_cache():
+    global _http_cache
+    if _http_cache is None:
+        _http_cache = HttpCache(directory=ds.HTTP_CACHE_DIRECTORY,
+                                max_bytes=ds.HTTP_CACHE_MAX_BYTES,
+                                compression_level=ds.HTTP_CACHE_COMPRESSION_LEVEL)
+    return _http_cache
+
+
+def get_fetcher(backend: Optional[str] = None) -> Fetching:
+    """
+    Shared fetcher of the given backend, created on first use. The backend comes from the newspaper
+    config (`fetchBackend`) and falls back to the FETCH_BACKEND setting.
+    """
+    backend = (backend or ds.FETCH_BACKEND or HTTPX).lower()
+    if backend not in SUPPORTED_BACKENDS:
+        log.log_warning(f"Unsupported fetch backend '{backend}', falling back to '{HTTPX}'")
+        backend = HTTPX
+
+    with _lock:
+        fetcher = _fetchers.get(backend)
+        if fetcher is None:
+            fetcher = _create_fetcher(backend)
+            if ds.HTTP_CACHE_ENABLED:
+                fetcher = CachingFetcher(fetcher, _get_http_cache())
+            _fetchers[backend] = fetcher
+            log.log_info(f"Fetch backend '{backend}' started (http2={ds.FETCH_HTTP2}, "
+                         f"max_connections={ds.FETCH_MAX_CONNECTIONS})")
+        return fetcher
+
+
+def fetcher_stats() -> dict:
+    with _lock:
+        return {backend: fetcher.stats() for backend, fetcher in _fetchers.items()}
+
+
+def http_cache_stats() -> dict | None:
+    with _lock:
+        return _http_cache.stats() if _http_cache is not None else None
+
+
+def close_fetchers() -> None:
+    global _http_cache
+    with _lock:
+        for backend, fetcher in _fetchers.items():
+            try:
+                fetcher.close()
+            except Exception as e:
+                log.log_error(f"Error occurred while closing the '{backend}' fetch backend.", e)
+        _fetchers.clear()
+        if _http_cache is not None:
+            _http_cache.close()
+            _http_cache = None
@@ -0,0 +1,229 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, Optional
+
+import zstandard
+
+from interface.fetching import Fetching
+from logger import log
+from model.fetch import FetchRequest, FetchResult
+
+CACHE_SCHEMA = '''
+    create table if not exists entries (
+        url text primary key,
+        file_name text not null,
+        final_url text,
+        etag text,
+        last_modified text,
+        encoding text,
+        size integer not null,
+        stored_at real not null,
+        accessed_at real not null
+    );
+    create index if not exists entries_accessed_at on entries (accessed_at);
+'''
+
+
+class HttpCache:
+    """
+    Persistent cache of article responses for conditional revalidation.
+
+    Bodies are stored zstd-compressed, one file per URL, and indexed in a sqlite database together with
+    their ETag / Last-Modified validators. Only responses carrying a validator are stored, since anything
+    else could not be revalidated. The total compressed size is bounded by `max_bytes`; the least recently
+    used entries are evicted first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1 << 30, compression_level: int = 3):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0, 'bytes_saved': 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self._db.executescript(CACHE_SCHEMA)
+        self._size = self._db.execute('select coalesce(sum(size), 0) from entries').fetchone()[0]
+
+    def lookup(self, url: str) -> Optional[dict]:
+        with self._lock:
+            row = self._db.execute(
+                'select file_name, final_url, etag, last_modified, encoding from entries where url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('file_name', 'final_url', 'etag', 'last_modified', 'encoding'), row))
+
+    @staticmethod
+    def conditional_headers(entry: Optional[dict]) -> dict:
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def load(self, url: str, entry: dict) -> Optional[bytes]:
+        try:
+            with open(self._path(entry['file_name']), 'rb') as file:
+                content = zstandard.ZstdDecompressor().decompress(file.read())
+        except Exception as e:
+            log.log_error(f'Cached copy of {url} is unreadable, dropping it.', e)
+            self.delete(url)
+            return None
+
+        with self._lock:
+            self._db.execute('update entries set accessed_at = ? where url = ?', (time.time(), url))
+            self._db.commit()
+            self._stats['hits'] += 1
+            self._stats['bytes_saved'] += len(content)
+        return content
+
+    def store(self, url: str, result: FetchResult) -> None:
+        etag = result.headers.get('etag')
+        last_modified = result.headers.get('last-modified')
+        if not etag and not last_modified:
+            return
+
+        file_name = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.zst'
+        path = self._path(file_name)
+        try:
+            data = zstandard.ZstdCompressor(level=self.compression_level).compress(result.content)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            log.log_error(f'Failed to write the cached copy of {url}.', e)
+            return
+
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute('select size from entries where url = ?', (url,)).fetchone()
+            self._db.execute(
+                'insert or replace into entries '
+                '(url, file_name, final_url, etag, last_modified, encoding, size, stored_at, accessed_at) '
+                'values (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (url, file_name, result.url, etag, last_modified, result.encoding, len(data), now, now)
+            )
+            self._size += len(data) - (previous[0] if previous else 0)
+            self._stats['stores'] += 1
+            self._evict()
+            self._db.commit()
+
+    def delete(self, url: str) -> None:
+        with self._lock:
+            row = self._db.execute('select file_name, size from entries where url = ?', (url,)).fetchone()
+            if row is None:
+                return
+            self._remove(url, *row)
+            self._db.commit()
+
+    def count_miss(self) -> None:
+        with self._lock:
+            self._stats['misses'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = self._db.execute('select count(*) from entries').fetchone()[0]
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['size_bytes'] = self._size
+        stats['max_bytes'] = self.max_bytes
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _evict(self):
+        # Caller holds the lock; evict down to 90% so eviction does not run on every store
+        if self._size <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        rows = self._db.execute('select url, file_name, size from entries order by accessed_at').fetchall()
+        for url, file_name, size in rows:
+            if self._size <= target:
+                break
+            self._remove(url, file_name, size)
+            self._stats['evictions'] += 1
+
+    def _remove(self, url, file_name, size):
+        self._db.execute('delete from entries where url = ?', (url,))
+        self._size -= size
+        try:
+            os.remove(self._path(file_name))
+        except FileNotFoundError:
+            pass
+
+    def _path(self, file_name: str) -> str:
+        return os.path.join(self.directory, file_name[:2], file_name)
+
+
+class CachingFetcher(Fetching):
+    """
+    Fetch backend decorator that revalidates cached pages with conditional GETs. A `304 Not Modified`
+    answer is served from the cache as a regular 200 result with `from_cache` set.
+    """
+
+    def __init__(self, fetcher: Fetching, cache: HttpCache):
+        self.fetcher = fetcher
+        self.cache = cache
+
+    def fetch(self, request: FetchRequest) -> FetchResult:
+        return next(self.fetch_all([request]))
+
+    def fetch_all(self, requests: Iterable[FetchRequest]) -> Iterator[FetchResult]:
+        for result in self.fetcher.fetch_all(self._conditional(request) for request in requests):
+            yield self._resolve(result)
+
+    def stats(self) -> dict:
+        return self.fetcher.stats()
+
+    def close(self) -> None:
+        self.fetcher.close()
+
+    def _conditional(self, request: FetchRequest) -> FetchRequest:
+        entry = self.cache.lookup(request.url)
+        return FetchRequest(url=request.url,
+                            headers={**request.headers, **self.cache.conditional_headers(entry)},
+                            timeout=request.timeout,
+                            proxy=request.proxy,
+                            max_per_domain=request.max_per_domain,
+                            context=(request, entry),
+                            gate=request.gate)
+
+    def _resolve(self, result: FetchResult) -> FetchResult:
+        request, entry = result.context
+        result.context = request.context
+
+        if result.status_code == 304 and entry is not None:
+            content = self.cache.load(request.url, entry)
+            if content is not None:
+                result.status_code = 200
+                result.error = None
+                result.content = content
+                result.encoding = entry.get('encoding')
+                result.url = entry.get('final_url') or result.url
+                result.from_cache = True
+                return result
+            # The cached body is gone; fetch it again without validators
+            return self._resolve(self.fetcher.fetch(FetchRequest(url=request.url,
+                                                                 headers=request.headers,
+                                                                 timeout=request.timeout,
+                                                                 proxy=request.proxy,
+                                                                 max_per_domain=request.max_per_domain,
+                                                                 context=(request, None),
+                                                                 gate=request.gate)))
+
+        self.cache.count_miss()
+        if result.ok:
+            self.cache.store(request.url, result)
+        return result
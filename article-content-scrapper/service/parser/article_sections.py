@@ -0,0 +1,98 @@
+from typing import List
+
+from logger import log
+from service.parser.structured_data import document_structured_data
+from service.utils import date_utils
+
+
+def parse_article_sections(config: dict, document, url: str = '') -> tuple[dict, set]:
+    """
+    Extract the configured article sections from a parsed page. Sections carried by the page's JSON-LD /
+    OpenGraph metadata are taken from there and their selectors are not evaluated.
+
+    :param config: newspaper config holding the selector lists
+    :param document: a `SoupDocument` or `LxmlDocument`
+    :param url: article URL, only used in log messages
+    :return: the section values and the set of required sections no selector matched
+    """
+    structured = document_structured_data(config, document)
+    missing = set()
+    sections = {
+        'header': structured.get('header') or parse_element('header', config, document, url, missing),
+        'body': structured.get('body') or parse_element('body', config, document, url, missing),
+        'author': structured.get('author') or parse_element('author', config, document, url, missing),
+    }
+    if structured.get('date'):
+        # Already ISO 8601; no date regex or fuzzy parsing needed
+        sections['std_date'] = sections['date'] = structured['date']
+    else:
+        sections['std_date'], sections['date'] = parse_date('date', config, document, url, missing)
+    sections['keywords'] = structured.get('keywords') or parse_keyword_elements('keywords', config, document, url)
+    return sections, missing
+
+
+def _select(document, sc: dict, section_name: str, url: str) -> list:
+    elements = document.select(sc.get('name', ''), sc.get('type') or 'css')
+    if not elements:
+        log.log_warning(
+            f"[{section_name}] No elements found for selector '{sc.get('name', 'invalid')}' "
+            f"on page: {url}"
+        )
+    return elements
+
+
+def parse_element(section_name: str, config: dict, document, url: str, missing: set) -> str:
+    for sc in config.get(section_name, []):
+        elements = _select(document, sc, section_name, url)
+        if not elements:
+            continue
+
+        values = [ele.get_text(strip=True) for ele in elements]
+        return ' '.join(values).replace('\n', ' ').replace('\t', ' ').strip()
+
+    if section_name == 'author':
+        return ''
+
+    # Missing or Mismatching Configuration
+    missing.add(section_name)
+    return ''
+
+
+def parse_keyword_elements(section_name: str, config: dict, document, url: str) -> List[str]:
+    for sc in config.get(section_name, []):
+        elements = _select(document, sc, section_name, url)
+        if not elements:
+            continue
+
+        return [ele.get_text(strip=True) for ele in elements]
+
+    return []
+
+
+def parse_date(section_name: str, config: dict, document, url: str, missing: set) -> tuple[str, str]:
+    date_regex = config.get('dateRegex', [])
+
+    for sc in config.get(section_name, []):
+        elements = _select(document, sc, section_name, url)
+        attr = sc.get("attribute", "")
+        if not elements:
+            continue
+
+        values = (
+            [ele.get(attr, '').strip() for ele in elements]
+            if attr else
+            [ele.get_text(strip=True).replace('\n', '') for ele in elements]
+        )
+        raw_date = ''.join(values)
+
+        try:
+            matched = date_utils.get_matched_datetime_value(date_regex, raw_date)
+            parsed_date = date_utils.extract_date(matched or raw_date)
+            return parsed_date, raw_date
+        except Exception as e:
+            log.log_error(f'date_time parsing error for {url}:', e)
+            return '', raw_date
+
+    # Missing or Mismatching Configuration
+    missing.add(section_name)
+    return '', ''
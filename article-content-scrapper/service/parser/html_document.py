@@ -0,0 +1,130 @@
+from functools import lru_cache
+from typing import Optional
+
+import lxml.html
+from bs4 import BeautifulSoup
+from cssselect import SelectorError
+from lxml import etree
+from lxml.cssselect import CSSSelector
+
+from logger import log
+
+SOUP = 'soup'
+LXML = 'lxml'
+SUPPORTED_PARSERS = (SOUP, LXML)
+
+# Sections of a newspaper config holding selector lists
+SELECTOR_SECTIONS = ('header', 'body', 'author', 'date', 'keywords')
+
+# Strings inside these tags are not NavigableStrings in BeautifulSoup (Script, Stylesheet, TemplateString,
+# RubyTextString, RubyParenthesisString), so get_text() leaves them out
+NON_TEXT_TAGS = frozenset(('script', 'style', 'template', 'rt', 'rp'))
+
+
+@lru_cache(maxsize=4096)
+def compile_selector(query: str, selector_type: str = 'css'):
+    """
+    Compile a CSS selector (to XPath through cssselect) or an XPath expression once per process.
+    Returns None when the expression is not supported, so the caller can fall back to BeautifulSoup.
+    """
+    try:
+        if selector_type == 'xpath':
+            return etree.XPath(query)
+        return CSSSelector(query, translator='html')
+    except (SelectorError, etree.XPathSyntaxError) as e:
+        log.log_warning(f"Selector '{query}' cannot be compiled for lxml, BeautifulSoup is used instead: {e}")
+        return None
+
+
+def precompile_selectors(config: dict) -> None:
+    """
+    Compile every selector of a newspaper config up front, so parsing an article only runs compiled XPath.
+    """
+    for section_name in SELECTOR_SECTIONS:
+        for sc in config.get(section_name, []) or []:
+            if sc.get('name'):
+                compile_selector(sc.get('name'), sc.get('type') or 'css')
+
+
+class SoupDocument:
+    """
+    BeautifulSoup ('html.parser') document; its elements already offer `get_text` and `get`.
+    """
+
+    def __init__(self, doc: str, soup: Optional[BeautifulSoup] = None):
+        self.soup = soup if soup is not None else BeautifulSoup(doc, 'html.parser')
+
+    def select(self, query: str, selector_type: str = 'css') -> list:
+        return self.soup.select(query)
+
+
+class LxmlElement:
+    """
+    lxml element with the subset of the bs4 Tag API used by the article parser.
+    """
+    __slots__ = ('element',)
+
+    def __init__(self, element):
+        self.element = element
+
+    def get(self, attribute: str, default=None):
+        return self.element.get(attribute, default)
+
+    def get_text(self, strip: bool = False) -> str:
+        root = self.element
+        if not isinstance(root.tag, str):
+            return ''
+        parts = []
+        _collect_text(root, parts, root.tag in NON_TEXT_TAGS)
+        if strip:
+            parts = [part.strip() for part in parts]
+            return ''.join(part for part in parts if part)
+        return ''.join(parts)
+
+
+def _collect_text(element, parts: list, include_non_text: bool):
+    if element.text:
+        parts.append(element.text)
+    for child in element:
+        # Comments and processing instructions have a non-string tag, but their tail is still text
+        if isinstance(child.tag, str) and (include_non_text or child.tag not in NON_TEXT_TAGS):
+            _collect_text(child, parts, include_non_text)
+        if child.tail:
+            parts.append(child.tail)
+
+
+class LxmlDocument:
+    """
+    lxml HTML document queried with compiled selectors. Selectors cssselect cannot translate are run on a
+    BeautifulSoup tree of the same page, built only when such a selector is met.
+    """
+
+    def __init__(self, doc: str):
+        self.doc = doc
+        self._soup = None
+        try:
+            self.root = lxml.html.document_fromstring(doc)
+        except ValueError:
+            # Unicode strings with an XML encoding declaration are rejected by lxml
+            self.root = lxml.html.document_fromstring(doc.encode('utf-8'),
+                                                      parser=lxml.html.HTMLParser(encoding='utf-8'))
+
+    def select(self, query: str, selector_type: str = 'css') -> list:
+        compiled = compile_selector(query, selector_type or 'css')
+        if compiled is None:
+            if self._soup is None:
+                self._soup = SoupDocument(self.doc)
+            return self._soup.select(query)
+        return [LxmlElement(element) for element in compiled(self.root) if isinstance(element, etree._Element)]
+
+
+def load_document(doc: str, parser: str = LXML):
+    """
+    Parse a page with the requested backend. Pages lxml cannot parse at all are parsed by BeautifulSoup.
+    """
+    if parser == LXML:
+        try:
+            return LxmlDocument(doc)
+        except (etree.ParserError, ValueError) as e:
+            log.log_warning(f'lxml could not parse the page, falling back to BeautifulSoup: {e}')
+    return SoupDocument(doc)
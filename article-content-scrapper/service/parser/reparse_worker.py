@@ -0,0 +1,35 @@
+"""
+Page parsing run in the reparse process pool.
+"""
+from logger import log
+from service.parser.article_sections import parse_article_sections
+from service.parser.html_document import load_document, precompile_selectors, LXML
+from service.parser.structured_data import structured_data_coverage
+
+_config: dict = {}
+_html_parser: str = LXML
+
+
+def init_worker(config: dict, html_parser: str) -> None:
+    global _config, _html_parser
+    _config, _html_parser = config, html_parser
+    structured_data_coverage.reset()
+    if html_parser == LXML:
+        precompile_selectors(config)
+
+
+def parse_pages(pages: list[tuple[int, str, str]]) -> list[tuple[int, dict | None, list]]:
+    """
+    Parse `(article_id, url, html)` pages with the worker's newspaper config into
+    `(article_id, sections, missing sections)`; sections are None when the page could not be parsed.
+    """
+    results = []
+    for article_id, url, html in pages:
+        try:
+            document = load_document(html, _html_parser)
+            sections, missing = parse_article_sections(_config, document, url)
+            results.append((article_id, sections, sorted(missing)))
+        except Exception as e:
+            log.log_error(f'Error occurred while reparsing article {article_id}.', e)
+            results.append((article_id, None, []))
+    return results
@@ -0,0 +1,184 @@
+import html
+import json
+import threading
+from datetime import datetime
+from typing import Optional
+
+from core.config import data_source as ds
+from logger import log
+
+STRUCTURED_FIELDS = ('header', 'body', 'author', 'date', 'keywords')
+
+ARTICLE_TYPES = frozenset(('NewsArticle', 'Article', 'ReportageNewsArticle', 'AnalysisNewsArticle',
+                           'OpinionNewsArticle', 'BackgroundNewsArticle', 'ReviewNewsArticle', 'BlogPosting',
+                           'LiveBlogPosting', 'Report'))
+
+# Shorter `articleBody` values are teasers; the body selectors are used instead
+MIN_ARTICLE_BODY_LENGTH = 200
+
+# Collects the JSON-LD blocks and meta tags of a rendered page for `structured_fields`
+STRUCTURED_DATA_JS = '''
+() => {
+    const jsonLd = Array.from(document.querySelectorAll('script[type="application/ld+json"]'))
+        .map((node) => node.textContent);
+    const meta = {};
+    for (const node of document.querySelectorAll('meta[property], meta[name]')) {
+        const key = node.getAttribute('property') || node.getAttribute('name');
+        if (!(key in meta)) meta[key] = node.getAttribute('content') || '';
+    }
+    return {jsonLd: jsonLd, meta: meta};
+}
+'''
+
+
+def structured_data_enabled(config: dict) -> bool:
+    enabled = config.get('structuredData')
+    return ds.STRUCTURED_DATA_ENABLED if enabled is None else bool(enabled)
+
+
+def document_structured_data(config: dict, document) -> dict:
+    """
+    Article fields carried by the JSON-LD and OpenGraph metadata of a parsed page (`SoupDocument` or
+    `LxmlDocument`). Empty when structured data is disabled for the newspaper.
+    """
+    if not structured_data_enabled(config):
+        return {}
+
+    json_ld = [element.get_text() for element in document.select('script[type="application/ld+json"]')]
+    meta = {}
+    for element in document.select('meta[property], meta[name]'):
+        meta.setdefault(element.get('property') or element.get('name'), element.get('content') or '')
+    return _record(config, structured_fields(json_ld, meta))
+
+
+def page_structured_data(config: dict, page_data: Optional[dict]) -> dict:
+    """
+    Same as `document_structured_data` for the result of STRUCTURED_DATA_JS evaluated in a browser.
+    """
+    if not structured_data_enabled(config) or not page_data:
+        return {}
+    return _record(config, structured_fields(page_data.get('jsonLd') or [], page_data.get('meta') or {}))
+
+
+def structured_fields(json_ld: list[str], meta: dict) -> dict:
+    """
+    Map a `NewsArticle` (or similar) JSON-LD object, falling back to OpenGraph / article meta tags, onto
+    the article sections. `date` is only filled with a valid ISO 8601 timestamp, returned normalised.
+    """
+    article = _find_article(json_ld)
+
+    fields = {
+        'header': _text(article.get('headline')) or _text(meta.get('og:title')),
+        'author': _authors(article.get('author')) or _text(meta.get('author')),
+        'date': _iso_date(article.get('datePublished')) or _iso_date(meta.get('article:published_time')),
+        'keywords': _keywords(article.get('keywords')) or _keywords(meta.get('news_keywords')),
+    }
+    body = _text(article.get('articleBody'))
+    if len(body) >= MIN_ARTICLE_BODY_LENGTH:
+        fields['body'] = body
+    return {key: value for key, value in fields.items() if value}
+
+
+def _find_article(json_ld: list[str]) -> dict:
+    for block in json_ld:
+        try:
+            data = json.loads(block)
+        except (TypeError, ValueError):
+            continue
+        pending = data if isinstance(data, list) else [data]
+        while pending:
+            item = pending.pop(0)
+            if not isinstance(item, dict):
+                continue
+            types = item.get('@type')
+            types = types if isinstance(types, list) else [types]
+            if ARTICLE_TYPES.intersection(t for t in types if isinstance(t, str)):
+                return item
+            for key in ('@graph', 'mainEntity', 'mainEntityOfPage'):
+                nested = item.get(key)
+                if isinstance(nested, list):
+                    pending.extend(nested)
+                elif isinstance(nested, dict):
+                    pending.append(nested)
+    return {}
+
+
+def _text(value) -> str:
+    if isinstance(value, list):
+        value = value[0] if value else ''
+    if not isinstance(value, str):
+        return ''
+    return ' '.join(html.unescape(value).split())
+
+
+def _authors(value) -> str:
+    values = value if isinstance(value, list) else [value]
+    names = []
+    for author in values:
+        name = author.get('name') if isinstance(author, dict) else author
+        name = _text(name)
+        # Some sites put the author page URL here
+        if name and not name.startswith('http'):
+            names.append(name)
+    return ', '.join(names)
+
+
+def _keywords(value) -> list[str]:
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        return []
+    return [keyword for keyword in (_text(v) for v in value) if keyword]
+
+
+def _iso_date(value) -> str:
+    value = _text(value)
+    if not value:
+        return ''
+    try:
+        return datetime.fromisoformat(value).isoformat()
+    except ValueError:
+        return ''
+
+
+class StructuredDataCoverage:
+    """
+    Share of a newspaper's articles whose sections came from structured metadata, per section.
+    A section covered for every article no longer needs its selectors in the newspaper config.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        # Also called in forked reparse workers, which may have copied the lock while another thread held it
+        self._counts: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, newspaper_id, fields) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(newspaper_id, dict.fromkeys(('articles',) + STRUCTURED_FIELDS, 0))
+            counts['articles'] += 1
+            for field_name in fields:
+                counts[field_name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = {key: dict(value) for key, value in self._counts.items()}
+        return {
+            str(newspaper_id): {
+                'articles': value['articles'],
+                **{name: round(value[name] / value['articles'], 4) for name in STRUCTURED_FIELDS}
+            }
+            for newspaper_id, value in counts.items()
+        }
+
+
+structured_data_coverage = StructuredDataCoverage()
+
+
+def _record(config: dict, fields: dict) -> dict:
+    structured_data_coverage.record(config.get('newspaperID'), fields)
+    if fields:
+        log.log_info(f"Structured metadata provides: {', '.join(sorted(fields))}")
+    return fields
@@ -3,8 +3,11 @@ import sys
 import time
 import traceback
 import threading
-from dataclasses import dataclass
-from typing import List
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from functools import partial
+from typing import Callable, List, Optional
 
 import pika
 from pika.channel import Channel
@@ -15,6 +18,7 @@ from core.config import data_source as ds
 from exceptions.custom_exception import RabbitMQConnectionException
 from logger import log
 from service.utils import mail_utils
+from service.utils.near_duplicates import near_duplicates
 from service import article_crawler
 from model.article_request import ArticleRequest
 from model.system_error_mail import SysErrorModel
@@ -131,51 +135,373 @@ class RabbitMQConnection:
             log.log_warning("RabbitMQ connection closed.")
 
 
-def publish_message(queue_info: RabbitMQQueueInfo):
-    try:
-        channel = rabbitmq_connection.channel
-        if not channel:
-            raise RabbitMQConnectionException()
-
-        channel.basic_publish(
-            exchange=queue_info.exchange,
-            routing_key=queue_info.routing_key,
-            body=queue_info.message,
-            properties=pika.BasicProperties(
-                delivery_mode=queue_info.delivery_mode,
-                priority=queue_info.priority
-            )
-        )
-        log.log_info(f"Message published to queue: {queue_info.queue}")
-    except (ConnectionClosed, StreamLostError, ConnectionResetError) as e:
-        log.log_error(f"Connection issue: {e}. Resetting and retrying...")
-        rabbitmq_connection.reconnect()
-        # Only retry the operation once after reconnecting
-        if rabbitmq_connection.channel:  # Check if the connection is ready
-            channel = rabbitmq_connection.channel
+@dataclass(eq=False)
+class _Outgoing:
+    queue_info: RabbitMQQueueInfo
+    attempts: int = 0
+    dead_letter: bool = False
+    on_confirmed: Optional[Callable[[], None]] = None
+
+
+class ConfirmedPublisher:
+    """
+    Publishes from any thread over a dedicated connection owned by a single I/O thread.
+
+    `publish` only queues the message; the publisher thread keeps up to `max_in_flight` messages
+    unconfirmed on a confirm-mode channel and settles them as the broker acks, usually many at once
+    (`multiple`). Nacked messages, and messages unconfirmed when the connection drops, are published
+    again after an exponential backoff until they have been attempted `max_attempts` times; a message
+    out of attempts is then published to `fail_exchange` (same routing key, fresh attempts) instead of
+    being lost, and only dropped when that fails as well. A message's `on_confirmed` callback runs on a
+    separate thread once the broker acked it. The connection itself is re-established with backoff capped at `max_backoff` seconds. `publish` blocks
+    only once `queue_size` messages are waiting.
+    """
+
+    def __init__(self, config: RabbitMQConfig, max_in_flight: int, max_attempts: int, queue_size: int,
+                 max_backoff: float = 30, fail_exchange: str = ''):
+        self.config = config
+        self.fail_exchange = fail_exchange
+        self.max_in_flight = max_in_flight
+        self.max_attempts = max_attempts
+        self.queue_size = queue_size
+        self.max_backoff = max_backoff
+        self._pending: deque[_Outgoing] = deque()
+        self._unconfirmed: dict[int, _Outgoing] = {}
+        self._delayed: list[_Outgoing] = []  # nacked, waiting for their backoff
+        self._cond = threading.Condition()
+        self._connection = None
+        self._channel = None
+        self._delivery_tag = 0
+        self._thread = None
+        self._closing = False
+        # Callbacks may hit the database; keep them off the I/O loop
+        self._callbacks = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mq-confirmed')
+        self._stats = {'published': 0, 'confirmed': 0, 'nacked': 0, 'republished': 0, 'dead_lettered': 0, 'dropped': 0,
+                       'reconnects': 0, 'confirm_batches': 0}
+
+    def publish(self, queue_info: RabbitMQQueueInfo, on_confirmed: Optional[Callable[[], None]] = None) -> None:
+        with self._cond:
+            if self._closing:
+                raise RabbitMQConnectionException('Publisher is closed.')
+            while len(self._pending) >= self.queue_size:
+                self._cond.wait()
+            self._pending.append(_Outgoing(queue_info, on_confirmed=on_confirmed))
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='mq-publisher', daemon=True)
+                self._thread.start()
+        self._wake()
+
+    def _wake(self):
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(self._drain)
+            except Exception:
+                pass  # Connection is going away; the next one drains on open
+
+    # Runs on the publisher thread only from here on
+
+    def _run(self):
+        delay = 1
+        while not self._closing:
+            credentials = pika.PlainCredentials(self.config.username, self.config.password)
+            parameters = pika.ConnectionParameters(host=self.config.host, port=self.config.port,
+                                                   credentials=credentials, virtual_host=self.config.virtual_host)
+            self._connection = pika.SelectConnection(parameters,
+                                                     on_open_callback=self._on_connection_open,
+                                                     on_open_error_callback=self._on_connection_lost,
+                                                     on_close_callback=self._on_connection_lost)
+            self._connection.ioloop.start()
+
+            connected = self._channel is not None
+            self._channel = None
+            self._connection = None
+            self._requeue_unconfirmed()
+            if self._closing:
+                break
+            delay = 1 if connected else min(delay * 2, self.max_backoff)
+            with self._cond:
+                self._stats['reconnects'] += 1
+            log.log_warning(f"Publisher connection to RabbitMQ lost, reconnecting in {delay}s.")
+            time.sleep(delay)
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_lost(self, connection, reason):
+        if not self._closing:
+            log.log_error(f"Publisher RabbitMQ connection closed: {reason}")
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self._delivery_tag = 0
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.confirm_delivery(self._on_confirm, callback=lambda _: self._set_channel(channel))
+
+    def _on_channel_closed(self, channel, reason):
+        self._channel = None
+        connection = self._connection
+        if connection is not None and connection.is_open:
+            log.log_warning(f"Publisher channel closed: {reason}")
+            connection.close()
+
+    def _set_channel(self, channel):
+        self._channel = channel
+        log.log_info("RabbitMQ publisher connection established.")
+        self._drain()
+
+    def _drain(self):
+        channel = self._channel
+        if channel is None or not channel.is_open:
+            return
+        while True:
+            with self._cond:
+                if not self._pending or len(self._unconfirmed) >= self.max_in_flight:
+                    break
+                message = self._pending.popleft()
+                self._cond.notify_all()
+            info = message.queue_info
+            message.attempts += 1
+            self._delivery_tag += 1
+            self._unconfirmed[self._delivery_tag] = message
             channel.basic_publish(
-                exchange=queue_info.exchange,
-                routing_key=queue_info.routing_key,
-                body=queue_info.message,
-                properties=pika.BasicProperties(
-                    delivery_mode=queue_info.delivery_mode,
-                    priority=queue_info.priority
-                )
+                exchange=info.exchange,
+                routing_key=info.routing_key,
+                body=info.message,
+                properties=pika.BasicProperties(delivery_mode=info.delivery_mode, priority=info.priority)
             )
-            log.log_info(f"Message published to queue after reconnecting: {queue_info.queue}")
+            with self._cond:
+                self._stats['published'] += 1
+
+    def _on_confirm(self, frame):
+        method = frame.method
+        if method.multiple:
+            tags = [tag for tag in self._unconfirmed if tag <= method.delivery_tag]
+        else:
+            tags = [method.delivery_tag] if method.delivery_tag in self._unconfirmed else []
+        messages = [self._unconfirmed.pop(tag) for tag in tags]
+
+        acked = isinstance(method, pika.spec.Basic.Ack)
+        with self._cond:
+            self._stats['confirm_batches'] += 1
+            self._stats['confirmed' if acked else 'nacked'] += len(messages)
+            self._cond.notify_all()
+        if not acked:
+            for message in messages:
+                self._retry(message)
+        else:
+            for message in messages:
+                if message.on_confirmed is not None:
+                    self._callbacks.submit(self._run_callback, message)
+        self._drain()
+
+    @staticmethod
+    def _run_callback(message: _Outgoing):
+        try:
+            message.on_confirmed()
+        except Exception as e:
+            log.log_error(f"Confirmation callback of a message for {message.queue_info.queue} failed", exception=e)
+
+    def _retry(self, message: _Outgoing):
+        if message.attempts >= self.max_attempts:
+            dead_letter = self._dead_letter(message)
+            if dead_letter is not None:
+                with self._cond:
+                    self._pending.appendleft(dead_letter)
+            return
+        delay = min(2 ** (message.attempts - 1), self.max_backoff)
+        self._delayed.append(message)
+        self._connection.ioloop.call_later(delay, lambda: self._republish(message))
+
+    def _republish(self, message: _Outgoing):
+        if message not in self._delayed:
+            return  # Already requeued by a reconnect
+        self._delayed.remove(message)
+        with self._cond:
+            self._pending.appendleft(message)
+            self._stats['republished'] += 1
+        self._drain()
+
+    def _requeue_unconfirmed(self):
+        # Backoff timers die with the connection's I/O loop, so delayed messages go back too
+        messages = [self._unconfirmed.pop(tag) for tag in sorted(self._unconfirmed)] + self._delayed
+        self._delayed = []
+        with self._cond:
+            for message in reversed(messages):
+                if message.attempts >= self.max_attempts:
+                    message = self._dead_letter(message)
+                    if message is None:
+                        continue
+                else:
+                    self._stats['republished'] += 1
+                self._pending.appendleft(message)
+            self._cond.notify_all()
+
+    def _dead_letter(self, message: _Outgoing) -> Optional[_Outgoing]:
+        info = message.queue_info
+        with self._cond:
+            if message.dead_letter or not self.fail_exchange:
+                self._stats['dropped'] += 1
+                log.log_error(f"Dropping message for {info.queue} after {message.attempts} attempts.")
+                return None
+            self._stats['dead_lettered'] += 1
+        log.log_warning(f"Publishing message for {info.queue} to {self.fail_exchange} after "
+                        f"{message.attempts} attempts.")
+        return _Outgoing(replace(info, exchange=self.fail_exchange), dead_letter=True)
+
+    def close(self, timeout: float = 30) -> None:
+        """
+        Wait up to `timeout` seconds for queued and unconfirmed messages to be confirmed, then disconnect.
+        """
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._closing = True
+            while (self._pending or self._unconfirmed or self._delayed) and self._thread is not None and self._thread.is_alive():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    log.log_warning(f"{len(self._pending) + len(self._unconfirmed)} messages were not confirmed "
+                                    f"before shutdown.")
+                    break
+                self._cond.wait(min(remaining, 1))
+        connection = self._connection
+        if connection is not None:
+            try:
+                connection.ioloop.add_callback_threadsafe(connection.close)
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(5)
+        self._callbacks.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+            stats['in_flight'] = len(self._unconfirmed) + len(self._delayed)
+        stats['connected'] = self._channel is not None
+        return stats
+
+
+def publish_message(queue_info: RabbitMQQueueInfo, on_confirmed: Optional[Callable[[], None]] = None):
+    try:
+        article_publisher.publish(queue_info, on_confirmed)
     except Exception as e:
         log.log_error(f"Failed to publish message to {queue_info.queue}", exception=e)
         raise
 
 
 def publish_message_into_article_analyzer(message: str):
+    fingerprint = near_duplicates.fingerprint(json.loads(message))
+    if fingerprint is not None and near_duplicates.original_of(fingerprint) is not None:
+        # Linked to the analysis of the original instead
+        return
     queue_info = RabbitMQQueueInfo(
         exchange=ds.SPOKESPERSON_ARTICLE_EXCHANGE,
         routing_key=ds.SPOKESPERSON_ARTICLE_CONTENT_ROUTING_KEY,
         queue=ds.SPOKESPERSON_ARTICLE_CONTENT_QUEUE,
         message=message
     )
-    publish_message(queue_info)
+    # Only an article the analyzer received becomes an original for later near-duplicates
+    publish_message(queue_info, partial(near_duplicates.record_original, fingerprint) if fingerprint else None)
+
+
+class ConsumerWorkers:
+    """
+    Crawls delivered batches off the pika I/O thread.
+
+    A message is split per newspaper and each part runs on the thread pool of its execution mode, so up to
+    MQ_CONSUMER_PREFETCH messages are crawled at once and a slow newspaper no longer holds up the
+    connection (or its heartbeats). Once the last part finished, the message is acked, or nacked when a
+    part failed, on the connection's thread through `add_callback_threadsafe`.
+    """
+
+    def __init__(self, workers: dict[str, int]):
+        self._executors = {mode: ThreadPoolExecutor(max_workers=count, thread_name_prefix=f'crawl-{mode}')
+                           for mode, count in workers.items()}
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._stats = {'messages': 0, 'acked': 0, 'nacked': 0, 'lost': 0,
+                       'parts': dict.fromkeys(workers, 0)}
+
+    def submit(self, ch, delivery_tag: int, articles: List[ArticleRequest]) -> None:
+        from service.article_crawler import group_by_newspaper, execution_mode_of, extract_newspaper_batch
+
+        # Resolved before anything is submitted: raising here leaves the message to the caller, unsettled
+        parts = [(newspaper_id, batch, execution_mode_of(newspaper_id))
+                 for newspaper_id, batch in group_by_newspaper(articles).items()]
+
+        message = {'remaining': len(parts), 'failed': False}
+        with self._lock:
+            self._in_flight += 1
+            self._stats['messages'] += 1
+        if not parts:
+            self._settle(ch, delivery_tag, True)
+            return
+
+        for index, (newspaper_id, batch, mode) in enumerate(parts):
+            # Unsupported modes are only logged by the crawler, any pool will do
+            mode = mode if mode in self._executors else 'no-selenium'
+            try:
+                future = self._executors[mode].submit(extract_newspaper_batch, newspaper_id, batch, True)
+            except Exception as e:
+                # The parts already submitted may still be running: the message is settled, as failed, by the last
+                # of them, or right here when none is left
+                log.log_error(f"Unable to submit the batch of newspaper {newspaper_id}", exception=e)
+                self._parts_finished(ch, delivery_tag, message, len(parts) - index, failed=True)
+                return
+            with self._lock:
+                self._stats['parts'][mode] += 1
+            future.add_done_callback(partial(self._part_done, ch, delivery_tag, message))
+
+    def _part_done(self, ch, delivery_tag: int, message: dict, future) -> None:
+        error = future.exception()
+        if error is not None:
+            log.log_error("Error processing RabbitMQ message", exception=error)
+        self._parts_finished(ch, delivery_tag, message, 1, failed=error is not None)
+
+    def _parts_finished(self, ch, delivery_tag: int, message: dict, count: int, failed: bool) -> None:
+        with self._lock:
+            message['remaining'] -= count
+            message['failed'] = message['failed'] or failed
+            if message['remaining']:
+                return
+
+        try:
+            ch.connection.add_callback_threadsafe(partial(self._settle, ch, delivery_tag, not message['failed']))
+        except Exception as e:
+            # The broker redelivers the message once the consumer reconnects
+            log.log_warning(f"Unable to acknowledge message {delivery_tag}, connection is gone: {e}")
+            with self._lock:
+                self._in_flight -= 1
+                self._stats['lost'] += 1
+
+    def _settle(self, ch, delivery_tag: int, success: bool) -> None:
+        try:
+            if success:
+                ch.basic_ack(delivery_tag=delivery_tag)
+            else:
+                ch.basic_nack(delivery_tag=delivery_tag, requeue=False)
+            outcome = 'acked' if success else 'nacked'
+        except Exception as e:
+            log.log_warning(f"Unable to acknowledge message {delivery_tag}: {e}")
+            outcome = 'lost'
+        with self._lock:
+            self._in_flight -= 1
+            self._stats[outcome] += 1
+
+    def busy(self) -> bool:
+        with self._lock:
+            return self._in_flight > 0
+
+    def shutdown(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, parts=dict(self._stats['parts']))
+            stats['in_flight'] = self._in_flight
+        return stats
 
 
 def message_callback(ch: Channel, method: Basic.Deliver, properties: BasicProperties, body: bytes):
@@ -186,10 +512,7 @@ def message_callback(ch: Channel, method: Basic.Deliver, properties: BasicProper
 
         log.log_info(f"Received {len(article_meta)} articles.")
 
-        from service.article_crawler import extract_article_batch
-        extract_article_batch(article_meta, publish=True)
-
-        ch.basic_ack(delivery_tag=method.delivery_tag)
+        consumer_workers.submit(ch, method.delivery_tag, article_meta)
 
     except Exception as e:
         log.log_error("Error processing RabbitMQ message", exception=e)
@@ -197,7 +520,7 @@ def message_callback(ch: Channel, method: Basic.Deliver, properties: BasicProper
 
 
 def start_consumer(queue_name: str):
-    while True:
+    while not consumer_stopping.is_set():
         try:
             channel = rabbitmq_connection.get_fresh_channel()
             if not channel:
@@ -211,8 +534,8 @@ def start_consumer(queue_name: str):
             # Declare queue with dead-letter settings
             channel.queue_declare(queue=queue_name, durable=True, arguments=queue_args)
 
-            # Ensure only one message is processed at a time
-            channel.basic_qos(prefetch_count=1)
+            # Messages crawled concurrently by the consumer workers
+            channel.basic_qos(prefetch_count=ds.MQ_CONSUMER_PREFETCH)
 
             # Bind callback function
             channel.basic_consume(
@@ -222,7 +545,11 @@ def start_consumer(queue_name: str):
             )
 
             log.log_info(f"Started consumer on queue: {queue_name}")
-            channel.start_consuming()  # Blocking call — exits only on failure
+            channel.start_consuming()  # Blocking call — exits on failure or when close_consumer cancels it
+
+            # Keep the connection serving the acks of the batches still being crawled
+            while consumer_workers.busy():
+                rabbitmq_connection.connection.process_data_events(time_limit=0.5)
 
         except (ConnectionClosed, StreamLostError, ConnectionResetError) as e:
             log.log_error(f"Consumer connection issue: {e}. Attempting to reconnect...")
@@ -247,6 +574,24 @@ def start_consumer(queue_name: str):
 def run_consumer_in_thread(queue_name: str):
     thread = threading.Thread(target=start_consumer, args=(queue_name,), daemon=True)
     thread.start()
+    return thread
+
+
+def close_consumer(timeout: float = 300):
+    """
+    Stop taking new messages and wait up to `timeout` seconds for the batches in progress to be crawled and acked.
+    """
+    consumer_stopping.set()
+    connection, channel = rabbitmq_connection.connection, rabbitmq_connection.channel
+    try:
+        if connection is not None and connection.is_open and channel is not None:
+            connection.add_callback_threadsafe(channel.stop_consuming)
+    except Exception as e:
+        log.log_warning(f"Unable to stop the RabbitMQ consumer: {e}")
+    consumer_thread.join(timeout)
+    if consumer_thread.is_alive():
+        log.log_warning("RabbitMQ consumer did not drain before shutdown; unacked messages will be redelivered.")
+    consumer_workers.shutdown()
 
 
 # Create the RabbitMQ connection instance
@@ -258,5 +603,21 @@ rabbitmq_connection = RabbitMQConnection(RabbitMQConfig(
     virtual_host=ds.MQ_VIRTUAL_HOST
 ))
 
+# Publishing runs on its own connection; the consumer's blocking channel above is not thread-safe
+article_publisher = ConfirmedPublisher(
+    rabbitmq_connection.config,
+    max_in_flight=ds.MQ_PUBLISH_MAX_IN_FLIGHT,
+    max_attempts=ds.MQ_PUBLISH_MAX_ATTEMPTS,
+    queue_size=ds.MQ_PUBLISH_QUEUE_SIZE,
+    fail_exchange=ds.SPOKESPERSON_ARTICLE_FAIL_EXCHANGE
+)
+
+consumer_workers = ConsumerWorkers({
+    'selenium': ds.MQ_WORKERS_SELENIUM,
+    'no-selenium': ds.MQ_WORKERS_NO_SELENIUM,
+    'auto': ds.MQ_WORKERS_AUTO
+})
+consumer_stopping = threading.Event()
+
 # Start the consumer thread
-run_consumer_in_thread(ds.SPOKESPERSON_ARTICLE_METADATA_QUEUE)
+consumer_thread = run_consumer_in_thread(ds.SPOKESPERSON_ARTICLE_METADATA_QUEUE)
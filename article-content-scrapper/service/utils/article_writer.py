@@ -0,0 +1,127 @@
+import queue
+import threading
+import time
+
+from core.config import data_source as ds
+from logger import log
+from service.db import article_row, insert_articles_into_db
+from service.utils.dedup import dedup_index, url_hash
+
+_STOP = object()
+
+
+class ArticleWriteBuffer:
+    """
+    Write-behind buffer for scraped articles.
+
+    Crawlers hand articles to `add`, which only queues the prepared row. A background thread stores them with
+    `insert_articles_into_db` once `batch_size` rows are pending or the oldest pending row waited
+    `flush_seconds`, whichever comes first. `add` blocks only when `queue_size` rows are waiting, i.e. when the
+    database cannot keep up at all.
+    """
+
+    def __init__(self, batch_size: int, flush_seconds: float, queue_size: int):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stats = {'queued': 0, 'stored': 0, 'failed': 0, 'batches': 0, 'flush_seconds': 0.0,
+                       'max_flush_seconds': 0.0}
+
+    def add(self, data: dict, complete: bool = True) -> None:
+        """
+        Queue an article for storage. Only a `complete` article (no required section missing) is recorded as
+        scraped; an incomplete one is stored but crawled again on its next dispatch.
+        """
+        try:
+            row = article_row(data)
+            scraped = (data.get('article_id'), url_hash(data.get('link') or ''), data.get('newspaper_id')) \
+                if complete else None
+        except Exception as err:
+            log.log_error(f'error occur while inserting data into db. \n {err}')
+            return
+        self._ensure_started()
+        self._queue.put((row, scraped))
+        if scraped is not None:
+            dedup_index.add(scraped[0], scraped[1])
+        with self._lock:
+            self._stats['queued'] += 1
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='article-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        started = time.monotonic()
+        try:
+            stored = insert_articles_into_db([row for row, _ in batch], [scraped for _, scraped in batch])
+        except Exception as err:
+            log.log_error('error occur while inserting article batch into db. for more detail', exception=err)
+            stored = 0
+        elapsed = time.monotonic() - started
+
+        with self._lock:
+            stats = self._stats
+            stats['batches'] += 1
+            stats['stored'] += stored
+            stats['failed'] += len(batch) - stored
+            stats['flush_seconds'] += elapsed
+            stats['max_flush_seconds'] = max(stats['max_flush_seconds'], elapsed)
+
+    def close(self, timeout: float = 30) -> None:
+        """
+        Store everything still queued and stop the writer thread.
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            log.log_warning(f'Article writer did not drain within {timeout}s; {self._queue.qsize()} rows not stored')
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+        stats['pending'] = self._queue.qsize()
+        stats['avg_batch_size'] = round((stats['stored'] + stats['failed']) / stats['batches'], 2) \
+            if stats['batches'] else 0.0
+        stats['avg_flush_seconds'] = round(stats['flush_seconds'] / stats['batches'], 4) if stats['batches'] else 0.0
+        stats['flush_seconds'] = round(stats['flush_seconds'], 3)
+        stats['max_flush_seconds'] = round(stats['max_flush_seconds'], 3)
+        return stats
+
+
+article_writer = ArticleWriteBuffer(batch_size=ds.ARTICLE_WRITE_BATCH_SIZE,
+                                    flush_seconds=ds.ARTICLE_WRITE_FLUSH_SECONDS,
+                                    queue_size=ds.ARTICLE_WRITE_QUEUE_SIZE)
+
+
+def close_article_writer():
+    article_writer.close()
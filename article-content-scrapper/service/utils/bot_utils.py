@@ -1,7 +1,7 @@
 import json
 import os
 import random
-from typing import Optional
+from typing import Iterator, Optional
 
 from core.config import data_source as ds
 from logger import log
@@ -10,6 +10,7 @@ from datetime import datetime
 from model.article_request import ArticleRequest
 from service.db import get_failed_articles_by_article_id, upsert_into_failed_articles, \
     get_failed_articles_by_newspaper_id, find_article_configuration
+from service.utils.page_store import failed_page_store
 
 
 def save_as_html(page_source: str, article: ArticleRequest):
@@ -34,19 +35,9 @@ def save_as_html(page_source: str, article: ArticleRequest):
         upsert_into_failed_articles(article_info)
         return
 
-    # Construct file path
-    folder_path = ds.SPOKESPERSON_FAILED_ARTICLE_DIRECTORY
-    file_name = f"{article.article_id}.html"
-    abs_file_path = os.path.join(folder_path, file_name)
-
-    # Ensure directory exists
-    os.makedirs(folder_path, exist_ok=True)
-
-    # Write HTML to file
     try:
-        with open(abs_file_path, 'w', encoding="utf-8") as file:
-            file.write(page_source)
-        log.log_info(f"Webpage for article {article.article_id} saved at: {abs_file_path}")
+        failed_page_store().put(article.article_id, page_source)
+        log.log_info(f"Webpage for article {article.article_id} saved to the failed page store")
         # Upsert the article info into failed_articles
         upsert_into_failed_articles(article_info)
     except Exception as e:
@@ -77,6 +68,7 @@ def reparse_failed_articles_by_newspaperid(newspaperid) -> list[dict]:
 
         soup_service = ArticleSoupParser(config=article_config.get('doc'), can_publish=False)
         articles_response.extend(soup_service.reparse_failed_articles(articles))
+        failed_page_store().collect_garbage()
 
         return articles_response
 
@@ -88,26 +80,44 @@ def reparse_failed_articles_by_newspaperid(newspaperid) -> list[dict]:
 
 
 def fetch_failed_article_html(article_id: int) -> str | None:
-    folder_path = ds.SPOKESPERSON_FAILED_ARTICLE_DIRECTORY
-    file_name = f"{article_id}.html"
-    abs_file_path = os.path.join(folder_path, file_name)
-
     try:
+        content = failed_page_store().get(article_id)
+        if content is None:
+            content = _read_legacy_html(article_id)
+        if content is None:
+            log.log_error(f"HTML not found for article_id={article_id}")
+        return content
 
-        if not os.path.exists(abs_file_path):
-            log.log_error(f"HTML file not found for article_id={article_id}: {abs_file_path}")
-            return None
+    except Exception as e:
+        log.log_error(f"Exception occurred while reading HTML for article_id={article_id}", exception=e)
+        return None
 
-        with open(abs_file_path, 'r', encoding="utf-8") as file:
-            content = file.read()
-            return content
 
-    except Exception as e:
-        log.log_error(
-            f"Exception occurred while reading HTML for article_id={article_id}, path={abs_file_path}",
-            exception=e
-        )
+def iter_failed_article_html(article_ids: list[int]) -> Iterator[tuple[int, str]]:
+    """
+    Stream `(article_id, html)` of the saved pages of the given articles, in storage order. Pages still saved
+    as `<article_id>.html` files (not yet migrated) come last.
+    """
+    found = set()
+    for article_id, html in failed_page_store().iter_pages(article_ids):
+        found.add(article_id)
+        yield article_id, html
+
+    for article_id in article_ids:
+        if article_id not in found:
+            html = _read_legacy_html(article_id)
+            if html is None:
+                log.log_error(f"HTML not found for article_id={article_id}")
+            else:
+                yield article_id, html
+
+
+def _read_legacy_html(article_id: int) -> str | None:
+    abs_file_path = os.path.join(ds.SPOKESPERSON_FAILED_ARTICLE_DIRECTORY, f"{article_id}.html")
+    if not os.path.exists(abs_file_path):
         return None
+    with open(abs_file_path, 'r', encoding="utf-8") as file:
+        return file.read()
 
 
 def get_random_proxy() -> Optional[str]:
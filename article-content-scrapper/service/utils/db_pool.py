@@ -0,0 +1,138 @@
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from logger import log
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe, bounded Postgres connection pool.
+
+    At most `max_size` connections are open; callers wait up to `wait_seconds` for a free one before
+    `PoolTimeout` is raised. Connections are opened on demand and reused most-recently-released first, so
+    idle ones at the bottom of the stack are the ones the server may drop. A connection idle longer than
+    `health_check_seconds` is probed with `select 1` before it is handed out and replaced when broken.
+    Connections come back rolled back, so an exception between `execute` and `commit` never leaks an open
+    transaction to the next caller.
+    """
+
+    def __init__(self, params: dict, max_size: int, wait_seconds: float, health_check_seconds: float):
+        self.params = params
+        self.max_size = max_size
+        self.wait_seconds = wait_seconds
+        self.health_check_seconds = health_check_seconds
+        self._idle: list[tuple[object, float]] = []
+        self._open = 0
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._stats = {'checkouts': 0, 'waits': 0, 'timeouts': 0, 'wait_seconds': 0.0, 'max_wait_seconds': 0.0,
+                       'in_use': 0, 'peak_in_use': 0, 'connects': 0, 'discarded': 0}
+
+    def getconn(self):
+        started = time.monotonic()
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            with self._lock:
+                self._stats['timeouts'] += 1
+            raise PoolTimeout(f'no database connection became free within {self.wait_seconds}s')
+        waited = time.monotonic() - started
+
+        try:
+            conn = self._checkout()
+        except Exception:
+            self._slots.release()
+            raise
+
+        with self._lock:
+            stats = self._stats
+            stats['checkouts'] += 1
+            stats['wait_seconds'] += waited
+            stats['max_wait_seconds'] = max(stats['max_wait_seconds'], waited)
+            if waited > 0.001:
+                stats['waits'] += 1
+            stats['in_use'] += 1
+            stats['peak_in_use'] = max(stats['peak_in_use'], stats['in_use'])
+        return conn
+
+    def _checkout(self):
+        while True:
+            with self._lock:
+                if not self._idle:
+                    self._open += 1
+                    self._stats['connects'] += 1
+                    break
+                conn, released_at = self._idle.pop()
+            if not conn.closed and (time.monotonic() - released_at < self.health_check_seconds or self._ping(conn)):
+                return conn
+            self._discard(conn)
+
+        try:
+            return psycopg2.connect(**self.params)
+        except Exception:
+            with self._lock:
+                self._open -= 1
+            raise
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            cur = conn.cursor()
+            cur.execute('select 1')
+            cur.close()
+            conn.rollback()
+            return True
+        except Exception as err:
+            log.log_warning(f'Discarding broken database connection: {err}')
+            return False
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._open -= 1
+            self._stats['discarded'] += 1
+
+    def putconn(self, conn):
+        try:
+            status = extensions.TRANSACTION_STATUS_UNKNOWN if conn.closed else conn.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                self._discard(conn)
+                return
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    conn.rollback()
+                except Exception:
+                    self._discard(conn)
+                    return
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        finally:
+            with self._lock:
+                self._stats['in_use'] -= 1
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['open'] = self._open
+            stats['idle'] = len(self._idle)
+        stats['max_size'] = self.max_size
+        stats['utilization'] = round(stats['in_use'] / self.max_size, 4)
+        stats['avg_wait_seconds'] = round(stats['wait_seconds'] / stats['checkouts'], 4) if stats['checkouts'] else 0.0
+        stats['wait_seconds'] = round(stats['wait_seconds'], 3)
+        stats['max_wait_seconds'] = round(stats['max_wait_seconds'], 3)
+        return stats
@@ -0,0 +1,199 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from typing import List
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from core.config import data_source as ds
+from logger import log
+from model.article_request import ArticleRequest
+from service.db import find_scraped_articles, iter_scraped_articles
+
+# Query parameters that never change the article a URL points to
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ocid', 'cmpid')
+# Rows committed shortly after a sync may carry an earlier `scraped_at`; every sync re-reads this window
+SYNC_OVERLAP = timedelta(minutes=5)
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+             if not key.lower().startswith(TRACKING_PARAMS)]
+    return urlunsplit((parts.scheme.lower(), (parts.hostname or '') + (f':{parts.port}' if parts.port else ''),
+                       parts.path.rstrip('/') or '/', urlencode(sorted(query)), ''))
+
+
+def url_hash(url: str) -> bytes:
+    return hashlib.sha1(normalize_url(url).encode('utf-8')).digest()
+
+
+class BloomFilter:
+    """
+    Bloom filter sized for `capacity` keys at `error_rate` false positives, using double hashing over one
+    blake2b digest. Past the capacity the false positive rate grows, which only costs extra index lookups.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes):
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: bytes) -> None:
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def _id_key(article_id) -> bytes:
+    return b'i' + str(article_id).encode('ascii')
+
+
+def _url_key(hashed_url: bytes) -> bytes:
+    return b'u' + hashed_url
+
+
+class DedupIndex:
+    """
+    Pre-fetch filter dropping articles that were already stored, by `article_id` or normalized URL.
+
+    `articles.scraped_articles` is the source of truth, written in the same transaction as the article itself.
+    A Bloom filter over its keys answers most lookups without the database: once it was warmed from the table,
+    an article missing from the filter is new for sure and only possible duplicates are checked with one
+    indexed query per batch. Rows stored by other scraper instances are pulled in every `sync_seconds`.
+    Before the first warm-up completes, or when the filter is disabled, every article goes to the query.
+    When the query fails nothing is dropped.
+    """
+
+    def __init__(self, enabled: bool, capacity: int, error_rate: float, sync_seconds: float):
+        self.enabled = enabled
+        self.sync_seconds = sync_seconds
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._warm = False
+        self._synced_until = None
+        self._last_sync = 0.0
+        self._sync_thread = None
+        self._stats = {}
+
+    def _newspaper_stats(self, newspaper_id) -> dict:
+        stats = self._stats.get(newspaper_id)
+        if stats is None:
+            stats = self._stats[newspaper_id] = {'checked': 0, 'skipped': 0, 'bloom_negatives': 0, 'db_lookups': 0}
+        return stats
+
+    def sync(self):
+        """
+        Pull new rows of the scraped articles table into the Bloom filter on a background thread (the whole
+        table the first time), unless a sync ran within `sync_seconds`.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_sync < self.sync_seconds:
+                return
+            if self._sync_thread is not None and self._sync_thread.is_alive():
+                return
+            self._last_sync = time.monotonic()
+            self._sync_thread = threading.Thread(target=self._sync, name='dedup-sync', daemon=True)
+            self._sync_thread.start()
+
+    def _sync(self):
+        since = self._synced_until - SYNC_OVERLAP if self._synced_until is not None else None
+        latest, loaded = self._synced_until, 0
+        try:
+            for article_id, hashed_url, scraped_at in iter_scraped_articles(since):
+                with self._lock:
+                    self._bloom.add(_id_key(article_id))
+                    self._bloom.add(_url_key(hashed_url))
+                loaded += 1
+                if latest is None or scraped_at > latest:
+                    latest = scraped_at
+        except Exception as err:
+            log.log_warning(f'[Dedup] Unable to sync the scraped articles index: {err}')
+            return
+        with self._lock:
+            self._synced_until = latest
+            if not self._warm:
+                self._warm = True
+                log.log_info(f'[Dedup] Bloom filter warmed with {loaded} scraped articles')
+
+    def add(self, article_id, hashed_url: bytes) -> None:
+        """
+        Remember an article handed to the writer, so a redelivery arriving before the next sync is caught.
+        """
+        with self._lock:
+            self._bloom.add(_id_key(article_id))
+            self._bloom.add(_url_key(hashed_url))
+
+    def drop_scraped(self, newspaper_id, articles: List[ArticleRequest]) -> List[ArticleRequest]:
+        """
+        Articles of the batch that were not scraped yet, without repeats within the batch.
+        """
+        if not self.enabled or not articles:
+            return articles
+        self.sync()
+
+        fresh, seen_ids, seen_urls = [], set(), set()
+        for article in articles:
+            hashed_url = url_hash(article.url)
+            if article.article_id in seen_ids or hashed_url in seen_urls:
+                continue
+            seen_ids.add(article.article_id)
+            seen_urls.add(hashed_url)
+            fresh.append((article, hashed_url))
+        unique = len(fresh)
+
+        with self._lock:
+            warm = self._warm
+            candidates = [(article, hashed_url) for article, hashed_url in fresh
+                          if not warm or _id_key(article.article_id) in self._bloom
+                          or _url_key(hashed_url) in self._bloom]
+
+        known = None
+        if candidates:
+            known = find_scraped_articles([article.article_id for article, _ in candidates],
+                                          [hashed_url for _, hashed_url in candidates])
+            if known is None:
+                log.log_warning(f'[Dedup] Scraped articles lookup failed for newspaper {newspaper_id}; '
+                                f'crawling the whole batch')
+        if known is not None:
+            known_ids, known_urls = known
+            fresh = [(article, hashed_url) for article, hashed_url in fresh
+                     if article.article_id not in known_ids and hashed_url not in known_urls]
+
+        skipped = len(articles) - len(fresh)
+        with self._lock:
+            stats = self._newspaper_stats(newspaper_id)
+            stats['checked'] += len(articles)
+            stats['skipped'] += skipped
+            stats['bloom_negatives'] += unique - len(candidates) if warm else 0
+            stats['db_lookups'] += int(bool(candidates))
+        if skipped:
+            log.log_info(f'[Dedup] Skipping {skipped} of {len(articles)} articles of newspaper {newspaper_id} '
+                         f'already scraped')
+        return [article for article, _ in fresh]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'warm': self._warm,
+                'bloom_keys': self._bloom.count,
+                'synced_until': self._synced_until.isoformat() if self._synced_until is not None else None,
+                'newspapers': {str(newspaper_id): dict(stats) for newspaper_id, stats in self._stats.items()}
+            }
+
+
+dedup_index = DedupIndex(enabled=ds.DEDUP_ENABLED, capacity=ds.DEDUP_BLOOM_CAPACITY,
+                         error_rate=ds.DEDUP_BLOOM_ERROR_RATE, sync_seconds=ds.DEDUP_SYNC_SECONDS)
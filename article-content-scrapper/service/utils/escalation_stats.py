@@ -0,0 +1,70 @@
+import threading
+import time
+from collections import deque
+
+from core.config import data_source as ds
+
+
+class EscalationStats:
+    """
+    Outcome of the static (no-selenium) attempt per newspaper in `auto` execution mode.
+
+    Once at least AUTO_ESCALATION_MIN_SAMPLES of the recent articles were recorded and the share escalated
+    to the browser reaches AUTO_ESCALATION_THRESHOLD, the newspaper goes straight to the browser. Every
+    AUTO_ESCALATION_RETRY_SECONDS one batch probes the static path again, so a site that starts serving
+    complete HTML is picked up again.
+    """
+
+    def __init__(self):
+        self._recent: dict = {}
+        self._totals: dict = {}
+        self._routed_at: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, newspaper_id, static: int, escalated: int) -> None:
+        with self._lock:
+            recent = self._recent.setdefault(newspaper_id, deque(maxlen=ds.AUTO_ESCALATION_WINDOW))
+            recent.extend([False] * static + [True] * escalated)
+            totals = self._totals.setdefault(newspaper_id, {'static': 0, 'escalated': 0, 'browser_first': 0})
+            totals['static'] += static
+            totals['escalated'] += escalated
+
+    def record_browser_first(self, newspaper_id, articles: int) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(newspaper_id, {'static': 0, 'escalated': 0, 'browser_first': 0})
+            totals['browser_first'] += articles
+
+    def browser_first(self, newspaper_id) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            routed_at = self._routed_at.get(newspaper_id)
+            if routed_at is not None and now - routed_at < ds.AUTO_ESCALATION_RETRY_SECONDS:
+                return True
+
+            recent = self._recent.get(newspaper_id, ())
+            if routed_at is None and len(recent) >= ds.AUTO_ESCALATION_MIN_SAMPLES \
+                    and sum(recent) / len(recent) >= ds.AUTO_ESCALATION_THRESHOLD:
+                self._routed_at[newspaper_id] = now
+                return True
+
+            # Not failing, or due for a probe of the static path
+            self._routed_at.pop(newspaper_id, None)
+            return False
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = {}
+            for newspaper_id, totals in self._totals.items():
+                recent = self._recent.get(newspaper_id, ())
+                routed_at = self._routed_at.get(newspaper_id)
+                snapshot[str(newspaper_id)] = {
+                    **totals,
+                    'recent_escalation_ratio': round(sum(recent) / len(recent), 4) if recent else 0.0,
+                    'routed_to_browser': routed_at is not None and
+                                         now - routed_at < ds.AUTO_ESCALATION_RETRY_SECONDS
+                }
+        return snapshot
+
+
+escalation_stats = EscalationStats()
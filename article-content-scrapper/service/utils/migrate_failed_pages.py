@@ -0,0 +1,57 @@
+"""
+Moves the `<article_id>.html` pages of SPOKESPERSON_FAILED_ARTICLE_DIRECTORY into the failed page store.
+
+    cd article-content-scrapper && python -m service.utils.migrate_failed_pages            # copy
+    python -m service.utils.migrate_failed_pages --delete                                  # copy, then remove files
+
+A file is only removed once its page was read back from the store, so the migration can be interrupted and
+run again.
+"""
+import argparse
+import os
+import time
+
+from core.config import data_source as ds
+from service.utils.page_store import failed_page_store
+
+
+def migrate(directory: str, delete: bool) -> dict:
+    store = failed_page_store()
+    summary = {'migrated': 0, 'skipped': 0, 'deleted': 0, 'file_bytes': 0}
+    started = time.monotonic()
+
+    for entry in os.scandir(directory):
+        name, extension = os.path.splitext(entry.name)
+        if not entry.is_file() or extension != '.html' or not name.isdigit():
+            continue
+        article_id = int(name)
+        with open(entry.path, 'r', encoding='utf-8', errors='replace') as file:
+            html = file.read()
+
+        if article_id in store:
+            summary['skipped'] += 1
+        else:
+            store.put(article_id, html)
+            summary['migrated'] += 1
+        summary['file_bytes'] += entry.stat().st_size
+
+        if delete and store.get(article_id) is not None:
+            os.remove(entry.path)
+            summary['deleted'] += 1
+
+    summary['seconds'] = round(time.monotonic() - started, 1)
+    summary['store'] = store.stats()
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Move saved failed-article HTML files into the page store.')
+    parser.add_argument('--directory', default=ds.SPOKESPERSON_FAILED_ARTICLE_DIRECTORY)
+    parser.add_argument('--delete', action='store_true', help='remove every file once it is in the store')
+    args = parser.parse_args()
+
+    result = migrate(args.directory, args.delete)
+    print(f"Migrated {result['migrated']} pages ({result['skipped']} already stored, {result['deleted']} files "
+          f"deleted) in {result['seconds']}s")
+    print(f"Files: {result['file_bytes']} bytes, store: {result['store']['stored_bytes']} bytes in "
+          f"{result['store']['packs']} packs, {result['store']['distinct_pages']} distinct pages")
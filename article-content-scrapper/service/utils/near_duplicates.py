@@ -0,0 +1,159 @@
+import hashlib
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
+
+from core.config import data_source as ds
+from logger import log
+from service.db import match_fingerprint, record_fingerprint
+
+FINGERPRINT_BITS = 64
+# Four 16-bit bands: two fingerprints within 3 bits of each other share at least one band exactly
+BANDS = 4
+BAND_BITS = FINGERPRINT_BITS // BANDS
+MAX_INDEXED_DISTANCE = BANDS - 1
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def shingles(text: str, size: int) -> Counter:
+    """
+    Word `size`-grams of the lower-cased text, punctuation and spacing ignored.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) <= size:
+        return Counter([' '.join(words)]) if words else Counter()
+    return Counter(' '.join(words[i:i + size]) for i in range(len(words) - size + 1))
+
+
+def simhash(features: Counter) -> int:
+    weights = [0] * FINGERPRINT_BITS
+    for feature, count in features.items():
+        value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += count if value >> bit & 1 else -count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def bands_of(fingerprint: int) -> tuple:
+    mask = (1 << BAND_BITS) - 1
+    return tuple(fingerprint >> (band * BAND_BITS) & mask for band in range(BANDS))
+
+
+def to_signed(fingerprint: int) -> int:
+    # Stored in a bigint column
+    return fingerprint - (1 << FINGERPRINT_BITS) if fingerprint >> (FINGERPRINT_BITS - 1) else fingerprint
+
+
+def to_unsigned(value: int) -> int:
+    return value & ((1 << FINGERPRINT_BITS) - 1)
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    article_id: int
+    newspaper_id: int
+    simhash: int
+    bands: tuple
+
+
+class NearDuplicateDetector:
+    """
+    Content fingerprint stage in front of the analyzer queue.
+
+    Every article body is reduced to a SimHash over its word shingles. The fingerprints of articles sent to the
+    analyzer are kept in `articles.article_fingerprints`, banded for an indexed LSH lookup, so an article within
+    `max_distance` bits of one sent during the last `window_days` is a near-duplicate (typically the same wire
+    story in another newspaper): it is recorded with `duplicate_of` pointing to that original, whose analysis
+    it shares, and is not published. Bodies shorter than `min_words` are always published, since paywall
+    teasers and briefs fingerprint alike. An original is only recorded (`record_original`) once the broker
+    confirmed its analyzer message, so no article is linked to one that never reached the analyzer; copies
+    published within that moment are both analyzed. When the lookup fails the article is published.
+    """
+
+    def __init__(self, enabled: bool, max_distance: int, shingle_size: int, min_words: int, window_days: int):
+        self.enabled = enabled
+        self.max_distance = min(max_distance, MAX_INDEXED_DISTANCE)
+        self.shingle_size = shingle_size
+        self.min_words = min_words
+        self.window_days = window_days
+        self._lock = threading.Lock()
+        self._stats = {'checked': 0, 'originals': 0, 'duplicates': 0, 'too_short': 0, 'lookup_failures': 0,
+                       'newspapers': {}}
+
+    def _count(self, key: str, newspaper_id=None) -> None:
+        with self._lock:
+            self._stats[key] += 1
+            if key == 'duplicates':
+                newspapers = self._stats['newspapers']
+                newspapers[str(newspaper_id)] = newspapers.get(str(newspaper_id), 0) + 1
+
+    def fingerprint(self, article: dict) -> Optional[Fingerprint]:
+        """
+        Fingerprint of an article, or None when detection is disabled or the body is too short to compare.
+        """
+        if not self.enabled:
+            return None
+        body = article.get('body') or ''
+        if isinstance(body, (list, tuple)):
+            body = ' '.join(str(part) for part in body)
+
+        self._count('checked')
+        if len(WORD_PATTERN.findall(body)) < self.min_words:
+            self._count('too_short')
+            return None
+
+        value = simhash(shingles(body, self.shingle_size))
+        return Fingerprint(article.get('article_id'), article.get('newspaper_id'), value, bands_of(value))
+
+    def original_of(self, fingerprint: Fingerprint) -> Optional[int]:
+        """
+        The `article_id` of the analyzed article `fingerprint` is a near-duplicate of, recording the link, or
+        None when it has to be analyzed.
+        """
+        article_id, newspaper_id = fingerprint.article_id, fingerprint.newspaper_id
+        match = match_fingerprint(article_id, newspaper_id, to_signed(fingerprint.simhash), fingerprint.bands,
+                                  self.window_days, partial(self._closest, fingerprint.simhash))
+        if match is None:
+            self._count('lookup_failures')
+            return None
+
+        original_id, distance = match
+        if original_id is None:
+            return None
+        self._count('duplicates', newspaper_id)
+        log.log_info(f'[NearDuplicate] Article {article_id} of newspaper {newspaper_id} is a near-duplicate of '
+                     f'article {original_id} ({distance} bits apart), not sent to the analyzer')
+        return original_id
+
+    def record_original(self, fingerprint: Fingerprint) -> None:
+        """
+        Record an article the analyzer received as the original of its later near-duplicates.
+        """
+        if record_fingerprint(fingerprint.article_id, fingerprint.newspaper_id, to_signed(fingerprint.simhash),
+                              fingerprint.bands):
+            self._count('originals')
+
+    def _closest(self, fingerprint: int, candidates: list) -> Optional[tuple]:
+        match = min(((bin(to_unsigned(candidate) ^ fingerprint).count('1'), original_id)
+                     for original_id, candidate in candidates), default=None)
+        if match is None or match[0] > self.max_distance:
+            return None
+        distance, original_id = match
+        return original_id, distance
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats, newspapers=dict(self._stats['newspapers']))
+        stats['duplicate_ratio'] = round(stats['duplicates'] / stats['checked'], 4) if stats['checked'] else 0.0
+        return stats
+
+
+near_duplicates = NearDuplicateDetector(enabled=ds.NEAR_DUPLICATE_ENABLED,
+                                        max_distance=ds.NEAR_DUPLICATE_MAX_DISTANCE,
+                                        shingle_size=ds.NEAR_DUPLICATE_SHINGLE_SIZE,
+                                        min_words=ds.NEAR_DUPLICATE_MIN_WORDS,
+                                        window_days=ds.NEAR_DUPLICATE_WINDOW_DAYS)
@@ -0,0 +1,103 @@
+from logger import log
+from service.parser.structured_data import STRUCTURED_DATA_JS
+
+TEXT = 'text'
+KEYWORDS = 'keywords'
+DATE = 'date'
+
+# Function expression evaluating every configured section in a single call.
+# Mirrors the WebDriver extraction: the first selector yielding text wins, exclude selectors drop the
+# matched elements themselves, and innerText stands in for WebElement.text. The page's JSON-LD and meta
+# tags are collected in the same call when `payload.structured` is set.
+EXTRACT_SECTIONS_JS = '''
+(payload) => {
+    const query = (s) => {
+        try {
+            if (s.type === 'xpath') {
+                const r = document.evaluate(s.name, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                const nodes = [];
+                for (let i = 0; i < r.snapshotLength; i++) nodes.push(r.snapshotItem(i));
+                return nodes;
+            }
+            if (s.type === 'css') return Array.from(document.querySelectorAll(s.name));
+        } catch (e) {}
+        return [];
+    };
+    const text = (node) => (node.innerText || '').trim();
+
+    const excluded = new Set();
+    for (const s of payload.excludes) query(s).forEach((node) => excluded.add(node));
+
+    const result = {};
+    for (const section of payload.sections) {
+        const outcome = {value: section.mode === 'keywords' ? [] : '', matched: false, misses: []};
+        for (const s of section.selectors) {
+            const nodes = query(s);
+            if (!nodes.length) {
+                outcome.misses.push(s.name);
+                continue;
+            }
+            let values;
+            if (section.mode === 'date') {
+                values = s.attribute
+                    ? nodes.map((n) => (n.getAttribute(s.attribute) || '').trim()).filter((v) => v)
+                    : nodes.map(text).filter((v) => v);
+            } else {
+                const kept = section.mode === 'keywords' ? nodes : nodes.filter((n) => !excluded.has(n));
+                values = kept.map(text).filter((v) => v);
+            }
+            if (values.length) {
+                outcome.value = section.mode === 'keywords' ? values : values.join(' ');
+                outcome.matched = true;
+                break;
+            }
+            outcome.misses.push(s.name);
+        }
+        result[section.key] = outcome;
+    }
+    return {sections: result, structured: payload.structured ? (%s)() : null};
+}
+''' % STRUCTURED_DATA_JS
+
+
+def _selectors(selectors: list, with_attribute: bool = False) -> list[dict]:
+    compiled = []
+    for s in selectors or []:
+        if not s.get('type') or not s.get('name'):
+            continue  # Skip invalid selector entries
+        entry = {'type': s.get('type'), 'name': s.get('name')}
+        if with_attribute:
+            entry['attribute'] = s.get('attribute', '')
+        compiled.append(entry)
+    return compiled
+
+
+def extraction_payload(config: dict, structured: bool = False) -> dict:
+    """
+    Compile the newspaper config into the argument of EXTRACT_SECTIONS_JS. Built once per crawler and
+    sent with every article.
+    """
+    return {
+        'structured': structured,
+        'excludes': _selectors(config.get('excludes')),
+        'sections': [
+            {'key': 'header', 'mode': TEXT, 'selectors': _selectors(config.get('header'))},
+            {'key': 'body', 'mode': TEXT, 'selectors': _selectors(config.get('body'))},
+            {'key': 'author', 'mode': TEXT, 'selectors': _selectors(config.get('author'))},
+            {'key': 'date', 'mode': DATE, 'selectors': _selectors(config.get('date'), with_attribute=True)},
+            {'key': 'keywords', 'mode': KEYWORDS, 'selectors': _selectors(config.get('keywords'))},
+        ]
+    }
+
+
+def log_misses(sections: dict, url: str) -> None:
+    for key, outcome in sections.items():
+        for selector in outcome.get('misses', []):
+            log.log_warning(f"[{key}] No text found for selector '{selector}' on page: {url}")
+
+
+def selenium_extract(driver, payload: dict) -> dict:
+    """
+    Run the extraction script through a Selenium / SeleniumBase driver.
+    """
+    return driver.execute_script(f'return ({EXTRACT_SECTIONS_JS})(arguments[0]);', payload)
@@ -0,0 +1,201 @@
+import asyncio
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from core.config import data_source as ds
+from logger import log
+
+# Function expression shared by every browser framework (selenium execute_script, playwright evaluate).
+# Returns the total text length of the first selector with visible text, plus the document ready state.
+READY_PROBE_JS = '''
+(selectors) => {
+    for (const s of selectors) {
+        let nodes = [];
+        try {
+            if (s.type === 'xpath') {
+                const r = document.evaluate(s.name, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                for (let i = 0; i < r.snapshotLength; i++) nodes.push(r.snapshotItem(i));
+            } else {
+                nodes = Array.from(document.querySelectorAll(s.name));
+            }
+        } catch (e) {
+            continue;
+        }
+        let length = 0;
+        for (const node of nodes) length += (node.innerText || node.textContent || '').trim().length;
+        if (length > 0) return {matched: true, length: length, state: document.readyState};
+    }
+    return {matched: false, length: 0, state: document.readyState};
+}
+'''
+
+# Samples needed before the timeout is tuned, and the head room kept above the observed p95
+MIN_SAMPLES = 5
+TIMEOUT_MARGIN = 1.5
+
+
+class ReadyTimeStats:
+    """
+    Recent page ready times per newspaper. The wait timeout of a newspaper follows its observed p95 ready
+    time (with head room), bounded below by PAGE_READY_MIN_WAIT and above by the newspaper maximum.
+    A timed-out wait is recorded at the maximum, so a site that slows down quickly earns its full wait back.
+    """
+
+    def __init__(self, window: int = 50):
+        self.window = window
+        self._samples: dict = {}
+        self._timeouts: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, newspaper_id, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self._samples.setdefault(newspaper_id, deque(maxlen=self.window)).append(seconds)
+            if timed_out:
+                self._timeouts[newspaper_id] = self._timeouts.get(newspaper_id, 0) + 1
+
+    def timeout(self, newspaper_id, max_wait: float) -> float:
+        with self._lock:
+            samples = list(self._samples.get(newspaper_id, ()))
+        if len(samples) < MIN_SAMPLES:
+            return max_wait
+        return min(max_wait, max(ds.PAGE_READY_MIN_WAIT, _p95(samples) * TIMEOUT_MARGIN))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = {key: list(value) for key, value in self._samples.items()}
+            timeouts = dict(self._timeouts)
+        return {
+            str(newspaper_id): {
+                'samples': len(values),
+                'median': round(statistics.median(values), 3),
+                'p95': round(_p95(values), 3),
+                'timeouts': timeouts.get(newspaper_id, 0)
+            }
+            for newspaper_id, values in samples.items()
+        }
+
+
+def _p95(values: list) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=20, method='inclusive')[-1]
+
+
+ready_time_stats = ReadyTimeStats()
+
+
+def ready_selectors(config: dict) -> list[dict]:
+    selectors = (config.get('body') or []) + (config.get('header') or [])
+    return [{'type': s.get('type') or 'css', 'name': s.get('name')} for s in selectors if s.get('name')]
+
+
+class _ReadinessWait:
+    """
+    Readiness polling state shared by the blocking and the asyncio wait loops.
+    """
+
+    def __init__(self, config: dict, url: str):
+        self.url = url
+        self.newspaper_id = config.get('newspaperID')
+        self.max_wait = float(config.get('maxPageWait') or ds.PAGE_READY_MAX_WAIT)
+        self.timeout = ready_time_stats.timeout(self.newspaper_id, self.max_wait)
+        self.selectors = ready_selectors(config)
+        self.started = time.monotonic()
+        self.last_length = -1
+        self.stable_polls = 0
+
+    def probe_failed(self, error: Exception) -> dict:
+        # Navigation in progress (e.g. a challenge page redirecting); keep polling
+        log.log_warning(f'Page readiness probe failed on {self.url}: {error}')
+        return {}
+
+    def observe(self, result: dict) -> Optional[bool]:
+        """
+        :return: True once ready, False on timeout, None while still waiting
+        """
+        if self.selectors:
+            length = result.get('length', 0) if result.get('matched') else -1
+        else:
+            # Nothing to look for; settle for a fully loaded document
+            length = 1 if result.get('state') == 'complete' else -1
+        if length > 0 and length == self.last_length and result.get('state') != 'loading':
+            self.stable_polls += 1
+        else:
+            self.stable_polls = 0
+        self.last_length = length
+
+        elapsed = time.monotonic() - self.started
+        if self.stable_polls >= ds.PAGE_READY_STABLE_POLLS:
+            ready_time_stats.record(self.newspaper_id, elapsed)
+            log.log_info(f'Page ready in {elapsed:.2f}s (timeout {self.timeout:.1f}s): {self.url}')
+            return True
+
+        if elapsed >= self.timeout:
+            ready_time_stats.record(self.newspaper_id, self.max_wait, timed_out=True)
+            log.log_warning(f'Page not ready after {elapsed:.1f}s, extracting anyway: {self.url}')
+            return False
+
+        return None
+
+    def poll_delay(self) -> float:
+        return min(ds.PAGE_READY_POLL_INTERVAL, max(self.timeout - (time.monotonic() - self.started), 0))
+
+
+def wait_until_ready(probe: Callable[[list], dict], config: dict, url: str = '') -> bool:
+    """
+    Poll the page until the configured body or header selector has text that stayed the same for
+    PAGE_READY_STABLE_POLLS consecutive polls, or until the newspaper's tuned timeout elapses.
+
+    :param probe: runs READY_PROBE_JS in the page with the selector list and returns its result
+    :param config: newspaper config; `maxPageWait` (seconds) caps the wait for that newspaper
+    :param url: article URL, only used in log messages
+    :return: True when the page became ready, False on timeout
+    """
+    state = _ReadinessWait(config, url)
+    while True:
+        try:
+            result = probe(state.selectors) or {}
+        except Exception as e:
+            result = state.probe_failed(e)
+
+        ready = state.observe(result)
+        if ready is not None:
+            return ready
+
+        time.sleep(state.poll_delay())
+
+
+async def async_wait_until_ready(probe: Callable[[list], Awaitable[dict]], config: dict, url: str = '') -> bool:
+    """
+    `wait_until_ready` for asyncio drivers; `probe` is a coroutine function.
+    """
+    state = _ReadinessWait(config, url)
+    while True:
+        try:
+            result = await probe(state.selectors) or {}
+        except Exception as e:
+            result = state.probe_failed(e)
+
+        ready = state.observe(result)
+        if ready is not None:
+            return ready
+
+        await asyncio.sleep(state.poll_delay())
+
+
+def selenium_probe(driver) -> Callable[[list], dict]:
+    """
+    Readiness probe for Selenium / SeleniumBase drivers.
+    """
+    script = f'return ({READY_PROBE_JS})(arguments[0]);'
+    return lambda selectors: driver.execute_script(script, selectors)
+
+
+def playwright_probe(page) -> Callable[[list], Awaitable[dict]]:
+    """
+    Readiness probe for Playwright async pages.
+    """
+    return lambda selectors: page.evaluate(READY_PROBE_JS, selectors)
@@ -0,0 +1,279 @@
+import fcntl
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
+
+import zstandard
+
+from core.config import data_source as ds
+from logger import log
+
+STORE_SCHEMA = '''
+    create table if not exists blobs (
+        digest text primary key,
+        pack integer not null,
+        offset integer not null,
+        length integer not null,
+        size integer not null,
+        stored_at real not null
+    );
+    create index if not exists blobs_pack on blobs (pack);
+    create table if not exists pages (
+        article_id integer primary key,
+        digest text not null,
+        stored_at real not null
+    );
+    create index if not exists pages_digest on pages (digest);
+'''
+
+# Lookups per sqlite statement when resolving many article ids
+LOOKUP_CHUNK = 500
+# Seconds a statement waits for the index while another process writes it
+INDEX_BUSY_TIMEOUT = 30
+
+
+class PageStore:
+    """
+    Content-addressed store of saved article pages.
+
+    Every distinct page is compressed into one zstd frame, appended to the active pack file (a new one is started
+    past `pack_max_bytes`) and indexed in sqlite by its sha256, so a page saved for several articles is stored
+    once. `pages` maps article ids to their page. Packs are only appended to; `collect_garbage` rewrites packs
+    left mostly unreferenced by `delete`.
+
+    Several stores may share the directory (the service and `migrate_failed_pages`, or service instances on one
+    volume): appends and garbage collection hold an exclusive `flock` on `write.lock` and take the active pack
+    and its end from the directory, never from what this instance wrote last.
+    """
+
+    def __init__(self, directory: str, pack_max_bytes: int = 256 << 20, compression_level: int = 9):
+        self.directory = directory
+        self.pack_max_bytes = pack_max_bytes
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._fds: dict[int, int] = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._write_lock = os.open(os.path.join(directory, 'write.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        self._db = sqlite3.connect(os.path.join(directory, 'index.sqlite'), timeout=INDEX_BUSY_TIMEOUT,
+                                   check_same_thread=False)
+        with self._writing():
+            self._db.executescript(STORE_SCHEMA)
+
+    def put(self, article_id: int, html: str) -> None:
+        raw = html.encode('utf-8', errors='replace')
+        digest = hashlib.sha256(raw).hexdigest()
+        now = time.time()
+        with self._lock:
+            known = self._db.execute('select 1 from blobs where digest = ?', (digest,)).fetchone()
+        # Compressed outside the locks unless the page is already stored
+        frame = None if known else zstandard.ZstdCompressor(level=self.compression_level).compress(raw)
+        with self._lock, self._writing():
+            # Checked again: another thread or process may have stored the page, or collected it, meanwhile
+            if not self._db.execute('select 1 from blobs where digest = ?', (digest,)).fetchone():
+                if frame is None:
+                    frame = zstandard.ZstdCompressor(level=self.compression_level).compress(raw)
+                pack, offset = self._append(frame)
+                self._db.execute('insert into blobs (digest, pack, offset, length, size, stored_at) '
+                                 'values (?, ?, ?, ?, ?, ?)', (digest, pack, offset, len(frame), len(raw), now))
+            self._db.execute('insert or replace into pages (article_id, digest, stored_at) values (?, ?, ?)',
+                             (article_id, digest, now))
+            self._db.commit()
+
+    def get(self, article_id: int) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute('select b.pack, b.offset, b.length from pages p join blobs b using (digest) '
+                                   'where p.article_id = ?', (article_id,)).fetchone()
+            if row is None:
+                return None
+            frame = self._read(*row)
+        return self._decode(frame)
+
+    def __contains__(self, article_id: int) -> bool:
+        with self._lock:
+            return self._db.execute('select 1 from pages where article_id = ?', (article_id,)).fetchone() is not None
+
+    def iter_pages(self, article_ids: Optional[Iterable[int]] = None) -> Iterator[tuple[int, str]]:
+        """
+        Stream `(article_id, html)` of the given articles (all when None) in pack order, so a large walk reads
+        every pack front to back. Articles without a saved page are left out.
+        """
+        for pack, offset, length, ids in self._locations(article_ids):
+            try:
+                with self._lock:
+                    frame = self._read(pack, offset, length)
+                html = self._decode(frame)
+            except (OSError, zstandard.ZstdError) as e:
+                log.log_error(f'Saved page of articles {ids} is unreadable.', e)
+                continue
+            for article_id in ids:
+                yield article_id, html
+
+    def delete(self, article_id: int) -> None:
+        with self._lock:
+            self._db.execute('delete from pages where article_id = ?', (article_id,))
+            self._db.commit()
+
+    def collect_garbage(self, min_live_ratio: float = 0.5) -> int:
+        """
+        Drop pages no article refers to anymore and rewrite the closed packs whose live share fell below
+        `min_live_ratio`. Returns the bytes freed.
+        """
+        freed = 0
+        with self._lock, self._writing():
+            self._db.execute('delete from blobs where digest not in (select digest from pages)')
+            self._db.commit()
+            live = dict(self._db.execute('select pack, sum(length) from blobs group by pack').fetchall())
+            packs = self._pack_ids()
+            for pack in packs[:-1]:
+                size = self._pack_size(pack)
+                if size and live.get(pack, 0) / size >= min_live_ratio:
+                    continue
+                for digest, offset, length in self._db.execute(
+                        'select digest, offset, length from blobs where pack = ? order by offset', (pack,)).fetchall():
+                    new_pack, new_offset = self._append(self._read(pack, offset, length))
+                    self._db.execute('update blobs set pack = ?, offset = ? where digest = ?',
+                                     (new_pack, new_offset, digest))
+                self._db.commit()
+                fd = self._fds.pop(pack, None)
+                if fd is not None:
+                    os.close(fd)
+                os.remove(self._pack_path(pack))
+                freed += size - live.get(pack, 0)
+        if freed:
+            log.log_info(f'[PageStore] Collected {freed} bytes of unreferenced pages')
+        return freed
+
+    def stats(self) -> dict:
+        with self._lock:
+            pages = self._db.execute('select count(*) from pages').fetchone()[0]
+            blobs, raw_bytes, live_bytes = self._db.execute(
+                'select count(*), coalesce(sum(size), 0), coalesce(sum(length), 0) from blobs').fetchone()
+            packs = self._pack_ids()
+            pack_bytes = sum(self._pack_size(pack) for pack in packs)
+        return {
+            'pages': pages,
+            'distinct_pages': blobs,
+            'packs': len(packs),
+            'raw_bytes': raw_bytes,
+            'stored_bytes': pack_bytes,
+            'garbage_bytes': pack_bytes - live_bytes,
+            'compression_ratio': round(raw_bytes / live_bytes, 2) if live_bytes else 0.0
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            for fd in self._fds.values():
+                os.close(fd)
+            self._fds.clear()
+            os.close(self._write_lock)
+            self._db.close()
+
+    def _locations(self, article_ids: Optional[Iterable[int]]):
+        query = 'select b.pack, b.offset, b.length, p.article_id from pages p join blobs b using (digest)'
+        rows = []
+        with self._lock:
+            if article_ids is None:
+                rows = self._db.execute(query).fetchall()
+            else:
+                article_ids = list(article_ids)
+                for start in range(0, len(article_ids), LOOKUP_CHUNK):
+                    chunk = article_ids[start:start + LOOKUP_CHUNK]
+                    rows.extend(self._db.execute(f"{query} where p.article_id in ({','.join('?' * len(chunk))})",
+                                                 chunk).fetchall())
+        rows.sort()
+        grouped = []
+        for pack, offset, length, article_id in rows:
+            if grouped and grouped[-1][:2] == (pack, offset):
+                grouped[-1][3].append(article_id)
+            else:
+                grouped.append((pack, offset, length, [article_id]))
+        return grouped
+
+    @contextmanager
+    def _writing(self):
+        # Caller holds the lock; excludes the writers of other stores on the directory, in any process
+        fcntl.flock(self._write_lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._write_lock, fcntl.LOCK_UN)
+
+    def _append(self, frame: bytes) -> tuple[int, int]:
+        # Caller holds the lock and is writing; the pack end is where the last writer of any store left it
+        packs = self._pack_ids()
+        pack = packs[-1] if packs else 1
+        fd = self._fd(pack, create=True)
+        offset = os.fstat(fd).st_size
+        if offset and offset + len(frame) > self.pack_max_bytes:
+            pack += 1
+            fd = self._fd(pack, create=True)
+            offset = os.fstat(fd).st_size
+        os.write(fd, frame)
+        return pack, offset
+
+    def _read(self, pack: int, offset: int, length: int) -> bytes:
+        # Caller holds the lock
+        frame = os.pread(self._fd(pack), length, offset)
+        if len(frame) != length:
+            raise OSError(f'pack {pack} is truncated at offset {offset}')
+        return frame
+
+    @staticmethod
+    def _decode(frame: bytes) -> str:
+        return zstandard.ZstdDecompressor().decompress(frame).decode('utf-8')
+
+    def _fd(self, pack: int, create: bool = False) -> int:
+        fd = self._fds.get(pack)
+        if fd is None:
+            # Only appends create packs; a pack removed by `collect_garbage` must not come back empty for a read
+            flags = os.O_RDWR | os.O_APPEND | (os.O_CREAT if create else 0)
+            fd = self._fds[pack] = os.open(self._pack_path(pack), flags, 0o644)
+        return fd
+
+    def _pack_ids(self) -> list[int]:
+        return sorted(int(name[5:-5]) for name in os.listdir(self.directory)
+                      if name.startswith('pack-') and name.endswith('.pack'))
+
+    def _pack_size(self, pack: int) -> int:
+        try:
+            return os.path.getsize(self._pack_path(pack))
+        except FileNotFoundError:
+            return 0
+
+    def _pack_path(self, pack: int) -> str:
+        return os.path.join(self.directory, f'pack-{pack:06d}.pack')
+
+
+_failed_pages: Optional[PageStore] = None
+_failed_pages_lock = threading.Lock()
+
+
+def failed_page_store() -> PageStore:
+    """
+    Store of the pages saved for failed articles, opened on first use.
+    """
+    global _failed_pages
+    with _failed_pages_lock:
+        if _failed_pages is None:
+            _failed_pages = PageStore(directory=os.path.join(ds.SPOKESPERSON_FAILED_ARTICLE_DIRECTORY, 'store'),
+                                      pack_max_bytes=ds.FAILED_PAGE_PACK_MAX_BYTES,
+                                      compression_level=ds.FAILED_PAGE_COMPRESSION_LEVEL)
+        return _failed_pages
+
+
+def failed_page_store_stats() -> dict | None:
+    with _failed_pages_lock:
+        return _failed_pages.stats() if _failed_pages is not None else None
+
+
+def close_failed_page_store() -> None:
+    global _failed_pages
+    with _failed_pages_lock:
+        if _failed_pages is not None:
+            _failed_pages.close()
+            _failed_pages = None
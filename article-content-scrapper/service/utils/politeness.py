@@ -0,0 +1,231 @@
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlsplit
+
+from core.config import data_source as ds
+from logger import log
+
+# Answers meaning "slow down"; a CAPTCHA / bot challenge page counts the same
+THROTTLE_STATUS_CODES = frozenset((429, 503))
+# Only found on challenge pages (Cloudflare, DataDome, PerimeterX); a reCAPTCHA widget alone is usually a
+# comment form. `captchaMarkers` in the newspaper config adds site specific ones.
+CAPTCHA_MARKERS = ('_cf_chl_opt', 'id="challenge-form"', 'captcha-delivery.com', 'id="px-captcha"')
+
+# Same check for a rendered page, evaluated in the browser
+CAPTCHA_JS = '''
+(markers) => !!window._cf_chl_opt
+    || !!document.querySelector('#challenge-form, #px-captcha, iframe[src*="captcha-delivery.com"]')
+    || markers.some((marker) => document.documentElement.outerHTML.includes(marker))
+'''
+
+# Share of the configured rate regained per successful request after a throttle
+RATE_RECOVERY_STEP = 0.1
+
+
+@dataclass
+class CrawlPolicy:
+    rate: float  # requests per second per domain, 0 for unlimited
+    burst: int
+    max_concurrency: int
+    captcha_markers: tuple = ()
+
+
+def crawl_policy(config: dict) -> CrawlPolicy:
+    """
+    Politeness policy of a newspaper. `crawlRate` in the newspaper config may set `requestsPerSecond`,
+    `burst` and `maxConcurrency` (defaulting to `fetchConcurrency`, then FETCH_PER_DOMAIN_CONCURRENCY).
+    """
+    rate_config = config.get('crawlRate') or {}
+    return CrawlPolicy(
+        rate=float(rate_config.get('requestsPerSecond', ds.POLITENESS_REQUESTS_PER_SECOND)),
+        burst=max(1, int(rate_config.get('burst', ds.POLITENESS_BURST))),
+        max_concurrency=max(1, int(rate_config.get('maxConcurrency')
+                                   or config.get('fetchConcurrency') or ds.FETCH_PER_DOMAIN_CONCURRENCY)),
+        captcha_markers=tuple(config.get('captchaMarkers') or ())
+    )
+
+
+def domain_of(url: str) -> str:
+    return urlsplit(url).hostname or ''
+
+
+def is_captcha(html: Optional[str], policy: CrawlPolicy) -> bool:
+    if not html:
+        return False
+    return any(marker in html for marker in CAPTCHA_MARKERS + policy.captcha_markers)
+
+
+def retry_after_seconds(value) -> Optional[float]:
+    """
+    Seconds requested by a `Retry-After` header, given either as a delay or as an HTTP date.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _DomainState:
+    def __init__(self, policy: CrawlPolicy, now: float):
+        self.configured_rate = policy.rate
+        self.rate = policy.rate
+        self.burst = policy.burst
+        self.tokens = float(policy.burst)
+        self.updated = now
+        self.paused_until = 0.0
+        self.backoff = 0.0
+        self.active = 0
+        self.requests = 0
+        self.throttled = 0
+        self.captchas = 0
+
+
+class PolitenessScheduler:
+    """
+    Hands out crawl slots per domain, shared by the HTTP fetch engines and the browser frameworks.
+
+    Each domain has a token bucket refilled at the newspaper's `CrawlPolicy.rate` up to `burst` tokens.
+    A 429 / 503 answer or a CAPTCHA page halves the domain's current rate and pauses it for the
+    `Retry-After` delay, or for an exponential backoff capped at `max_backoff` seconds. Every successful
+    request wins back RATE_RECOVERY_STEP of the configured rate. Browser page loads additionally hold a
+    slot under the per-domain `max_concurrency` and the global `max_concurrent_pages` caps; the fetch
+    engines enforce their own connection caps.
+    """
+
+    def __init__(self, max_concurrent_pages: int, max_backoff: float, min_rate: float):
+        self.max_backoff = max_backoff
+        self.min_rate = min_rate
+        self._domains: dict[str, _DomainState] = {}
+        self._pages = threading.BoundedSemaphore(max_concurrent_pages)
+        self._cond = threading.Condition()
+
+    def _state(self, domain: str, policy: CrawlPolicy, now: float) -> _DomainState:
+        state = self._domains.get(domain)
+        if state is None:
+            state = self._domains[domain] = _DomainState(policy, now)
+        elif state.configured_rate != policy.rate or state.burst != policy.burst:
+            # Newspaper config changed; a lowered rate applies at once, a raised one is climbed to
+            state.configured_rate, state.burst = policy.rate, policy.burst
+            state.rate = policy.rate if policy.rate <= 0 or state.rate <= 0 else min(state.rate, policy.rate)
+        return state
+
+    def delay(self, domain: str, policy: CrawlPolicy) -> float:
+        """
+        Take a token for one request to `domain` and return 0, or return the seconds until one is available.
+        Used as the `FetchRequest.gate` of the fetch engines.
+        """
+        return self._delay(domain, policy, take=True)
+
+    def _delay(self, domain: str, policy: CrawlPolicy, take: bool) -> float:
+        now = time.monotonic()
+        with self._cond:
+            state = self._state(domain, policy, now)
+            if state.paused_until > now:
+                return state.paused_until - now
+            if state.rate > 0:
+                state.tokens = min(state.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+                if state.tokens < 1:
+                    return (1 - state.tokens) / state.rate
+                if take:
+                    state.tokens -= 1
+            if take:
+                state.requests += 1
+            return 0.0
+
+    def wait(self, domain: str, policy: CrawlPolicy) -> None:
+        while (delay := self.delay(domain, policy)) > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def slot(self, domain: str, policy: CrawlPolicy):
+        """
+        Blocking crawl slot for a browser page load.
+        """
+        with self._cond:
+            state = self._state(domain, policy, time.monotonic())
+            while state.active >= policy.max_concurrency:
+                self._cond.wait()
+            state.active += 1
+        try:
+            while True:
+                # Sleep out the domain's pause / rate without holding a page slot other domains could use
+                while (delay := self._delay(domain, policy, take=False)) > 0:
+                    time.sleep(delay)
+                self._pages.acquire()
+                if self.delay(domain, policy) <= 0:
+                    break
+                # Another load of the domain took the token while this one waited for a page slot
+                self._pages.release()
+            try:
+                yield
+            finally:
+                self._pages.release()
+        finally:
+            with self._cond:
+                state.active -= 1
+                self._cond.notify_all()
+
+    def report(self, domain: str, status_code: Optional[int] = None, retry_after: Optional[float] = None,
+               captcha: bool = False) -> None:
+        """
+        Adapt the domain's rate to the outcome of a request; `status_code` is None when the framework
+        cannot see it (SeleniumBase).
+        """
+        now = time.monotonic()
+        with self._cond:
+            state = self._domains.get(domain)
+            if state is None:
+                return
+
+            if captcha or status_code in THROTTLE_STATUS_CODES:
+                state.throttled += 1
+                state.captchas += int(captcha)
+                # Requests already in flight answer the same; only the first one of a pause slows the domain
+                first = state.paused_until <= now
+                if first:
+                    if state.rate > 0:
+                        state.rate = max(self.min_rate, state.rate / 2)
+                    state.backoff = min(self.max_backoff, max(1.0, state.backoff * 2))
+                pause = min(self.max_backoff, retry_after if retry_after is not None else state.backoff)
+                state.paused_until = max(state.paused_until, now + pause)
+                state.tokens = 0.0
+                if first:
+                    reason = 'CAPTCHA page' if captcha else f'HTTP {status_code}'
+                    log.log_warning(f"[Politeness] {reason} from {domain}, pausing {pause:.1f}s and slowing to "
+                                    f"{state.rate:.2f} req/s")
+            elif status_code is None or status_code < 400:
+                state.backoff = 0.0
+                if 0 < state.rate < state.configured_rate:
+                    state.rate = min(state.configured_rate, state.rate + state.configured_rate * RATE_RECOVERY_STEP)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        with self._cond:
+            return {
+                domain: {
+                    'requests': state.requests,
+                    'throttled': state.throttled,
+                    'captchas': state.captchas,
+                    'rate': round(state.rate, 3),
+                    'configured_rate': state.configured_rate,
+                    'active_pages': state.active,
+                    'paused_seconds': round(max(0.0, state.paused_until - now), 1)
+                }
+                for domain, state in self._domains.items()
+            }
+
+
+politeness = PolitenessScheduler(max_concurrent_pages=ds.POLITENESS_MAX_CONCURRENT_PAGES,
+                                 max_backoff=ds.POLITENESS_MAX_BACKOFF_SECONDS,
+                                 min_rate=ds.POLITENESS_MIN_REQUESTS_PER_SECOND)
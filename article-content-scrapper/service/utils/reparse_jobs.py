@@ -0,0 +1,268 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.config import data_source as ds
+from logger import log
+from service.db import find_article_configuration, get_failed_articles_by_newspaper_id, \
+    upsert_failed_articles_batch
+from service.parser.reparse_worker import init_worker, parse_pages
+from service.rabbit_mq import rabbit_mq as mq
+from service.utils import date_utils, mail_utils
+from service.utils.bot_utils import iter_failed_article_html
+from service.utils.page_store import failed_page_store
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+
+
+@dataclass
+class ReparseJob:
+    job_id: str
+    newspaper_id: int
+    publish: bool
+    status: str = QUEUED
+    total: int = 0
+    parsed: int = 0
+    resolved: int = 0
+    unresolved: int = 0
+    errors: int = 0
+    missing_pages: int = 0
+    missing_configuration: list = field(default_factory=list)
+    created_at: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ReparseJobs:
+    """
+    Background reparse of a newspaper's failed articles.
+
+    A job streams the saved pages of the unresolved failed articles from the page store to a process pool of
+    `processes` workers, `chunk_size` pages per task and at most two tasks per worker in flight. The parsed
+    sections come back to the job thread, which publishes them when asked and writes the resolution of
+    `write_batch_size` articles per `upsert_failed_articles_batch` statement. Jobs and their progress are kept
+    for the last `history` runs; one job per newspaper runs at a time.
+    """
+
+    def __init__(self, processes: int, chunk_size: int, write_batch_size: int, history: int):
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        self.history = history
+        self._jobs: OrderedDict[str, ReparseJob] = OrderedDict()
+        self._threads: dict[str, threading.Thread] = {}
+        self._cancelled: set[str] = set()
+        self._lock = threading.Lock()
+
+    def start(self, newspaper_id: int, publish: bool = False) -> dict:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.newspaper_id == newspaper_id and job.status in (QUEUED, RUNNING):
+                    return self._snapshot(job)
+            job = ReparseJob(job_id=uuid.uuid4().hex, newspaper_id=newspaper_id, publish=publish)
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.status in (QUEUED, RUNNING):
+                    break
+                self._jobs.popitem(last=False)
+            thread = threading.Thread(target=self._run, args=(job,), name=f'reparse-{newspaper_id}', daemon=True)
+            self._threads[job.job_id] = thread
+            thread.start()
+            return self._snapshot(job)
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job is not None else None
+
+    def list(self) -> list[dict]:
+        with self._lock:
+            return [self._snapshot(job) for job in reversed(self._jobs.values())]
+
+    def cancel(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in (QUEUED, RUNNING):
+                return False
+            self._cancelled.add(job_id)
+            return True
+
+    def shutdown(self, timeout: float = 30) -> None:
+        with self._lock:
+            threads = [(job_id, thread) for job_id, thread in self._threads.items() if thread.is_alive()]
+            self._cancelled.update(job_id for job_id, _ in threads)
+        for _, thread in threads:
+            thread.join(timeout)
+
+    def _snapshot(self, job: ReparseJob) -> dict:
+        # Caller holds the lock
+        snapshot = asdict(job)
+        snapshot['progress'] = round((job.parsed + job.missing_pages) / job.total, 4) if job.total else 0.0
+        if job.status == RUNNING and job.started_at and job.parsed:
+            elapsed = (datetime.now(timezone.utc) - datetime.fromisoformat(job.started_at)).total_seconds()
+            snapshot['pages_per_second'] = round(job.parsed / elapsed, 1) if elapsed else None
+            snapshot['eta_seconds'] = round((job.total - job.parsed - job.missing_pages) * elapsed / job.parsed)
+        return snapshot
+
+    def _update(self, job: ReparseJob, **changes) -> None:
+        with self._lock:
+            for key, value in changes.items():
+                setattr(job, key, value)
+
+    def _run(self, job: ReparseJob) -> None:
+        self._update(job, status=RUNNING, started_at=datetime.now(timezone.utc).isoformat())
+        started = time.monotonic()
+        try:
+            status = self._reparse(job)
+            self._update(job, status=status)
+            log.log_info(f"[Reparse] Job {job.job_id} of newspaper {job.newspaper_id} {status}: {job.resolved} "
+                         f"resolved, {job.unresolved} unresolved of {job.total} in {time.monotonic() - started:.1f}s")
+        except Exception as e:
+            log.log_error(f'[Reparse] Job {job.job_id} of newspaper {job.newspaper_id} failed.', e)
+            self._update(job, status=FAILED, error=str(e))
+        finally:
+            self._update(job, finished_at=datetime.now(timezone.utc).isoformat())
+            with self._lock:
+                self._cancelled.discard(job.job_id)
+                self._threads.pop(job.job_id, None)
+
+    def _reparse(self, job: ReparseJob) -> str:
+        article_config = find_article_configuration(job.newspaper_id)
+        if not article_config or not article_config.get('doc'):
+            raise ValueError(f'No article configuration for newspaper {job.newspaper_id}')
+        config = article_config.get('doc')
+
+        failed = {fa.get('article_id'): fa.get('info') or {}
+                  for fa in get_failed_articles_by_newspaper_id(job.newspaper_id) or [] if not fa.get('is_resolved')}
+        self._update(job, total=len(failed))
+        if not failed:
+            return COMPLETED
+
+        merge = _ResultMerger(self, job, config, failed)
+        workers = min(self.processes, max(1, len(failed) // self.chunk_size))
+        # Forked: a spawned worker would re-import main.py and with it the queue connections and the crawlers
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'),
+                                       initializer=init_worker,
+                                       initargs=(config, config.get('htmlParser') or ds.HTML_PARSER))
+        pending, chunk, seen = set(), [], 0
+        try:
+            for article_id, html in iter_failed_article_html(list(failed)):
+                if job.job_id in self._cancelled:
+                    break
+                seen += 1
+                chunk.append((article_id, failed[article_id].get('url', ''), html))
+                if len(chunk) < self.chunk_size:
+                    continue
+                pending.add(executor.submit(parse_pages, chunk))
+                chunk = []
+                while len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    merge.add(done)
+            else:
+                if chunk:
+                    pending.add(executor.submit(parse_pages, chunk))
+                self._update(job, missing_pages=len(failed) - seen)
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                merge.add(done)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            merge.flush()
+
+        merge.alert()
+        failed_page_store().collect_garbage()
+        return CANCELLED if job.job_id in self._cancelled else COMPLETED
+
+
+class _ResultMerger:
+    """
+    Folds parsed chunks into the job: publishing, batched failed-article upserts and the missing config alert.
+    """
+
+    def __init__(self, jobs: ReparseJobs, job: ReparseJob, config: dict, failed: dict):
+        self.jobs = jobs
+        self.job = job
+        self.config = config
+        self.failed = failed
+        self.rows = []
+        self.missing_configuration = set()
+        self.affected_articles = []
+
+    def add(self, futures) -> None:
+        counts = {'parsed': 0, 'resolved': 0, 'unresolved': 0, 'errors': 0}
+        for future in futures:
+            for article_id, sections, missing in future.result():
+                info = self.failed[article_id]
+                counts['parsed'] += 1
+                resolved = sections is not None and not missing
+                counts['resolved' if resolved else 'unresolved'] += 1
+                counts['errors'] += sections is None
+                self.missing_configuration.update(missing)
+                if missing:
+                    self.affected_articles.append({'article_id': article_id, 'article_url': info.get('url')})
+
+                if sections is not None and self.job.publish:
+                    mq.publish_message_into_article_analyzer(json.dumps(self._article_info(article_id, sections)))
+                self.rows.append({'article_id': article_id,
+                                  'newspaper_id': self.job.newspaper_id,
+                                  'is_resolved': resolved})
+
+        with self.jobs._lock:
+            for key, value in counts.items():
+                setattr(self.job, key, getattr(self.job, key) + value)
+            self.job.missing_configuration = sorted(self.missing_configuration)
+        if len(self.rows) >= self.jobs.write_batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self.rows:
+            return
+        upsert_failed_articles_batch(self.rows)
+        store = failed_page_store()
+        for row in self.rows:
+            if row['is_resolved']:
+                store.delete(row['article_id'])
+        self.rows = []
+
+    def alert(self) -> None:
+        if not self.affected_articles:
+            return
+        mail_utils.config_missing_alert({
+            "newspaper_id": self.job.newspaper_id,
+            "newspaper_name": self.config.get('name', ''),
+            "missing_config": self.missing_configuration,
+            "articles": self.affected_articles,
+            "year": date_utils.current_year()
+        })
+
+    def _article_info(self, article_id: int, sections: dict) -> dict:
+        info = self.failed[article_id]
+        return {
+            'header': sections['header'],
+            'body': sections['body'],
+            'author': sections['author'],
+            'date': sections['date'],
+            'std_date': sections['std_date'],
+            'language': self.config.get('language', ''),
+            'newspaper_id': self.config.get('newspaperID', 0),
+            'keywords': sections['keywords'],
+            'article_id': article_id,
+            'preamble': info.get('preamble'),
+            'sector': info.get('sector'),
+            'link': info.get('url')
+        }
+
+
+reparse_jobs = ReparseJobs(processes=ds.REPARSE_PROCESSES, chunk_size=ds.REPARSE_CHUNK_SIZE,
+                           write_batch_size=ds.REPARSE_WRITE_BATCH_SIZE, history=ds.REPARSE_JOB_HISTORY)
@@ -0,0 +1,182 @@
+import asyncio
+import fnmatch
+import json
+import random
+import threading
+from dataclasses import dataclass, field
+
+from core.config import data_source as ds
+from logger import log
+
+# Only text is read from the page, so these never change the extracted article
+DEFAULT_RESOURCE_TYPES = ['image', 'media', 'font']
+DEFAULT_URL_PATTERNS = [
+    '*doubleclick.net/*', '*googlesyndication.com/*', '*google-analytics.com/*', '*adservice.google.*',
+    '*amazon-adsystem.com/*', '*facebook.net/*', '*scorecardresearch.com/*', '*hotjar.com/*',
+    '*taboola.com/*', '*outbrain.com/*', '*criteo.com/*', '*chartbeat.com/*', '*quantserve.com/*',
+]
+
+# The ad hosts SeleniumBase's `ad_block_on` blocked; `Network.setBlockedURLs` replaces the whole list, so they
+# are part of every list set over CDP, including the unblocked comparison loads
+AD_BLOCK_URL_PATTERNS = ['*doubleclick.net/*', '*googleadservices.com/*']
+
+# CDP `Network.setBlockedURLs` only knows URL patterns, so resource types are blocked by file extension there
+RESOURCE_TYPE_EXTENSIONS = {
+    'image': ['jpg', 'jpeg', 'png', 'gif', 'webp', 'avif', 'svg', 'ico', 'bmp'],
+    'media': ['mp4', 'webm', 'm3u8', 'ts', 'mp3', 'ogg', 'wav'],
+    'font': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'stylesheet': ['css'],
+}
+
+@dataclass
+class BlockingProfile:
+    enabled: bool = True
+    resource_types: list = field(default_factory=lambda: list(DEFAULT_RESOURCE_TYPES))
+    url_patterns: list = field(default_factory=lambda: list(DEFAULT_URL_PATTERNS))
+
+    def cdp_patterns(self) -> list[str]:
+        patterns = list(self.url_patterns)
+        for resource_type in self.resource_types:
+            for extension in RESOURCE_TYPE_EXTENSIONS.get(resource_type, []):
+                patterns.extend([f'*.{extension}', f'*.{extension}?*'])
+        return patterns
+
+    def blocks(self, resource_type: str, url: str) -> bool:
+        return resource_type in self.resource_types or any(fnmatch.fnmatch(url, p) for p in self.url_patterns)
+
+
+def blocking_profile(config: dict) -> BlockingProfile:
+    """
+    Blocking profile of a newspaper. `blockProfile` in the newspaper config may switch blocking off
+    (`enabled`) or replace the default `resourceTypes` / `urlPatterns` lists.
+    """
+    profile_config = config.get('blockProfile') or {}
+    return BlockingProfile(
+        enabled=ds.RESOURCE_BLOCKING_ENABLED and profile_config.get('enabled', True),
+        resource_types=profile_config.get('resourceTypes', list(DEFAULT_RESOURCE_TYPES)),
+        url_patterns=profile_config.get('urlPatterns', list(DEFAULT_URL_PATTERNS))
+    )
+
+
+def block_this_load(profile: BlockingProfile) -> bool:
+    # A RESOURCE_BLOCKING_COMPARE_RATE share of page loads runs unblocked to keep the on/off comparison fresh
+    return profile.enabled and random.random() >= ds.RESOURCE_BLOCKING_COMPARE_RATE
+
+
+class RouteBlocker:
+    """
+    Playwright route handler applying a blocking profile; `active` switches it per page load.
+    """
+
+    def __init__(self, profile: BlockingProfile):
+        self.profile = profile
+        self.active = profile.enabled
+
+    def handle(self, route, *_):
+        request = route.request
+        if self.active and self.profile.blocks(request.resource_type, request.url):
+            return route.abort()
+        return route.continue_()
+
+
+def apply_cdp_blocking(driver, profile: BlockingProfile, active: bool) -> None:
+    """
+    Set the blocked URL list of a Chrome driver (Network domain must be enabled) for the next page load. Ads stay
+    blocked when the profile is not `active`.
+    """
+    patterns = list(AD_BLOCK_URL_PATTERNS)
+    if active:
+        patterns.extend(p for p in profile.cdp_patterns() if p not in AD_BLOCK_URL_PATTERNS)
+    try:
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as e:
+        log.log_warning(f'Unable to apply the resource blocking profile: {e}')
+
+
+class TransferCounter:
+    """
+    Playwright `requestfinished` listener summing the bytes a page load received from the response sizes
+    (headers plus the encoded body). Unlike Resource Timing `transferSize`, these are also known for
+    cross-origin resources served without Timing-Allow-Origin. Aborted (blocked) requests never finish.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def on_request_finished(self, request) -> None:
+        self.requests.append(request)
+
+    def reset(self) -> None:
+        self.requests = []
+
+    def transferred_bytes(self) -> int:
+        requests, self.requests = self.requests, []
+        total = 0
+        for request in requests:
+            try:
+                total += _response_bytes(request.sizes())
+            except Exception as e:
+                log.log_warning(f'Unable to read the response size of {request.url}: {e}')
+        return total
+
+    async def async_transferred_bytes(self) -> int:
+        requests, self.requests = self.requests, []
+        sizes = await asyncio.gather(*(request.sizes() for request in requests), return_exceptions=True)
+        return sum(_response_bytes(size) for size in sizes if not isinstance(size, Exception))
+
+
+def _response_bytes(sizes: dict) -> int:
+    return max(sizes.get('responseHeadersSize', 0), 0) + max(sizes.get('responseBodySize', 0), 0)
+
+
+def cdp_transferred_bytes(driver) -> int:
+    """
+    Bytes a Chrome driver received since the previous call, summed from the `encodedDataLength` of the
+    `Network.loadingFinished` events in its performance log (the browser must be launched with
+    `log_cdp_events`). Reading the log empties it.
+    """
+    total = 0
+    for entry in driver.get_log('performance'):
+        message = json.loads(entry['message']).get('message', {})
+        if message.get('method') == 'Network.loadingFinished':
+            total += message.get('params', {}).get('encodedDataLength', 0)
+    return int(total)
+
+
+class BlockingStats:
+    """
+    Transferred bytes and page-ready time per newspaper, split by page loads with blocking on and off.
+    """
+
+    def __init__(self):
+        self._totals: dict = {}
+        self._lock = threading.Lock()
+
+    def record(self, newspaper_id, blocked: bool, transferred_bytes: int, ready_seconds: float) -> None:
+        with self._lock:
+            totals = self._totals.setdefault(newspaper_id, {True: [0, 0, 0.0], False: [0, 0, 0.0]})[blocked]
+            totals[0] += 1
+            totals[1] += transferred_bytes or 0
+            totals[2] += ready_seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            totals = {key: {mode: list(values) for mode, values in value.items()} for key, value in self._totals.items()}
+
+        snapshot = {}
+        for newspaper_id, modes in totals.items():
+            entry = {}
+            for blocked, (pages, transferred, ready) in modes.items():
+                entry['blocked' if blocked else 'unblocked'] = {
+                    'pages': pages,
+                    'avg_bytes': round(transferred / pages) if pages else 0,
+                    'avg_ready_seconds': round(ready / pages, 3) if pages else 0.0
+                }
+            on, off = entry['blocked'], entry['unblocked']
+            if on['pages'] and off['pages'] and off['avg_bytes']:
+                entry['bytes_saved_ratio'] = round(1 - on['avg_bytes'] / off['avg_bytes'], 4)
+            snapshot[str(newspaper_id)] = entry
+        return snapshot
+
+
+blocking_stats = BlockingStats()
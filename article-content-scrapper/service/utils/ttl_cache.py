@@ -0,0 +1,51 @@
+import threading
+import time
+from typing import Any, Callable, Hashable
+
+
+class TtlCache:
+    """
+    Thread-safe in-process cache whose entries expire `ttl` seconds after they were loaded.
+
+    `get_or_load` runs the loader outside the lock; concurrent misses on the same key may load it twice,
+    which is harmless for idempotent lookups. A loader returning None is not cached, so a configuration
+    added later is picked up on the next call.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: dict[Hashable, tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._stats['hits'] += 1
+                return entry[1]
+            self._stats['misses'] += 1
+
+        value = loader()
+        if value is not None and self.ttl > 0:
+            with self._lock:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+        return value
+
+    def invalidate(self, key: Hashable = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+            self._stats['invalidations'] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+        stats['ttl'] = self.ttl
+        return stats
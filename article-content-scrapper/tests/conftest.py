@@ -0,0 +1,8 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.settings_defaults import apply_settings_defaults  # noqa: E402
+
+apply_settings_defaults()
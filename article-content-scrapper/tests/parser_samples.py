@@ -0,0 +1,37 @@
+"""
+Edge-case article pages and the newspaper config used to compare the lxml and BeautifulSoup parsers.
+"""
+
+SAMPLE_CONFIG = {
+    'header': [{'type': 'css', 'name': 'h1.headline'}, {'type': 'css', 'name': 'h1'}],
+    'body': [{'type': 'css', 'name': 'div.article-body > p'}, {'type': 'css', 'name': 'article p'}],
+    'author': [{'type': 'css', 'name': '.byline a[rel="author"]'}],
+    'date': [{'type': 'css', 'name': 'time[datetime]', 'attribute': 'datetime'}, {'type': 'css', 'name': '.date'}],
+    'keywords': [{'type': 'css', 'name': 'ul.tags li:not(.hidden)'}],
+    'dateRegex': []
+}
+
+SAMPLE_PAGES = {
+    'plain': '''<html><body><h1 class="headline">Markets rally</h1>
+        <div class="byline">By <a rel="author" href="/a">Jane Roe</a></div>
+        <time datetime="2024-05-01T10:00:00Z">1 May</time>
+        <div class="article-body"><p>First   paragraph.</p><p>Second <b>bold</b> and <i>italic</i>.</p></div>
+        <ul class="tags"><li>stocks</li><li class="hidden">x</li><li>bonds</li></ul></body></html>''',
+    'scripts-and-comments': '''<html><head><style>p {color: red}</style></head><body>
+        <h1>Head<script>var a = "<p>no</p>";</script>line<!-- comment --> end</h1>
+        <article><p>Text <noscript>fallback</noscript><template><span>tmpl</span></template>after</p>
+        <p><ruby>漢<rt>kan</rt>字<rp>(</rp></ruby> ruby</p></article>
+        <span class="date"> 2 June 2024 </span></body></html>''',
+    'entities-and-whitespace': '''<html><body><h1 class="headline">&nbsp;Caf&eacute; &amp; bar&#160;</h1>
+        <div class="article-body"><p>
+            Line one
+            <br>line two\t\ttabbed</p><p>   </p><p>&lt;tag&gt; &quot;quoted&quot;</p></div></body></html>''',
+    'missing-sections': '''<html><body><div>No configured elements here.</div></body></html>''',
+    'malformed': '''<html><body><h1>Unclosed <b>bold<div class="article-body"><p>One<p>Two</div>
+        <ul class="tags"><li>a<li>b</ul>''',
+    'xml-declaration': '''<?xml version="1.0" encoding="utf-8"?><html><body><h1>Declared</h1>
+        <article><p>Body</p></article></body></html>''',
+}
+
+# html.parser nests unclosed <p>/<li> while lxml closes them like a browser; these sections may differ
+KNOWN_DIFFERENCES = {'malformed': {'body', 'keywords'}}
@@ -0,0 +1,67 @@
+import multiprocessing
+
+from service.utils.page_store import PageStore
+
+
+def page(article_id):
+    return f'<html><body><h1>Article {article_id}</h1>{"<p>text</p>" * article_id}</body></html>'
+
+
+def put_pages(directory, article_ids):
+    store = PageStore(directory, pack_max_bytes=512)
+    for article_id in article_ids:
+        store.put(article_id, page(article_id))
+    store.close()
+
+
+def test_round_trip_stores_a_shared_page_once(tmp_path):
+    store = PageStore(str(tmp_path))
+    store.put(1, page(7))
+    store.put(2, page(7))
+
+    assert store.get(1) == store.get(2) == page(7)
+    assert store.get(3) is None
+    assert store.stats()['distinct_pages'] == 1
+    store.close()
+
+
+def test_stores_sharing_a_directory_append_at_the_pack_end(tmp_path):
+    a, b = PageStore(str(tmp_path)), PageStore(str(tmp_path))
+    a.put(1, page(1))
+    b.put(2, page(2))
+    a.put(3, page(3))
+
+    for store in (a, b):
+        assert [store.get(article_id) for article_id in (1, 2, 3)] == [page(1), page(2), page(3)]
+    a.close()
+    b.close()
+
+
+def test_concurrent_writer_processes(tmp_path):
+    context = multiprocessing.get_context('fork')
+    writers = [context.Process(target=put_pages, args=(str(tmp_path), range(start, 100, 4))) for start in range(4)]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    store = PageStore(str(tmp_path), pack_max_bytes=512)
+    assert all(writer.exitcode == 0 for writer in writers)
+    assert dict(store.iter_pages()) == {article_id: page(article_id) for article_id in range(100)}
+    assert store.stats()['packs'] > 1
+    store.close()
+
+
+def test_collect_garbage_keeps_pages_written_by_another_store(tmp_path):
+    a, b = PageStore(str(tmp_path), pack_max_bytes=256), PageStore(str(tmp_path), pack_max_bytes=256)
+    for article_id in range(1, 20):
+        a.put(article_id, page(article_id))
+        a.delete(article_id - 1)
+    b.put(100, page(100))
+    a.collect_garbage()
+    b.put(101, page(101))
+
+    assert b.get(19) == a.get(19) == page(19)
+    assert a.get(100) == page(100) and a.get(101) == page(101)
+    a.close()
+    b.close()
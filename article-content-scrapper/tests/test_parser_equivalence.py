@@ -0,0 +1,33 @@
+import pytest
+
+from service.parser.article_sections import parse_article_sections
+from service.parser.html_document import LXML, SOUP, load_document, precompile_selectors
+from tests.parser_samples import KNOWN_DIFFERENCES, SAMPLE_CONFIG, SAMPLE_PAGES
+
+
+def parse(doc, parser):
+    sections, missing = parse_article_sections(SAMPLE_CONFIG, load_document(doc, parser))
+    sections['missing'] = sorted(missing)
+    return sections
+
+
+@pytest.fixture(scope='module', autouse=True)
+def compiled_selectors():
+    precompile_selectors(SAMPLE_CONFIG)
+
+
+@pytest.mark.parametrize('name', sorted(SAMPLE_PAGES))
+def test_lxml_matches_soup(name):
+    soup, lxml = parse(SAMPLE_PAGES[name], SOUP), parse(SAMPLE_PAGES[name], LXML)
+
+    assert soup.keys() == lxml.keys()
+    differences = {key for key in soup if soup[key] != lxml[key]}
+    assert differences <= KNOWN_DIFFERENCES.get(name, set()), \
+        {key: (soup[key], lxml[key]) for key in differences}
+
+
+def test_missing_sections_are_reported_alike():
+    soup, lxml = parse(SAMPLE_PAGES['missing-sections'], SOUP), parse(SAMPLE_PAGES['missing-sections'], LXML)
+
+    assert soup['missing'] == lxml['missing']
+    assert {'header', 'body'} <= set(lxml['missing'])
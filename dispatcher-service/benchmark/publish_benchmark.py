@@ -0,0 +1,94 @@
+"""
+Publish throughput benchmark against the local broker from `docker_rabbitmq_for_local_testing`.
+
+Compares the legacy channel-per-message `publish_message` with `BatchPublisher` at several
+confirm windows and prints messages per second together with confirmed and nacked counts.
+
+    cd docker_rabbitmq_for_local_testing && docker-compose up -d
+    cd dispatcher-service && python benchmark/publish_benchmark.py --messages 20000
+"""
+import argparse
+import os
+import sys
+import time
+
+# Defaults matching docker_rabbitmq_for_local_testing; real environment variables take precedence
+for key, value in {'MQ_HOST': 'localhost', 'MQ_PORT': '5672', 'MQ_USERNAME': 'admin', 'MQ_PASSWORD': 'admin',
+                   'ARTICLE_URL_EXCHANGE': '', 'ARTICLE_URL_QUEUE': 'dispatcher_benchmark',
+                   'ARTICLE_URL_KEY': 'dispatcher_benchmark', 'SPOKESPERSON_DB_HOST': '',
+                   'SPOKESPERSON_DB_NAME': '', 'SPOKESPERSONDB_USER': '', 'SPOKESPERSON_DB_PASSWORD': ''}.items():
+    os.environ.setdefault(key, value)
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pika  # noqa: E402
+from mq_service.publisher import BatchPublisher, PublishReport, publish_message, \
+    get_connection_parameters  # noqa: E402
+
+# The legacy publisher opens a channel per message and never closes it, so it is capped below channel_max
+LEGACY_MAX_MESSAGES = 2000
+
+
+def connect():
+    return pika.BlockingConnection(get_connection_parameters())
+
+
+def prepare_queue(queue_name):
+    connection = connect()
+    channel = connection.channel()
+    channel.queue_declare(queue=queue_name, durable=True, arguments={'x-max-priority': 10})
+    channel.queue_purge(queue=queue_name)
+    connection.close()
+
+
+def delete_queue(queue_name):
+    connection = connect()
+    connection.channel().queue_delete(queue=queue_name)
+    connection.close()
+
+
+def run_legacy(queue_name, body, count) -> PublishReport:
+    connection = connect()
+    started = time.perf_counter()
+    for _ in range(count):
+        publish_message(connection, '', queue_name, body, 5)
+    report = PublishReport(published=count, elapsed=time.perf_counter() - started)
+    connection.close()
+    return report
+
+
+def run_batch(queue_name, body, count, window) -> PublishReport:
+    publisher = BatchPublisher('', queue_name, window=window)
+    return publisher.publish_all((body, 5, i) for i in range(count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dispatcher publish throughput benchmark')
+    parser.add_argument('--messages', type=int, default=10000, help='messages per run')
+    parser.add_argument('--size', type=int, default=2048, help='message body size in bytes')
+    parser.add_argument('--windows', default='1,32,256,1024', help='comma separated confirm windows')
+    parser.add_argument('--queue', default=os.environ['ARTICLE_URL_QUEUE'], help='benchmark queue name')
+    args = parser.parse_args()
+
+    body = '{"doc": "%s"}' % ('x' * max(args.size - 11, 0))
+    legacy_count = min(args.messages, LEGACY_MAX_MESSAGES)
+
+    print(f'Broker {os.environ["MQ_HOST"]}:{os.environ["MQ_PORT"]}, {args.messages} messages of {len(body)} bytes')
+
+    prepare_queue(args.queue)
+    report = run_legacy(args.queue, body, legacy_count)
+    print(f'{"legacy (no confirms)":<24} {report.display_info()}')
+
+    for window in [int(w) for w in args.windows.split(',') if w.strip()]:
+        prepare_queue(args.queue)
+        report = run_batch(args.queue, body, args.messages, window)
+        print(f'{f"batch window={window}":<24} {report.display_info()}')
+
+    delete_queue(args.queue)
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except pika.exceptions.AMQPConnectionError as err:
+        print('Broker not reachable, start docker_rabbitmq_for_local_testing first:', err)
@@ -40,6 +40,36 @@ class ConfigManager:
         self.mq_connection_attempt = int(self.app_config.get('MQ', 'connection_attempts'))
         self.mq_retry_delay = int(self.app_config.get('MQ', 'retry_delay'))
         self.mq_delivery_mode = int(self.app_config.get('MQ', 'delivery_mode'))
+        self.mq_confirm_window = int(self.app_config.get('MQ', 'confirm_window', fallback='256'))
+        self.dispatch_mode = self.app_config.get('DISPATCHER', 'mode', fallback='full')
+        self.redispatch_interval_minutes = int(self.app_config.get('DISPATCHER', 'redispatch_interval_minutes',
+                                                                   fallback='1440'))
+        self.fetch_size = int(self.app_config.get('DISPATCHER', 'fetch_size', fallback='500'))
+        self.scheduler_base_interval_minutes = float(self.app_config.get('SCHEDULER', 'base_interval_minutes',
+                                                                         fallback='60'))
+        self.scheduler_min_interval_minutes = float(self.app_config.get('SCHEDULER', 'min_interval_minutes',
+                                                                        fallback='15'))
+        self.scheduler_max_interval_minutes = float(self.app_config.get('SCHEDULER', 'max_interval_minutes',
+                                                                        fallback='1440'))
+        self.scheduler_tick_seconds = float(self.app_config.get('SCHEDULER', 'tick_seconds', fallback='30'))
+        self.scheduler_refresh_minutes = float(self.app_config.get('SCHEDULER', 'refresh_minutes', fallback='10'))
+        self.scheduler_max_publish_per_minute = float(self.app_config.get('SCHEDULER', 'max_publish_per_minute',
+                                                                          fallback='60'))
+        self.cluster_mode = self.app_config.get('CLUSTER', 'mode', fallback='single')
+        self.cluster_lock_key = int(self.app_config.get('CLUSTER', 'lock_key', fallback='724001'))
+        self.cluster_leader_retry_seconds = float(self.app_config.get('CLUSTER', 'leader_retry_seconds',
+                                                                      fallback='5'))
+        if self.cluster_mode == 'partition':
+            self.cluster_instance_index = int(self.app_config.get('CLUSTER', 'instance_index'))
+            self.cluster_instance_count = int(self.app_config.get('CLUSTER', 'instance_count'))
+            # Out of range values would silently leave every newspaper to no instance
+            if self.cluster_instance_count < 1 or not 0 <= self.cluster_instance_index < self.cluster_instance_count:
+                raise Exception(f'CLUSTER instance_index must be in [0, instance_count) and instance_count at '
+                                f'least 1, got index {self.cluster_instance_index} of '
+                                f'{self.cluster_instance_count}')
+        else:
+            self.cluster_instance_index = 0
+            self.cluster_instance_count = 1
 
     def get_db_param(self):
         if self.app_config.has_section('DB'):
@@ -1,23 +1,83 @@
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from conf.config_manager import config_manager
 
 db_params = config_manager.get_db_param()
 
+ARTICLE_CONF_SQL = '''
+    select
+         a.id, a.doc, a.newspaper_id, a.priority,
+         n.currency, n.isactive, n.link,
+         n.name, l."name" as lang, r.name as region
+    from conf.articlesearchconf a
+    left join conf.newspapers n on n.id = a.newspaper_id
+    left join conf.languages l on l.id = n.language_id
+    left join conf.regions r on r.id = n.region_id
+    {where}
+    ;
+'''
+
+# One row per articlesearchconf row, as a newspaper may have a config per section. A table of the older layout,
+# keyed by newspaper id, is dropped: its configs are dispatched once as new.
+DISPATCH_STATE_DDL = '''
+    do $$
+    begin
+        if exists (select 1 from information_schema.tables
+                   where table_schema = 'conf' and table_name = 'dispatch_state')
+           and not exists (select 1 from information_schema.columns
+                           where table_schema = 'conf' and table_name = 'dispatch_state'
+                             and column_name = 'config_id') then
+            drop table conf.dispatch_state;
+        end if;
+    end
+    $$;
+    create table if not exists conf.dispatch_state (
+        config_id integer primary key,
+        newspaper_id integer not null,
+        content_hash varchar(64) not null,
+        version integer not null default 1,
+        last_dispatched_at timestamp not null default now(),
+        next_run_at timestamp
+    );
+'''
+
+
+def partition_condition():
+    """
+    SQL condition restricting a query to this instance's hash-partitioned slice of newspapers in
+    'partition' cluster mode, or None when the instance sees every newspaper.
+    """
+    if config_manager.cluster_mode != 'partition' or config_manager.cluster_instance_count <= 1:
+        return None
+
+    count = int(config_manager.cluster_instance_count)
+    index = int(config_manager.cluster_instance_index)
+    return f'mod(hashtext(a.newspaper_id::text)::bigint & 2147483647, {count}) = {index}'
+
+
+def _where(*conditions):
+    conditions = [c for c in conditions + (partition_condition(),) if c]
+    return 'where ' + ' and '.join(conditions) if conditions else ''
+
+
+def _to_article_config(rs):
+    return {
+        'config_id': rs.get('id'),
+        'doc': rs.get('doc'),
+        'newspaper_id': rs.get('newspaper_id'),
+        'priority': rs.get('priority'),
+        'currency': rs.get('currency'),
+        'is_active': rs.get('isactive'),
+        'website_url': rs.get('link'),
+        'source_name': rs.get('name'),
+        'language': rs.get('lang'),
+        'region': rs.get('region')
+    }
+
 
 def get_article_conf():
     conn = None
-    sql = '''
-        select 
-             a.doc, a.newspaper_id, a.priority,
-             n.currency, n.isactive, n.link, 
-             n.name, l."name" as lang, r.name as region 
-        from conf.articlesearchconf a
-        left join conf.newspapers n on n.id = a.newspaper_id
-        left join conf.languages l on l.id = n.language_id
-        left join conf.regions r on r.id = n.region_id
-        ;
-    '''
+    sql = ARTICLE_CONF_SQL.format(where=_where())
 
     try:
         conn = psycopg2.connect(**db_params)
@@ -26,18 +86,7 @@ def get_article_conf():
         result_sets = cur.fetchall()
         article_configurations = []
         for rs in result_sets:
-            article_config = {
-                'doc': rs.get('doc'),
-                'newspaper_id': rs.get('newspaper_id'),
-                'priority': rs.get('priority'),
-                'currency': rs.get('currency'),
-                'is_active': rs.get('isactive'),
-                'website_url': rs.get('link'),
-                'source_name': rs.get('name'),
-                'language': rs.get('lang'),
-                'region': rs.get('region')
-            }
-            article_configurations.append(article_config)
+            article_configurations.append(_to_article_config(rs))
 
         cur.close()     # Close the cursor to release database resources
         return article_configurations
@@ -47,3 +96,155 @@ def get_article_conf():
     finally:
         if conn is not None:
             conn.close()    # close the database connection
+
+
+def stream_article_conf(active_only=True, fetch_size=500):
+    """
+    Yield article configurations one by one through a server-side (named) cursor, so only
+    `fetch_size` rows are held in memory at a time regardless of the size of the config table.
+    :param active_only: filter out inactive newspapers in SQL
+    :param fetch_size: number of rows fetched per round-trip
+    """
+    conn = None
+    sql = ARTICLE_CONF_SQL.format(where=_where('n.isactive' if active_only else None))
+
+    try:
+        conn = psycopg2.connect(**db_params)
+        cur = conn.cursor(name='article_conf_stream', cursor_factory=RealDictCursor)
+        cur.itersize = fetch_size
+        cur.execute(sql)
+        for rs in cur:
+            yield _to_article_config(rs)
+
+        cur.close()
+    except Exception as err:
+        print('check error', err)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def get_article_conf_by_ids(config_ids):
+    """
+    Fetch the given article configurations (articlesearchconf ids) only.
+    """
+    if not config_ids:
+        return []
+
+    conn = None
+    sql = ARTICLE_CONF_SQL.format(where=_where('a.id = any(%s)'))
+
+    try:
+        conn = psycopg2.connect(**db_params)
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(sql, (list(config_ids),))
+        article_configurations = [_to_article_config(rs) for rs in cur.fetchall()]
+        cur.close()
+        return article_configurations
+    except Exception as err:
+        print('check error', err)
+        return []
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def get_newspaper_schedules():
+    """
+    Fetch the crawl schedule inputs (priority, active hours and time zone) of every config of the active
+    newspapers.
+    """
+    conn = None
+    sql = f'''
+        select a.id as config_id, a.newspaper_id, a.priority, n.active_hours, n.time_zone
+        from conf.articlesearchconf a
+        join conf.newspapers n on n.id = a.newspaper_id
+        {_where('n.isactive')};
+    '''
+
+    try:
+        conn = psycopg2.connect(**db_params)
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(sql)
+        schedules = [dict(rs) for rs in cur.fetchall()]
+        cur.close()
+        return schedules
+    except Exception as err:
+        print('Error while fetching newspaper schedules', err)
+        return None
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def ensure_dispatch_state():
+    conn = None
+    try:
+        conn = psycopg2.connect(**db_params)
+        cur = conn.cursor()
+        cur.execute(DISPATCH_STATE_DDL)
+        conn.commit()
+        cur.close()
+    except Exception as err:
+        print('Error while creating dispatch state table', err)
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def get_dispatch_state():
+    """
+    Load the last dispatched content hash and version of every config, keyed by config id.
+    """
+    conn = None
+    sql = ('select config_id, newspaper_id, content_hash, version, last_dispatched_at, next_run_at '
+           'from conf.dispatch_state;')
+
+    try:
+        conn = psycopg2.connect(**db_params)
+        cur = conn.cursor(cursor_factory=RealDictCursor)
+        cur.execute(sql)
+        dispatch_state = {rs.get('config_id'): dict(rs) for rs in cur.fetchall()}
+        cur.close()
+        return dispatch_state
+    except Exception as err:
+        print('Error while fetching dispatch state', err)
+        return {}
+    finally:
+        if conn is not None:
+            conn.close()
+
+
+def save_dispatch_state(states):
+    """
+    Upsert dispatch state rows in a single round-trip. A null next_run_at keeps the stored schedule.
+    :param states: list of (config_id, newspaper_id, content_hash, version, last_dispatched_at, next_run_at) tuples
+    """
+    if not states:
+        return
+
+    conn = None
+    sql = '''
+        insert into conf.dispatch_state
+            (config_id, newspaper_id, content_hash, version, last_dispatched_at, next_run_at)
+        values %s
+        on conflict (config_id)
+        do update set
+            newspaper_id = excluded.newspaper_id,
+            content_hash = excluded.content_hash,
+            version = excluded.version,
+            last_dispatched_at = excluded.last_dispatched_at,
+            next_run_at = coalesce(excluded.next_run_at, conf.dispatch_state.next_run_at);
+    '''
+
+    try:
+        conn = psycopg2.connect(**db_params)
+        cur = conn.cursor()
+        execute_values(cur, sql, states)
+        conn.commit()
+        cur.close()
+    except Exception as err:
+        print('Error while saving dispatch state', err)
+    finally:
+        if conn is not None:
+            conn.close()
@@ -1,5 +1,16 @@
+import argparse
+
 from service.dispatcher import message_dispatcher
+from service.scheduler import run_scheduler
 
 
 if __name__ == '__main__':
-    message_dispatcher()
+    parser = argparse.ArgumentParser(description='Article configuration dispatcher')
+    parser.add_argument('--once', action='store_true',
+                        help='dispatch once and exit instead of running the scheduler daemon')
+    args = parser.parse_args()
+
+    if args.once:
+        message_dispatcher()
+    else:
+        run_scheduler()
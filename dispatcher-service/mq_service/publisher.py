@@ -1,3 +1,6 @@
+import time
+from dataclasses import dataclass
+
 import pika
 from conf.config_manager import config_manager
 
@@ -21,20 +24,189 @@ def publish_message(connection, exchange_name, routing_key, message, priority=5)
         print(e)
 
 
+def get_connection_parameters():
+    mq_params = config_manager.mq_params
+    return pika.ConnectionParameters(host=mq_params.get('host'),
+                                     port=mq_params.get('port'),
+                                     credentials=pika.PlainCredentials(mq_params.get('username'),
+                                                                       mq_params.get('password')),
+                                     connection_attempts=config_manager.mq_connection_attempt,
+                                     retry_delay=config_manager.mq_retry_delay)
+
+
 def establish_messaging_broker_connection():
     connection = None
 
     try:
         # Establish a connection to RabbitMQ server
-        connection = pika.BlockingConnection(
-            pika.ConnectionParameters(host=config_manager.mq_params.get('host'),
-                                      port=config_manager.mq_params.get('port'),
-                                      connection_attempts=config_manager.mq_connection_attempt,
-                                      retry_delay=config_manager.mq_retry_delay)
-        )
+        connection = pika.BlockingConnection(get_connection_parameters())
         return connection
     except Exception as e:
         print(e)
         if connection is not None:
             # Close the connection
             connection.close()
+
+
+@dataclass
+class PublishReport:
+    published: int = 0
+    confirmed: int = 0
+    nacked: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.published / self.elapsed if self.elapsed else 0.0
+
+    def display_info(self) -> str:
+        return (f"published={self.published} confirmed={self.confirmed} nacked={self.nacked} "
+                f"elapsed={self.elapsed:.3f}s rate={self.rate:.0f} msg/s")
+
+
+class BatchPublisher:
+    """
+    Publishes a stream of messages on one channel in publisher-confirm mode.
+
+    Up to `window` messages are in flight at a time; broker acks and nacks (including
+    `multiple` acks) are handled asynchronously on a SelectConnection I/O loop, so throughput
+    is bound by the broker rather than by one round-trip per message. A window of 1 behaves
+    like synchronous confirms.
+    """
+
+    def __init__(self, exchange_name, routing_key, window=None, parameters=None,
+                 on_confirmed=None, on_nacked=None):
+        """
+        :param exchange_name: exchange to publish into
+        :param routing_key: routing key of every message
+        :param window: maximum number of unconfirmed messages in flight
+        :param parameters: pika connection parameters, defaults to the [MQ] section
+        :param on_confirmed: called with the message context once the broker acks it
+        :param on_nacked: called with the message context when the broker nacks it or the channel is lost
+        """
+        self.exchange_name = exchange_name
+        self.routing_key = routing_key
+        self.window = window or config_manager.mq_confirm_window
+        self.parameters = parameters or get_connection_parameters()
+        self.on_confirmed = on_confirmed
+        self.on_nacked = on_nacked
+        self._connection = None
+        self._channel = None
+        self._messages = None
+        self._outstanding = {}
+        self._delivery_tag = 0
+        self._exhausted = False
+        self._closing = False
+        self._report = PublishReport()
+
+    def publish_all(self, messages) -> PublishReport:
+        """
+        Publish every message and block until all of them are confirmed or nacked.
+        :param messages: iterable of (body, priority, context) tuples; context is handed back to the callbacks
+        """
+        self._messages = iter(messages)
+        self._outstanding = {}
+        self._delivery_tag = 0
+        self._exhausted = False
+        self._closing = False
+        self._report = PublishReport()
+
+        started = time.perf_counter()
+        self._connection = pika.SelectConnection(parameters=self.parameters,
+                                                 on_open_callback=self._on_connection_open,
+                                                 on_open_error_callback=self._on_connection_open_error,
+                                                 on_close_callback=self._on_connection_closed)
+        self._connection.ioloop.start()
+        self._report.elapsed = time.perf_counter() - started
+        return self._report
+
+    def _on_connection_open(self, connection):
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, connection, err):
+        print('Unable to open messaging broker connection', err)
+        connection.ioloop.stop()
+
+    def _on_connection_closed(self, connection, reason):
+        self._channel = None
+        self._fail_outstanding()
+        connection.ioloop.stop()
+
+    def _on_channel_open(self, channel):
+        self._channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.confirm_delivery(ack_nack_callback=self._on_delivery_confirmation,
+                                 callback=lambda _frame: self._publish_window())
+
+    def _on_channel_closed(self, channel, reason):
+        if not self._closing:
+            print('Publishing channel closed unexpectedly', reason)
+        self._channel = None
+        self._fail_outstanding()
+        self._close()
+
+    def _publish_window(self):
+        while self._channel is not None and not self._exhausted and len(self._outstanding) < self.window:
+            try:
+                body, priority, context = next(self._messages)
+            except StopIteration:
+                self._exhausted = True
+                break
+
+            self._channel.basic_publish(
+                exchange=self.exchange_name,
+                routing_key=self.routing_key,
+                body=body,
+                properties=pika.BasicProperties(
+                    delivery_mode=config_manager.mq_delivery_mode,
+                    priority=priority
+                )
+            )
+            self._delivery_tag += 1
+            self._outstanding[self._delivery_tag] = context
+            self._report.published += 1
+
+        if self._exhausted and not self._outstanding:
+            self._close()
+
+    def _on_delivery_confirmation(self, method_frame):
+        method = method_frame.method
+        acked = isinstance(method, pika.spec.Basic.Ack)
+
+        if method.multiple:
+            # Outstanding tags are kept in publish order, so every tag up to the confirmed one is settled
+            tags = []
+            for tag in self._outstanding:
+                if tag > method.delivery_tag:
+                    break
+                tags.append(tag)
+        else:
+            tags = [method.delivery_tag]
+
+        for tag in tags:
+            context = self._outstanding.pop(tag, None)
+            self._settle(context, acked)
+
+        self._publish_window()
+
+    def _settle(self, context, acked):
+        if acked:
+            self._report.confirmed += 1
+            if self.on_confirmed:
+                self.on_confirmed(context)
+        else:
+            self._report.nacked += 1
+            if self.on_nacked:
+                self.on_nacked(context)
+
+    def _fail_outstanding(self):
+        for context in self._outstanding.values():
+            self._settle(context, acked=False)
+        self._outstanding = {}
+
+    def _close(self):
+        if self._closing:
+            return
+        self._closing = True
+        if self._connection is not None and not (self._connection.is_closing or self._connection.is_closed):
+            self._connection.close()
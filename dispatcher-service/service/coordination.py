@@ -0,0 +1,78 @@
+import psycopg2
+
+from conf.config_manager import config_manager
+from db_service.db_handler import db_params
+
+# The advisory lock lives as long as the leader's backend. The server only ends the backend of a leader whose
+# host died or got cut off once its own TCP keepalives (2h by default) give up on the client, so the session
+# sets them to about 10s; the libpq keepalives only let the leader notice a dead server.
+KEEPALIVE_PARAMS = {
+    'keepalives': 1,
+    'keepalives_idle': 5,
+    'keepalives_interval': 2,
+    'keepalives_count': 3,
+    'options': '-c tcp_keepalives_idle=5 -c tcp_keepalives_interval=2 -c tcp_keepalives_count=3'
+}
+
+
+class LeaderElector:
+    """
+    Leader election on a session-level Postgres advisory lock.
+
+    The lock is held on a dedicated connection for as long as the instance is leader. If the leader process
+    dies or loses its database session, Postgres releases the lock and the next standby that polls
+    `try_acquire` takes over.
+    """
+
+    def __init__(self, lock_key=None):
+        self.lock_key = lock_key if lock_key is not None else config_manager.cluster_lock_key
+        self.conn = None
+        self.is_leader = False
+
+    def try_acquire(self) -> bool:
+        """
+        Return True if this instance holds the lock, acquiring it when free. A leader re-validates its session,
+        so a broken connection is noticed before the next dispatch.
+        """
+        try:
+            if self.conn is None or self.conn.closed:
+                self.is_leader = False
+                self.conn = psycopg2.connect(**db_params, **KEEPALIVE_PARAMS)
+                self.conn.autocommit = True
+
+            cur = self.conn.cursor()
+            if self.is_leader:
+                cur.execute('select 1;')
+            else:
+                cur.execute('select pg_try_advisory_lock(%s);', (self.lock_key,))
+                acquired = cur.fetchone()[0]
+                if acquired:
+                    print(f'Acquired dispatcher leadership (lock {self.lock_key})')
+                self.is_leader = acquired
+            cur.close()
+        except Exception as err:
+            if self.is_leader:
+                print('Lost dispatcher leadership', err)
+            self._reset()
+
+        return self.is_leader
+
+    def release(self):
+        if self.conn is not None and not self.conn.closed and self.is_leader:
+            try:
+                cur = self.conn.cursor()
+                cur.execute('select pg_advisory_unlock(%s);', (self.lock_key,))
+                cur.close()
+            except Exception as err:
+                print('Error while releasing dispatcher leadership', err)
+        self._reset()
+
+    def _reset(self):
+        self.is_leader = False
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except Exception:
+                pass
+        self.conn = None
+
@@ -1,25 +1,103 @@
-from db_service.db_handler import get_article_conf
+import hashlib
+from datetime import datetime, timedelta
+
+from db_service.db_handler import get_article_conf, stream_article_conf, ensure_dispatch_state, \
+    get_dispatch_state, save_dispatch_state
 import json
-from mq_service.publisher import publish_message, establish_messaging_broker_connection
+from mq_service.publisher import BatchPublisher
 from conf.config_manager import config_manager
+from service.coordination import LeaderElector
+
+
+def config_hash(article_config):
+    """
+    Stable content hash of an article configuration, used to detect changed configs.
+    """
+    canonical = json.dumps(article_config, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
 
 
 def message_dispatcher():
+    elector = LeaderElector() if config_manager.cluster_mode == 'leader' else None
+    if elector is not None and not elector.try_acquire():
+        print('Another dispatcher instance holds the leadership, skipping this run')
+        return
+
+    try:
+        if config_manager.dispatch_mode == 'delta':
+            delta_dispatcher()
+        else:
+            full_dispatcher()
+    finally:
+        if elector is not None:
+            elector.release()
+
+
+def full_dispatcher():
     print('Initiate to dispatching the message')
     EXCHANGE_NAME = config_manager.ARTICLE_URL_EXCHANGE
     ROUTING_KEY = config_manager.ARTICLE_URL_KEY
-    connection = None
 
-    article_configurations = get_article_conf()
     try:
-        connection = establish_messaging_broker_connection()
-        for ac in article_configurations:
-            publish_message(connection, EXCHANGE_NAME, ROUTING_KEY, json.dumps(ac), ac.get('priority'))
-        print('Publish successful')
+        article_configurations = get_article_conf()
+        publisher = BatchPublisher(EXCHANGE_NAME, ROUTING_KEY)
+        report = publisher.publish_all(
+            (json.dumps(ac), ac.get('priority'), ac.get('newspaper_id')) for ac in article_configurations
+        )
+        print(f'Publish finished: {report.display_info()}')
+    except Exception as e:
+        print(e)
+
+
+def delta_dispatcher():
+    """
+    Publish only the active configs that are new, changed since their last dispatch, or due for a
+    periodic re-dispatch. Rows are streamed from the database and the dispatch state (content hash,
+    version and last dispatch time) is written back in batches once the broker has confirmed them.
+    """
+    print('Initiate to dispatching the message in delta mode')
+    EXCHANGE_NAME = config_manager.ARTICLE_URL_EXCHANGE
+    ROUTING_KEY = config_manager.ARTICLE_URL_KEY
+    fetch_size = config_manager.fetch_size
+
+    ensure_dispatch_state()
+    dispatch_state = get_dispatch_state()
+    now = datetime.now()
+    due_before = now - timedelta(minutes=config_manager.redispatch_interval_minutes)
+    counts = {'new': 0, 'changed': 0, 'due': 0, 'skipped': 0}
+    pending_state = []
+
+    def changed_configs():
+        for ac in stream_article_conf(active_only=True, fetch_size=fetch_size):
+            content_hash = config_hash(ac)
+            previous = dispatch_state.get(ac.get('config_id'))
+
+            if previous is None:
+                reason, version = 'new', 1
+            elif previous.get('content_hash') != content_hash:
+                reason, version = 'changed', previous.get('version', 0) + 1
+            elif previous.get('last_dispatched_at') is None or previous.get('last_dispatched_at') <= due_before:
+                reason, version = 'due', previous.get('version', 1)
+            else:
+                counts['skipped'] += 1
+                continue
+
+            counts[reason] += 1
+            yield json.dumps(ac), ac.get('priority'), \
+                (ac.get('config_id'), ac.get('newspaper_id'), content_hash, version, now, None)
+
+    def on_confirmed(state):
+        # Only configs acknowledged by the broker are recorded as dispatched
+        pending_state.append(state)
+        if len(pending_state) >= fetch_size:
+            save_dispatch_state(pending_state)
+            pending_state.clear()
+
+    try:
+        publisher = BatchPublisher(EXCHANGE_NAME, ROUTING_KEY, on_confirmed=on_confirmed)
+        report = publisher.publish_all(changed_configs())
+        save_dispatch_state(pending_state)
+        print(f"Publish finished: {counts['new']} new, {counts['changed']} changed, {counts['due']} due, "
+              f"{counts['skipped']} unchanged configs skipped; {report.display_info()}")
     except Exception as e:
         print(e)
-    finally:
-        if connection is not None:
-            # Close the connection
-            connection.close()
-            print('Messaging broker connection closed successfully')
@@ -0,0 +1,307 @@
+import json
+import math
+import signal
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import pika
+
+from conf.config_manager import config_manager
+from db_service.db_handler import ensure_dispatch_state, get_dispatch_state, save_dispatch_state, \
+    get_newspaper_schedules, get_article_conf_by_ids
+from mq_service.publisher import get_connection_parameters
+from service.dispatcher import config_hash
+from service.coordination import LeaderElector
+
+DEFAULT_PRIORITY = 5
+
+
+def parse_active_hours(active_hours):
+    """
+    Normalise `conf.newspapers.active_hours` into a list of (start_minute, end_minute) windows of the day.
+
+    Accepted forms: empty / '*' (always active), a list of hours such as [6, 7, 8] or its JSON string,
+    ranges such as '06:00-22:00' or '6-9,18-23' (a window may wrap past midnight), and
+    {"start": "06:00", "end": "22:00"} objects. Unknown formats are treated as always active.
+    """
+    if active_hours is None or active_hours in ('', '*'):
+        return []
+
+    if isinstance(active_hours, str):
+        value = active_hours.strip()
+        if value.startswith('[') or value.startswith('{'):
+            try:
+                return parse_active_hours(json.loads(value))
+            except ValueError:
+                print(f'Invalid active_hours value {active_hours!r}, treating the newspaper as always active')
+                return []
+
+        windows = []
+        for part in value.split(','):
+            if '-' not in part:
+                continue
+            start, end = part.split('-', 1)
+            windows.append((_to_minute(start), _to_minute(end)))
+        if None in (m for window in windows for m in window):
+            print(f'Invalid active_hours value {active_hours!r}, treating the newspaper as always active')
+            return []
+        return windows
+
+    if isinstance(active_hours, dict):
+        return parse_active_hours(f"{active_hours.get('start', '')}-{active_hours.get('end', '')}")
+
+    if isinstance(active_hours, (list, tuple)):
+        windows = []
+        for item in active_hours:
+            if isinstance(item, int):
+                windows.append((item * 60, (item + 1) * 60))
+            else:
+                windows.extend(parse_active_hours(item))
+        return windows
+
+    print(f'Unsupported active_hours value {active_hours!r}, treating the newspaper as always active')
+    return []
+
+
+def _to_minute(value):
+    value = str(value).strip()
+    try:
+        if ':' in value:
+            hours, minutes = value.split(':', 1)
+            return int(hours) * 60 + int(minutes)
+        return int(value) * 60
+    except ValueError:
+        return None
+
+
+def is_within_active_hours(windows, time_zone, now_utc):
+    if not windows:
+        return True
+
+    try:
+        local_now = now_utc.astimezone(ZoneInfo(time_zone)) if time_zone else now_utc
+    except Exception:
+        local_now = now_utc
+
+    minute = local_now.hour * 60 + local_now.minute
+    for start, end in windows:
+        if start <= end and start <= minute < end:
+            return True
+        if start > end and (minute >= start or minute < end):
+            return True
+    return False
+
+
+def cadence_for(priority):
+    """
+    Dispatch interval of a config. Priority 5 runs every `base_interval_minutes`; the interval scales
+    inversely with priority, so priority 10 runs twice as often and priority 1 five times less often.
+    """
+    priority = priority if priority and priority > 0 else DEFAULT_PRIORITY
+    minutes = config_manager.scheduler_base_interval_minutes * DEFAULT_PRIORITY / priority
+    minutes = min(max(minutes, config_manager.scheduler_min_interval_minutes),
+                  config_manager.scheduler_max_interval_minutes)
+    return timedelta(minutes=minutes)
+
+
+def initial_run(config_id, interval, now):
+    """
+    First run of a config with no persisted state. Each config gets a fixed phase within its interval
+    derived from its id, so new configs are spread over the interval instead of all firing at once.
+    """
+    interval_seconds = max(int(interval.total_seconds()), 1)
+    phase = zlib.crc32(str(config_id).encode()) % interval_seconds
+    elapsed = (int(now.timestamp()) - phase) % interval_seconds
+    return now + timedelta(seconds=interval_seconds - elapsed)
+
+
+class DispatchScheduler:
+    """
+    Long-running dispatcher. Every config (a newspaper may have one per section) gets its own cadence from its
+    priority and is only dispatched inside its newspaper's active hours (in its own time zone). Due publishes
+    are paced evenly over each tick and the next run of every config is persisted in `conf.dispatch_state`,
+    so a restart resumes the schedule instead of re-dispatching everything.
+    """
+
+    def __init__(self):
+        self.exchange_name = config_manager.ARTICLE_URL_EXCHANGE
+        self.routing_key = config_manager.ARTICLE_URL_KEY
+        self.tick_seconds = config_manager.scheduler_tick_seconds
+        self.refresh_interval = timedelta(minutes=config_manager.scheduler_refresh_minutes)
+        self.max_publish_per_tick = max(
+            1, math.ceil(config_manager.scheduler_max_publish_per_minute * self.tick_seconds / 60))
+        self.schedules = {}
+        self.dispatch_state = {}
+        self.last_refresh = None
+        self.connection = None
+        self.channel = None
+        self.elector = LeaderElector() if config_manager.cluster_mode == 'leader' else None
+        self._stop = threading.Event()
+
+    def stop(self, *_args):
+        print('Stopping dispatch scheduler')
+        self._stop.set()
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        print('Dispatch scheduler started')
+        ensure_dispatch_state()
+
+        try:
+            while not self._stop.is_set():
+                if not self.is_leader():
+                    # Standby: drop the broker connection and reload state from Postgres once leadership is won
+                    self._close_channel()
+                    self.last_refresh = None
+                    self._stop.wait(config_manager.cluster_leader_retry_seconds)
+                    continue
+
+                # The publishes of a tick are paced over the tick itself; only the rest of it is waited
+                started = time.monotonic()
+                self.run_once()
+                self._pause(self.tick_seconds - (time.monotonic() - started))
+        finally:
+            self._close_channel()
+            if self.elector is not None:
+                self.elector.release()
+            print('Dispatch scheduler stopped')
+
+    def is_leader(self):
+        return self.elector is None or self.elector.try_acquire()
+
+    def run_once(self):
+        now = datetime.now()
+        if self.last_refresh is None or now - self.last_refresh >= self.refresh_interval:
+            self.refresh(now)
+
+        due = self.due_configs(now)
+        if due:
+            self.dispatch(due[:self.max_publish_per_tick])
+
+    def refresh(self, now):
+        schedules = get_newspaper_schedules()
+        if schedules is None:
+            return
+
+        self.dispatch_state = get_dispatch_state()
+        refreshed = {}
+        for schedule in schedules:
+            config_id = schedule.get('config_id')
+            interval = cadence_for(schedule.get('priority'))
+            state = self.dispatch_state.get(config_id, {})
+            refreshed[config_id] = {
+                'newspaper_id': schedule.get('newspaper_id'),
+                'priority': schedule.get('priority') or DEFAULT_PRIORITY,
+                'interval': interval,
+                'windows': parse_active_hours(schedule.get('active_hours')),
+                'time_zone': schedule.get('time_zone'),
+                'next_run_at': state.get('next_run_at') or initial_run(config_id, interval, now)
+            }
+
+        self.schedules = refreshed
+        self.last_refresh = now
+        print(f'Loaded schedules of {len(refreshed)} configs of active newspapers')
+
+    def due_configs(self, now):
+        now_utc = now.astimezone(ZoneInfo('UTC'))
+        due = [
+            (config_id, schedule) for config_id, schedule in self.schedules.items()
+            if schedule['next_run_at'] <= now
+            and is_within_active_hours(schedule['windows'], schedule['time_zone'], now_utc)
+        ]
+        # Higher priority first, then the longest overdue
+        due.sort(key=lambda item: (-item[1]['priority'], item[1]['next_run_at']))
+        return [config_id for config_id, _ in due]
+
+    def dispatch(self, config_ids):
+        """
+        Publish the due configs one at a time, spread evenly over the tick.
+        """
+        article_configurations = get_article_conf_by_ids(config_ids)
+
+        # Configs that disappeared since the last refresh are pushed back a full interval
+        found = {ac.get('config_id') for ac in article_configurations}
+        for config_id in set(config_ids) - found:
+            schedule = self.schedules.get(config_id)
+            schedule['next_run_at'] = datetime.now() + schedule['interval']
+
+        if not article_configurations:
+            return
+
+        gap = self.tick_seconds / len(article_configurations)
+        for index, ac in enumerate(article_configurations):
+            if self._stop.is_set() or not self.is_leader():
+                return
+            if index:
+                self._pause(gap)
+            self.publish(ac)
+
+    def publish(self, ac):
+        config_id, newspaper_id = ac.get('config_id'), ac.get('newspaper_id')
+        schedule = self.schedules.get(config_id)
+        try:
+            channel = self._get_channel()
+            channel.basic_publish(
+                exchange=self.exchange_name,
+                routing_key=self.routing_key,
+                body=json.dumps(ac),
+                properties=pika.BasicProperties(
+                    delivery_mode=config_manager.mq_delivery_mode,
+                    priority=ac.get('priority')
+                )
+            )
+        except Exception as e:
+            print(f'Failed to publish config of newspaper {newspaper_id}', e)
+            self._close_channel()
+            return
+
+        now = datetime.now()
+        content_hash = config_hash(ac)
+        previous = self.dispatch_state.get(config_id, {})
+        version = previous.get('version', 0) + 1 if previous.get('content_hash') != content_hash \
+            else previous.get('version', 1)
+        next_run_at = now + schedule['interval'] if schedule else None
+
+        save_dispatch_state([(config_id, newspaper_id, content_hash, version, now, next_run_at)])
+        self.dispatch_state[config_id] = {'newspaper_id': newspaper_id, 'content_hash': content_hash,
+                                          'version': version, 'last_dispatched_at': now, 'next_run_at': next_run_at}
+        if schedule:
+            schedule['next_run_at'] = next_run_at
+
+    def _get_channel(self):
+        if self.connection is None or self.connection.is_closed:
+            self.connection = pika.BlockingConnection(get_connection_parameters())
+            self.channel = None
+        if self.channel is None or self.channel.is_closed:
+            self.channel = self.connection.channel()
+            # Publishes block until the broker confirms them, so state is only saved for delivered configs
+            self.channel.confirm_delivery()
+        return self.channel
+
+    def _pause(self, seconds):
+        if seconds <= 0:
+            return
+        # Keep servicing heartbeats on the open connection while waiting
+        if self.connection is not None and self.connection.is_open:
+            deadline = time.monotonic() + seconds
+            while not self._stop.is_set() and time.monotonic() < deadline:
+                self.connection.sleep(min(1.0, max(deadline - time.monotonic(), 0)))
+        else:
+            self._stop.wait(seconds)
+
+    def _close_channel(self):
+        try:
+            if self.connection is not None and self.connection.is_open:
+                self.connection.close()
+        except Exception as e:
+            print(e)
+        self.connection = None
+        self.channel = None
+
+
+def run_scheduler():
+    DispatchScheduler().run()